@@ -0,0 +1,28 @@
+"""add_auto_config_to_request_parameters
+
+Revision ID: 3c1f7a9d2e4b
+Revises: 4e329da9629b
+Create Date: 2026-10-19 09:12:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a9d2e4b'
+down_revision: Union[str, Sequence[str], None] = '4e329da9629b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('request_parameters', sa.Column('auto_config', sa.Boolean(), nullable=True, server_default=sa.text('false')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('request_parameters', 'auto_config')
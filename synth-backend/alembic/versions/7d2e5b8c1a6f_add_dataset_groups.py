@@ -0,0 +1,54 @@
+"""add_dataset_groups
+
+Revision ID: 7d2e5b8c1a6f
+Revises: 3c1f7a9d2e4b
+Create Date: 2026-10-19 11:37:05.842119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e5b8c1a6f'
+down_revision: Union[str, Sequence[str], None] = '3c1f7a9d2e4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'dataset_groups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('tables', sa.JSON(), nullable=False),
+        sa.Column('primary_keys', sa.JSON(), nullable=False),
+        sa.Column('relationships', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dataset_groups_id'), 'dataset_groups', ['id'], unique=False)
+    
+    # Link generation requests to a dataset group
+    op.add_column('data_requests', sa.Column('dataset_group_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_data_requests_dataset_group_id',
+        'data_requests',
+        'dataset_groups',
+        ['dataset_group_id'],
+        ['id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_data_requests_dataset_group_id', 'data_requests', type_='foreignkey')
+    op.drop_column('data_requests', 'dataset_group_id')
+    op.drop_index(op.f('ix_dataset_groups_id'), table_name='dataset_groups')
+    op.drop_table('dataset_groups')
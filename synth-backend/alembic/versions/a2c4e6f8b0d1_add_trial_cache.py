@@ -0,0 +1,46 @@
+"""add_trial_cache
+
+Revision ID: a2c4e6f8b0d1
+Revises: 7d2e5b8c1a6f
+Create Date: 2026-10-19 14:02:31.517406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c4e6f8b0d1'
+down_revision: Union[str, Sequence[str], None] = '7d2e5b8c1a6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'trial_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dataset_fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('model_type', sa.String(), nullable=False),
+        sa.Column('evaluation', sa.String(), nullable=False),
+        sa.Column('params_key', sa.String(length=64), nullable=False),
+        sa.Column('parameters', sa.JSON(), nullable=False),
+        sa.Column('quality_score', sa.Float(), nullable=False),
+        sa.Column('training_time', sa.Float(), nullable=True),
+        sa.Column('model_path', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('dataset_fingerprint', 'model_type', 'evaluation', 'params_key', name='uq_trial_cache_key')
+    )
+    op.create_index(op.f('ix_trial_cache_id'), 'trial_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_trial_cache_dataset_fingerprint'), 'trial_cache', ['dataset_fingerprint'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_trial_cache_dataset_fingerprint'), table_name='trial_cache')
+    op.drop_index(op.f('ix_trial_cache_id'), table_name='trial_cache')
+    op.drop_table('trial_cache')
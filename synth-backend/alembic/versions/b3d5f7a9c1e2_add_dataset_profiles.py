@@ -0,0 +1,42 @@
+"""add_dataset_profiles
+
+Revision ID: b3d5f7a9c1e2
+Revises: a2c4e6f8b0d1
+Create Date: 2026-10-19 18:41:07.284913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d5f7a9c1e2'
+down_revision: Union[str, Sequence[str], None] = 'a2c4e6f8b0d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'dataset_profiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('dataset_fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('n_rows', sa.Integer(), nullable=False),
+        sa.Column('n_columns', sa.Integer(), nullable=False),
+        sa.Column('meta_features', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dataset_profiles_id'), 'dataset_profiles', ['id'], unique=False)
+    op.create_index(op.f('ix_dataset_profiles_dataset_fingerprint'), 'dataset_profiles', ['dataset_fingerprint'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_dataset_profiles_dataset_fingerprint'), table_name='dataset_profiles')
+    op.drop_index(op.f('ix_dataset_profiles_id'), table_name='dataset_profiles')
+    op.drop_table('dataset_profiles')
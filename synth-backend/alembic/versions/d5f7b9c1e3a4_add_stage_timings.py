@@ -0,0 +1,46 @@
+"""add_stage_timings
+
+Revision ID: d5f7b9c1e3a4
+Revises: c4e6a8b0d2f3
+Create Date: 2026-10-19 20:14:36.907215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f7b9c1e3a4'
+down_revision: Union[str, Sequence[str], None] = 'c4e6a8b0d2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stage_timings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stage', sa.String(length=32), nullable=False),
+        sa.Column('model_type', sa.String(length=50), nullable=False),
+        sa.Column('n_rows', sa.Integer(), nullable=False),
+        sa.Column('transformed_width', sa.Integer(), nullable=False),
+        sa.Column('epochs', sa.Integer(), nullable=True),
+        sa.Column('batch_size', sa.Integer(), nullable=True),
+        sa.Column('output_rows', sa.Integer(), nullable=True),
+        sa.Column('n_threads', sa.Integer(), nullable=False),
+        sa.Column('seconds', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stage_timings_id'), 'stage_timings', ['id'], unique=False)
+    op.create_index(op.f('ix_stage_timings_stage'), 'stage_timings', ['stage'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_stage_timings_stage'), table_name='stage_timings')
+    op.drop_index(op.f('ix_stage_timings_id'), table_name='stage_timings')
+    op.drop_table('stage_timings')
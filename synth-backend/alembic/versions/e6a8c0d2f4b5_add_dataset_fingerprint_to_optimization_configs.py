@@ -0,0 +1,32 @@
+"""add_dataset_fingerprint_to_optimization_configs
+
+Revision ID: e6a8c0d2f4b5
+Revises: d5f7b9c1e3a4
+Create Date: 2026-10-19 21:04:12.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a8c0d2f4b5'
+down_revision: Union[str, Sequence[str], None] = 'd5f7b9c1e3a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('optimization_configs', sa.Column('dataset_fingerprint', sa.String(length=64), nullable=True))
+    op.create_index(
+        op.f('ix_optimization_configs_dataset_fingerprint'), 'optimization_configs', ['dataset_fingerprint'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_optimization_configs_dataset_fingerprint'), table_name='optimization_configs')
+    op.drop_column('optimization_configs', 'dataset_fingerprint')
@@ -0,0 +1,28 @@
+"""add_epochs_trained_to_optimization_trials
+
+Revision ID: f7b9d1e3a5c6
+Revises: e6a8c0d2f4b5
+Create Date: 2026-10-19 22:41:37.502913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b9d1e3a5c6'
+down_revision: Union[str, Sequence[str], None] = 'e6a8c0d2f4b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('optimization_trials', sa.Column('epochs_trained', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('optimization_trials', 'epochs_trained')
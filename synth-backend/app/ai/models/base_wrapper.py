@@ -13,6 +13,9 @@ class BaseModelWrapper:
         """Initialize the base model wrapper with parameters"""
         self.params = params if params is not None else {}
         self.model = None
+        # Optional training hooks, set by the caller before train()
+        self.checkpointer = None
+        self.epoch_callback = None
         logger.info(f"Initialized {self.__class__.__name__} with params: {self.params}")
     
     async def train(self, data: pd.DataFrame) -> None:
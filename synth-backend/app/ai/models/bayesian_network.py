@@ -0,0 +1,290 @@
+"""
+Greedy Bayesian-network synthesizer over discretized columns (PrivBayes
+structure learning, without the noise).
+
+Every column is mapped to small integer codes: numerical and datetime
+columns to quantile bins, everything else to its categories, missing values
+to a code of their own. Columns are ordered by maximum pairwise mutual
+information, each one gets up to ``max_parents`` parents among the columns
+before it, and its conditional distribution is a table of counts. Counting,
+mutual information and ancestral sampling are all vectorized with numpy, so
+fitting a 100k x 100 table takes seconds.
+"""
+import logging
+import pickle
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A parent set is only kept if its conditional table has at least this many rows per cell on average
+MIN_ROWS_PER_CELL = 4
+
+# Parents of a column are searched among its most informative predecessors only
+CANDIDATE_PARENTS = 8
+
+# Joint tables up to this many cells are counted with bincount, larger ones with unique
+DENSE_COUNT_CELLS = 1 << 20
+
+
+def _mutual_information(x: np.ndarray, y: np.ndarray, n_y: int) -> float:
+    """Mutual information (nats) between two integer code arrays"""
+    n = len(x)
+    n_x = int(x.max()) + 1 if n else 1
+    joint = x.astype(np.int64) * n_y + y
+    if n_x * n_y <= DENSE_COUNT_CELLS:
+        joint_counts = np.bincount(joint, minlength=n_x * n_y)
+        keys = np.flatnonzero(joint_counts)
+        joint_counts = joint_counts[keys]
+    else:
+        keys, joint_counts = np.unique(joint, return_counts=True)
+    px = np.bincount(x, minlength=n_x)[keys // n_y] / n
+    py = np.bincount(y, minlength=n_y)[keys % n_y] / n
+    pxy = joint_counts / n
+    return float(np.sum(pxy * np.log(pxy / (px * py))))
+
+
+def _combine_codes(a: np.ndarray, n_a: int, b: np.ndarray, n_b: int):
+    """
+    Single code for each combination of two code arrays.
+
+    Returns:
+        (codes, number of possible codes, number of combinations present)
+    """
+    key = a.astype(np.int64) * n_b + b
+    if n_a * n_b <= DENSE_COUNT_CELLS:
+        return key, n_a * n_b, int(np.count_nonzero(np.bincount(key)))
+    present, inverse = np.unique(key, return_inverse=True)
+    return inverse.reshape(-1), len(present), len(present)
+
+
+class _ColumnCodec:
+    """Maps one column to integer codes and back"""
+
+    def __init__(self, name: str, series: pd.Series, n_bins: int):
+        self.name = name
+        self.dtype = series.dtype
+        self.is_datetime = pd.api.types.is_datetime64_any_dtype(series)
+        is_numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        values = series.dropna()
+        self.has_nan = len(values) < len(series)
+
+        if (is_numeric or self.is_datetime) and values.nunique() > n_bins:
+            self.kind = 'numerical'
+            numbers = self._to_numbers(values)
+            edges = np.unique(np.quantile(numbers, np.linspace(0, 1, n_bins + 1)))
+            self.edges = edges
+            self.cardinality = len(edges) - 1
+            self.is_integer = pd.api.types.is_integer_dtype(series) or bool(np.all(numbers == np.round(numbers)))
+        else:
+            self.kind = 'categorical'
+            self.categories = pd.unique(values)
+            self.cardinality = len(self.categories)
+
+        self.nan_code = self.cardinality if self.has_nan else None
+        self.n_codes = self.cardinality + int(self.has_nan)
+
+    def _to_numbers(self, values: pd.Series) -> np.ndarray:
+        if self.is_datetime:
+            return values.astype('int64').to_numpy(dtype=float)
+        return values.to_numpy(dtype=float)
+
+    def encode(self, series: pd.Series) -> np.ndarray:
+        codes = np.full(len(series), self.nan_code if self.has_nan else 0, dtype=np.int64)
+        mask = series.notna().to_numpy()
+        if self.kind == 'numerical':
+            numbers = self._to_numbers(series[mask])
+            codes[mask] = np.clip(np.searchsorted(self.edges, numbers, side='right') - 1, 0, self.cardinality - 1)
+        else:
+            codes[mask] = pd.Categorical(series[mask], categories=self.categories).codes
+        return codes
+
+    def decode(self, codes: np.ndarray, rng: np.random.Generator) -> pd.Series:
+        is_nan = codes == self.nan_code if self.has_nan else np.zeros(len(codes), dtype=bool)
+        safe_codes = np.where(is_nan, 0, codes)
+
+        if self.kind == 'categorical':
+            values = pd.Series(self.categories[safe_codes] if self.cardinality else np.full(len(codes), np.nan))
+            values[is_nan] = np.nan
+            return values.astype(self.dtype) if not self.has_nan else values
+
+        low, high = self.edges[safe_codes], self.edges[safe_codes + 1]
+        numbers = low + rng.random(len(codes)) * (high - low)
+        if self.is_integer:
+            numbers = np.round(numbers)
+        numbers[is_nan] = np.nan
+
+        if self.is_datetime:
+            return pd.Series(pd.to_datetime(numbers, unit='ns'))
+        values = pd.Series(numbers)
+        if not self.has_nan:
+            values = values.astype(self.dtype)
+        return values
+
+
+class BayesianNetworkSynthesizer:
+    """
+    Bayesian network of discretized columns with count-based conditional tables.
+
+    Args:
+        n_bins: Quantile bins per numerical column
+        max_parents: Maximum number of parents per column (network degree)
+        structure_sample_rows: Rows used to learn the structure (the tables use all rows)
+        random_state: Seed of the generator drawn from by ``fit`` and every ``sample`` call
+    """
+
+    def __init__(
+        self,
+        n_bins: int = 20,
+        max_parents: int = 2,
+        structure_sample_rows: int = 20000,
+        random_state: Optional[int] = None
+    ):
+        self.n_bins = n_bins
+        self.max_parents = max_parents
+        self.structure_sample_rows = structure_sample_rows
+        self.random_state = random_state
+        self._rng = np.random.default_rng(random_state)
+        self.columns: List[str] = []
+        self.codecs: Dict[str, _ColumnCodec] = {}
+        self.order: List[str] = []
+        self.parents: Dict[str, List[str]] = {}
+        self.tables: Dict[str, Dict[str, Any]] = {}
+
+    def fit(self, data: pd.DataFrame) -> None:
+        self.columns = list(data.columns)
+        self.codecs = {col: _ColumnCodec(col, data[col], self.n_bins) for col in self.columns}
+        codes = {col: self.codecs[col].encode(data[col]) for col in self.columns}
+
+        self._learn_structure(codes, len(data), self._rng)
+        for col in self.order:
+            self.tables[col] = self._fit_table(codes, col, self.parents[col])
+
+        logger.info(
+            f"Bayesian network fitted on {len(data)} rows: "
+            f"{sum(len(p) for p in self.parents.values())} edges over {len(self.columns)} columns"
+        )
+
+    def _learn_structure(self, codes: Dict[str, np.ndarray], n_rows: int, rng: np.random.Generator) -> None:
+        rows = None
+        if n_rows > self.structure_sample_rows:
+            rows = rng.choice(n_rows, self.structure_sample_rows, replace=False)
+        sample = {col: (c[rows] if rows is not None else c) for col, c in codes.items()}
+        n_sample = len(next(iter(sample.values()))) if sample else 0
+
+        # Pairwise mutual information matrix
+        n_cols = len(self.columns)
+        mi = np.zeros((n_cols, n_cols))
+        for i in range(n_cols):
+            for j in range(i + 1, n_cols):
+                value = _mutual_information(
+                    sample[self.columns[i]], sample[self.columns[j]], self.codecs[self.columns[j]].n_codes
+                )
+                mi[i, j] = mi[j, i] = value
+
+        # Order: start from the most connected column, then add the column most informed by those chosen
+        chosen = [int(np.argmax(mi.sum(axis=1)))] if n_cols else []
+        best_link = mi[chosen[0]].copy() if n_cols else np.zeros(0)
+        remaining = set(range(n_cols)) - set(chosen)
+        while remaining:
+            nxt = max(remaining, key=lambda k: best_link[k])
+            chosen.append(nxt)
+            remaining.remove(nxt)
+            best_link = np.maximum(best_link, mi[nxt])
+        self.order = [self.columns[i] for i in chosen]
+
+        # Parents: greedy among the most informative predecessors, as long as the table stays well populated
+        self.parents = {}
+        for position, idx in enumerate(chosen):
+            col = self.columns[idx]
+            predecessors = sorted(chosen[:position], key=lambda k: -mi[idx, k])[:CANDIDATE_PARENTS]
+            parents: List[int] = []
+            parent_key, n_parent_key = np.zeros(n_sample, dtype=np.int64), 1
+            for _ in range(min(self.max_parents, len(predecessors))):
+                best, best_score, best_key = None, 0.0, None
+                for candidate in predecessors:
+                    if candidate in parents:
+                        continue
+                    candidate_codec = self.codecs[self.columns[candidate]]
+                    key, n_key, configs = _combine_codes(
+                        parent_key, n_parent_key, sample[self.columns[candidate]], candidate_codec.n_codes
+                    )
+                    if configs * self.codecs[col].n_codes * MIN_ROWS_PER_CELL > n_sample:
+                        continue
+                    score = _mutual_information(key, sample[col], self.codecs[col].n_codes)
+                    if score > best_score:
+                        best, best_score, best_key = candidate, score, (key, n_key)
+                if best is None:
+                    break
+                parents.append(best)
+                parent_key, n_parent_key = best_key
+            self.parents[col] = [self.columns[p] for p in parents]
+
+    def _fit_table(self, codes: Dict[str, np.ndarray], col: str, parents: List[str]) -> Dict[str, Any]:
+        n_codes = self.codecs[col].n_codes
+        marginal = np.bincount(codes[col], minlength=n_codes).astype(float)
+        marginal /= marginal.sum()
+        if not parents:
+            return {'keys': np.zeros(0, dtype=np.int64), 'strides': [], 'probs': marginal[None, :]}
+
+        strides = self._strides(parents)
+        parent_keys = sum(codes[p] * s for p, s in zip(parents, strides))
+        keys, config = np.unique(parent_keys, return_inverse=True)
+        counts = np.bincount(
+            config.reshape(-1) * n_codes + codes[col], minlength=len(keys) * n_codes
+        ).reshape(len(keys), n_codes).astype(float)
+        probs = counts / counts.sum(axis=1, keepdims=True)
+
+        # Last row: marginal, used for parent configurations never seen in the data
+        return {'keys': keys, 'strides': strides, 'probs': np.vstack([probs, marginal])}
+
+    def _strides(self, parents: List[str]) -> List[int]:
+        strides, stride = [], 1
+        for parent in parents:
+            strides.append(stride)
+            stride *= self.codecs[parent].n_codes
+        return strides
+
+    def sample(self, num_rows: int) -> pd.DataFrame:
+        if not self.order:
+            raise ValueError("Le modèle doit être entraîné avant de générer des échantillons")
+
+        # Successive calls continue the stream: they do not return the same rows
+        rng = self._rng
+        codes: Dict[str, np.ndarray] = {}
+        for col in self.order:
+            table = self.tables[col]
+            if self.parents[col]:
+                parent_keys = sum(codes[p] * s for p, s in zip(self.parents[col], table['strides']))
+                rows = np.searchsorted(table['keys'], parent_keys)
+                rows = np.clip(rows, 0, len(table['keys']) - 1)
+                unseen = table['keys'][rows] != parent_keys
+                rows[unseen] = len(table['keys'])
+            else:
+                rows = np.zeros(num_rows, dtype=np.int64)
+            codes[col] = self._sample_rows(table['probs'], rows, rng)
+
+        return pd.DataFrame({col: self.codecs[col].decode(codes[col], rng) for col in self.columns})
+
+    @staticmethod
+    def _sample_rows(probs: np.ndarray, rows: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Draw one code per sample from row ``rows[i]`` of ``probs`` (inverse CDF on the flattened table)"""
+        n_rows, n_codes = probs.shape
+        cumulative = (np.cumsum(probs, axis=1) + np.arange(n_rows)[:, None]).reshape(-1)
+        targets = rows + rng.random(len(rows))
+        positions = np.searchsorted(cumulative, targets, side='right')
+        return np.clip(positions - rows * n_codes, 0, n_codes - 1)
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'BayesianNetworkSynthesizer':
+        with open(path, 'rb') as f:
+            model = pickle.load(f)
+        if not hasattr(model, '_rng'):  # Saved before the generator was kept with the model
+            model._rng = np.random.default_rng(model.random_state)
+        return model
@@ -0,0 +1,148 @@
+"""
+Wrapper pour le synthétiseur rapide par réseau bayésien (histogrammes conditionnels)
+"""
+import pandas as pd
+from typing import Dict, Any
+import logging
+from app.ai.models.base_wrapper import BaseModelWrapper
+from app.ai.models.bayesian_network import BayesianNetworkSynthesizer
+
+logger = logging.getLogger(__name__)
+
+class BayesianNetworkWrapper(BaseModelWrapper):
+    """
+    Wrapper du BayesianNetworkSynthesizer: modèle léger qui s'entraîne en
+    quelques secondes sur de grandes tables, utilisé seul ou comme référence
+    dans les optimisations
+    """
+
+    def __init__(self, params: dict):
+        """
+        Initialise le wrapper réseau bayésien
+
+        Args:
+            params: Dictionnaire des paramètres contenant:
+                - n_bins: Nombre d'intervalles (quantiles) par colonne numérique
+                - max_parents: Nombre maximal de parents par colonne
+        """
+        super().__init__(params)
+
+        self.n_bins = int(self.params.get('n_bins', 20))
+        self.max_parents = int(self.params.get('max_parents', 2))
+        self.is_fitted = False
+
+        logger.info(f"Initialisation BayesianNetwork avec n_bins={self.n_bins}, "
+                   f"max_parents={self.max_parents}")
+
+    async def train(self, data: pd.DataFrame) -> None:
+        """
+        Entraîne le réseau bayésien
+
+        Args:
+            data: DataFrame contenant les données d'entraînement
+        """
+        try:
+            logger.info(f"Début de l'entraînement sur {len(data)} échantillons")
+
+            self.model = BayesianNetworkSynthesizer(
+                n_bins=self.n_bins,
+                max_parents=self.max_parents,
+                random_state=self.params.get('random_state')
+            )
+            self.model.fit(data)
+            self.is_fitted = True
+
+            logger.info("Entraînement terminé avec succès")
+
+        except Exception as e:
+            error_msg = f"Erreur lors de l'entraînement: {e}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+
+    async def generate(self, num_rows: int) -> pd.DataFrame:
+        """
+        Génère des échantillons synthétiques par échantillonnage ancestral
+
+        Args:
+            num_rows: Nombre d'échantillons à générer
+
+        Returns:
+            pd.DataFrame: Données synthétiques générées
+        """
+        if not self.is_fitted:
+            raise ValueError("Le modèle doit être entraîné avant de générer des échantillons")
+
+        try:
+            logger.info(f"Génération de {num_rows} échantillons synthétiques")
+            synthetic_data = self.model.sample(num_rows)
+            logger.info(f"Génération terminée: {len(synthetic_data)} échantillons créés")
+            return synthetic_data
+
+        except Exception as e:
+            error_msg = f"Erreur lors de la génération: {e}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+
+    async def save(self, path: str) -> None:
+        """
+        Sauvegarde le modèle entraîné
+
+        Args:
+            path: Chemin vers le fichier de sauvegarde
+        """
+        if not self.is_fitted:
+            raise ValueError("Le modèle doit être entraîné avant d'être sauvegardé")
+
+        try:
+            self.model.save(path)
+            logger.info(f"Modèle sauvegardé dans {path}")
+        except Exception as e:
+            error_msg = f"Erreur lors de la sauvegarde: {e}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+
+    async def load(self, path: str) -> None:
+        """
+        Charge un modèle depuis un fichier
+
+        Args:
+            path: Chemin vers le fichier du modèle
+        """
+        try:
+            self.model = BayesianNetworkSynthesizer.load(path)
+            self.is_fitted = True
+            logger.info(f"Modèle chargé depuis {path}")
+        except Exception as e:
+            error_msg = f"Erreur lors du chargement: {e}"
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """
+        Retourne des informations sur le modèle
+
+        Returns:
+            Dict contenant les informations du modèle
+        """
+        return {
+            'model_type': 'bayesian_network',
+            'n_bins': self.n_bins,
+            'max_parents': self.max_parents,
+            'is_fitted': self.is_fitted,
+            'structure': self.model.parents if self.is_fitted else {}
+        }
+
+
+def create_bayesian_network_model(hyperparameters: Dict[str, Any]) -> BayesianNetworkWrapper:
+    """
+    Factory function pour créer un modèle réseau bayésien avec des hyperparamètres
+
+    Args:
+        hyperparameters: Dictionnaire des hyperparamètres
+
+    Returns:
+        BayesianNetworkWrapper: Instance configurée du modèle
+    """
+    logger.info(f"Création d'un modèle BayesianNetwork avec hyperparamètres: {hyperparameters}")
+
+    return BayesianNetworkWrapper(hyperparameters)
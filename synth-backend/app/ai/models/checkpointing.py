@@ -0,0 +1,80 @@
+import os
+import time
+import shutil
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingCheckpointer:
+    """
+    Persists the training state of a synthesizer (networks, optimizers, epoch
+    counter) to local disk so that an interrupted run can resume instead of
+    starting over.
+
+    A checkpoint is written every ``every_epochs`` epochs or every
+    ``every_minutes`` minutes, whichever comes first. The ``signature``
+    identifies the training setup (hyperparameters and data shape); a
+    checkpoint written with a different signature is ignored on load.
+    """
+
+    FILENAME = "checkpoint.pt"
+
+    def __init__(
+        self,
+        directory: str,
+        signature: Optional[Dict[str, Any]] = None,
+        every_epochs: Optional[int] = 25,
+        every_minutes: Optional[float] = 5.0
+    ):
+        self.directory = Path(directory)
+        self.signature = signature or {}
+        self.every_epochs = every_epochs
+        self.every_minutes = every_minutes
+        self._last_save = time.monotonic()
+
+    @property
+    def path(self) -> Path:
+        return self.directory / self.FILENAME
+
+    def should_save(self, epoch: int, total_epochs: int) -> bool:
+        """Return True when a checkpoint is due after ``epoch`` (0-based)"""
+        if epoch + 1 >= total_epochs:
+            return False
+        if self.every_epochs and (epoch + 1) % self.every_epochs == 0:
+            return True
+        if self.every_minutes and time.monotonic() - self._last_save >= self.every_minutes * 60:
+            return True
+        return False
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Atomically write ``state`` to disk"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        torch.save({"signature": self.signature, "state": state}, tmp_path)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+        logger.info(f"Checkpoint saved at epoch {state.get('epoch')} to {self.path}")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return the saved state, or None if there is no usable checkpoint"""
+        if not self.path.exists():
+            return None
+        try:
+            payload = torch.load(self.path, map_location="cpu", weights_only=False)
+        except Exception as e:
+            logger.warning(f"Unreadable checkpoint {self.path}, ignoring it: {e}")
+            return None
+        if payload.get("signature") != self.signature:
+            logger.warning(f"Checkpoint {self.path} was written for another configuration, ignoring it")
+            return None
+        logger.info(f"Resuming from checkpoint at epoch {payload['state'].get('epoch')}")
+        return payload["state"]
+
+    def clear(self) -> None:
+        """Remove the checkpoint directory"""
+        shutil.rmtree(self.directory, ignore_errors=True)
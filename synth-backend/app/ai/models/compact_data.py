@@ -0,0 +1,149 @@
+"""
+Compact storage of the CTGAN/TVAE training matrix.
+
+The data transformer turns every discrete column (and the mode indicator of
+every continuous column) into a one-hot block, so the dense matrix costs
+rows x (sum of cardinalities) float32 while each block holds a single 1 per
+row. Here each one-hot block is kept as one small integer code per row and
+each scalar as a float32; mini-batches are expanded to the dense layout on
+the fly, which is exactly what the networks would have seen.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from ctgan.data_sampler import DataSampler
+
+logger = logging.getLogger(__name__)
+
+# Rows transformed at once while building the compact matrix; bounds the dense peak
+TRANSFORM_CHUNK_ROWS = 20000
+
+
+class CompactTrainingData:
+    """Training matrix with one-hot blocks stored as integer codes"""
+
+    def __init__(self, output_info_list, codes: np.ndarray, values: np.ndarray):
+        self.output_info_list = output_info_list
+        self.codes = codes
+        self.values = values
+
+        scalar_positions, code_offsets, code_dims = [], [], []
+        st = 0
+        for column_info in output_info_list:
+            for span_info in column_info:
+                if span_info.activation_fn == 'softmax':
+                    code_offsets.append(st)
+                    code_dims.append(span_info.dim)
+                else:
+                    scalar_positions.append(st)
+                st += span_info.dim
+
+        self.width = st
+        self._scalar_positions = np.asarray(scalar_positions, dtype=np.int64)
+        self._code_offsets = np.asarray(code_offsets, dtype=np.int64)
+        self.code_dims = code_dims
+
+    @classmethod
+    def from_transformer(cls, transformer, raw_data: pd.DataFrame, chunk_rows: int = TRANSFORM_CHUNK_ROWS):
+        """Transform ``raw_data`` chunk by chunk and keep only the codes and scalars"""
+        if not isinstance(raw_data, pd.DataFrame):
+            raw_data = pd.DataFrame(raw_data, columns=[str(num) for num in range(raw_data.shape[1])])
+
+        output_info_list = transformer.output_info_list
+        spans = [span_info for column_info in output_info_list for span_info in column_info]
+        max_dim = max([s.dim for s in spans if s.activation_fn == 'softmax'], default=1)
+        code_dtype = np.min_scalar_type(max_dim)
+
+        n_rows = len(raw_data)
+        n_codes = sum(1 for s in spans if s.activation_fn == 'softmax')
+        n_values = len(spans) - n_codes
+        codes = np.empty((n_rows, n_codes), dtype=code_dtype)
+        values = np.empty((n_rows, n_values), dtype=np.float32)
+
+        for start in range(0, n_rows, chunk_rows):
+            dense = transformer.transform(raw_data.iloc[start:start + chunk_rows])
+            rows = slice(start, start + len(dense))
+            st, code_id, value_id = 0, 0, 0
+            for span_info in spans:
+                if span_info.activation_fn == 'softmax':
+                    codes[rows, code_id] = np.argmax(dense[:, st:st + span_info.dim], axis=1)
+                    code_id += 1
+                else:
+                    values[rows, value_id] = dense[:, st]
+                    value_id += 1
+                st += span_info.dim
+
+        data = cls(output_info_list, codes, values)
+        logger.info(
+            f"Compact training data: {codes.nbytes + values.nbytes} bytes "
+            f"instead of {n_rows * data.width * 4} for the dense matrix"
+        )
+        return data
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def shape(self):
+        return (len(self), self.width)
+
+    def __getitem__(self, idx) -> np.ndarray:
+        """Expand the rows ``idx`` to the dense float32 layout"""
+        idx = np.asarray(idx)
+        batch = np.zeros((len(idx), self.width), dtype=np.float32)
+        batch[:, self._scalar_positions] = self.values[idx]
+        rows = np.arange(len(idx))[:, None]
+        batch[rows, self._code_offsets[None, :] + self.codes[idx]] = 1.0
+        return batch
+
+
+class CompactDataSampler(DataSampler):
+    """
+    ``DataSampler`` built from a ``CompactTrainingData``: the rows of each
+    category and the category frequencies come from the codes, and
+    ``sample_data`` expands only the sampled rows.
+    """
+
+    def __init__(self, data: CompactTrainingData, output_info, log_frequency):
+        self._data_length = len(data)
+
+        def is_discrete_column(column_info):
+            return len(column_info) == 1 and column_info[0].activation_fn == 'softmax'
+
+        discrete_infos = []
+        code_id = 0
+        for column_info in output_info:
+            if is_discrete_column(column_info):
+                discrete_infos.append((code_id, column_info[0].dim))
+            code_id += sum(1 for span_info in column_info if span_info.activation_fn == 'softmax')
+
+        n_discrete_columns = len(discrete_infos)
+        max_category = max([dim for _, dim in discrete_infos], default=0)
+
+        self._discrete_column_matrix_st = np.zeros(n_discrete_columns, dtype='int32')
+        self._discrete_column_cond_st = np.zeros(n_discrete_columns, dtype='int32')
+        self._discrete_column_n_category = np.zeros(n_discrete_columns, dtype='int32')
+        self._discrete_column_category_prob = np.zeros((n_discrete_columns, max_category))
+        self._n_discrete_columns = n_discrete_columns
+        self._n_categories = sum(dim for _, dim in discrete_infos)
+
+        self._rid_by_cat_cols = []
+        current_cond_st = 0
+        for current_id, (code_id, dim) in enumerate(discrete_infos):
+            column_codes = data.codes[:, code_id]
+            category_freq = np.bincount(column_codes, minlength=dim)[:dim]
+
+            # Stable sort keeps row ids ascending within each category, like np.nonzero
+            order = np.argsort(column_codes, kind='stable')
+            self._rid_by_cat_cols.append(np.split(order, np.cumsum(category_freq)[:-1]))
+
+            category_freq = category_freq.astype(float)
+            if log_frequency:
+                category_freq = np.log(category_freq + 1)
+            category_prob = category_freq / np.sum(category_freq)
+            self._discrete_column_category_prob[current_id, :dim] = category_prob
+            self._discrete_column_cond_st[current_id] = current_cond_st
+            self._discrete_column_n_category[current_id] = dim
+            current_cond_st += dim
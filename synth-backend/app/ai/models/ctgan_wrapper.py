@@ -1,5 +1,7 @@
 from app.ai.models.base_wrapper import BaseModelWrapper
+from app.ai.models.resumable_synthesizers import ResumableCTGANSynthesizer
 from sdv.single_table import CTGANSynthesizer
+from sdv.errors import SynthesizerInputError
 from sdv.metadata import SingleTableMetadata
 import pandas as pd
 
@@ -49,7 +51,9 @@ class CTGANWrapper(BaseModelWrapper):
             except Exception as e:
                 logger.warning(f"Could not set learning rate parameter: {e}")
             
-            self.model = CTGANSynthesizer(**ctgan_params)
+            self.model = ResumableCTGANSynthesizer(**ctgan_params)
+            self.model.checkpointer = self.checkpointer
+            self.model.epoch_callback = self.epoch_callback
             
             # Fit the model
             logger.info("Starting model fitting...")
@@ -94,7 +98,11 @@ class CTGANWrapper(BaseModelWrapper):
         """Load a pre-trained model"""
         try:
             logger.info(f"Loading CTGAN model from {path}")
-            self.model = CTGANSynthesizer.load(path)
+            try:
+                self.model = ResumableCTGANSynthesizer.load(path)
+            except SynthesizerInputError:
+                # Model saved before training became resumable
+                self.model = CTGANSynthesizer.load(path)
             logger.info("Model loaded successfully")
         except Exception as e:
             error_msg = f"CTGAN load error: {str(e)}"
@@ -6,8 +6,10 @@ import numpy as np
 from typing import Dict, Any, Optional, List
 from sdv.single_table import GaussianCopulaSynthesizer
 from sdv.metadata import SingleTableMetadata
+from sdv.errors import SynthesizerInputError
 import logging
 from app.ai.models.base_wrapper import BaseModelWrapper
+from app.ai.models.parallel_fitting import ParallelGaussianCopulaSynthesizer, select_numerical_distributions
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,8 @@ class GaussianCopulaWrapper(BaseModelWrapper):
                 - distribution: Type de distribution pour les variables numériques
                 - categorical_transformer: Méthode de transformation pour les colonnes catégorielles
                 - default_distribution: Distribution de fallback si l'estimation échoue
+                - select_distributions: Choisit la loi de chaque colonne numérique (plus faible
+                  statistique KS parmi les lois du mode ``distribution``) au lieu de default_distribution
         """
         super().__init__(params)
         
@@ -32,6 +36,7 @@ class GaussianCopulaWrapper(BaseModelWrapper):
         self.distribution = params.get('distribution', 'parametric')
         self.categorical_transformer = params.get('categorical_transformer', 'one_hot')
         self.default_distribution = params.get('default_distribution', 'norm')
+        self.select_distributions = bool(params.get('select_distributions', False))
         
         self.metadata = None
         self.is_fitted = False
@@ -98,6 +103,17 @@ class GaussianCopulaWrapper(BaseModelWrapper):
                 'default_distribution': self.default_distribution
             }
             
+            # Sélection de la meilleure loi marginale par colonne numérique (sur demande)
+            numerical_columns = [
+                name for name, info in self.metadata.columns.items()
+                if info['sdtype'] == 'numerical'
+            ]
+            if self.select_distributions and numerical_columns:
+                model_config['numerical_distributions'] = select_numerical_distributions(
+                    data, numerical_columns, self.distribution
+                )
+                logger.info(f"Lois marginales sélectionnées: {model_config['numerical_distributions']}")
+            
             # Configuration spécifique selon le type de distribution
             if self.distribution == 'parametric':
                 model_config['enforce_min_max_values'] = True
@@ -108,8 +124,8 @@ class GaussianCopulaWrapper(BaseModelWrapper):
                 model_config['enforce_min_max_values'] = True
                 model_config['enforce_rounding'] = False
             
-            # Initialisation du modèle
-            self.model = GaussianCopulaSynthesizer(**model_config)
+            # Initialisation du modèle (lois marginales ajustées en parallèle sur les grandes tables)
+            self.model = ParallelGaussianCopulaSynthesizer(**model_config)
             
             # Entraînement
             self.model.fit(data)
@@ -174,7 +190,11 @@ class GaussianCopulaWrapper(BaseModelWrapper):
             path: Chemin vers le fichier du modèle
         """
         try:
-            self.model = GaussianCopulaSynthesizer.load(path)
+            try:
+                self.model = ParallelGaussianCopulaSynthesizer.load(path)
+            except SynthesizerInputError:
+                # Modèle sauvegardé avant l'ajustement parallèle des lois marginales
+                self.model = GaussianCopulaSynthesizer.load(path)
             self.is_fitted = True
             logger.info(f"Modèle chargé depuis {path}")
         except Exception as e:
@@ -194,6 +214,7 @@ class GaussianCopulaWrapper(BaseModelWrapper):
             'distribution': self.distribution,
             'categorical_transformer': self.categorical_transformer,
             'default_distribution': self.default_distribution,
+            'select_distributions': self.select_distributions,
             'is_fitted': self.is_fitted,
             'metadata_columns': len(self.metadata.columns) if self.metadata else 0
         }
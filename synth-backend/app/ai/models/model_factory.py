@@ -1,6 +1,8 @@
 from app.ai.models.tvae_wrapper import TVAEWrapper
 from app.ai.models.ctgan_wrapper import CTGANWrapper
 from app.ai.models.gaussian_copula_wrapper import create_gaussian_copula_model
+from app.ai.models.bayesian_network_wrapper import create_bayesian_network_model
+from app.ai.models.relational_synthesizer import RelationalSynthesizer
 
 def get_model_wrapper(model_type: str, hyperparameters: dict):
     """Factory pour créer le wrapper approprié"""
@@ -10,5 +12,18 @@ def get_model_wrapper(model_type: str, hyperparameters: dict):
         return CTGANWrapper(hyperparameters)
     elif model_type.lower() == "gaussian_copula":
         return create_gaussian_copula_model(hyperparameters)
+    elif model_type.lower() == "bayesian_network":
+        return create_bayesian_network_model(hyperparameters)
     else:
-        raise ValueError(f"Type de modèle inconnu: {model_type}")
\ No newline at end of file
+        raise ValueError(f"Type de modèle inconnu: {model_type}")
+
+def get_relational_model(model_type: str, hyperparameters: dict, primary_keys: dict, relationships: list):
+    """Factory pour un groupe de tables liées: un modèle `model_type` par table"""
+    if model_type.lower() not in ("tvae", "ctgan", "gaussian_copula", "bayesian_network"):
+        raise ValueError(f"Type de modèle inconnu: {model_type}")
+    return RelationalSynthesizer(
+        model_type=model_type.lower(),
+        hyperparameters=hyperparameters,
+        primary_keys=primary_keys,
+        relationships=relationships
+    )
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Column-wise fitting spread over a process pool.
+
+On large tables the per-column fits (Bayesian Gaussian mixtures of the
+CTGAN/TVAE data transformer, marginal distributions of GaussianCopula)
+dominate the start-up time. Each column is independent, so they are fitted
+in worker processes and merged back in column order; every column
+transformer carries its own random seed, so the result does not depend on
+the number of workers. Spawning workers (each imports SDV and torch) takes
+a few seconds, so small tables keep the sequential path.
+"""
+import logging
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.stats import kstest
+
+from copulas.multivariate import GaussianMultivariate
+from copulas.multivariate.gaussian import DEFAULT_DISTRIBUTION
+from ctgan.data_transformer import DataTransformer
+from sdv.single_table import GaussianCopulaSynthesizer
+
+from app.core.parallel import create_process_pool, default_max_workers
+
+logger = logging.getLogger(__name__)
+
+# Below this many columns to fit, or this many values (rows x columns to fit),
+# worker start-up costs more than it saves. Copula marginals are much cheaper
+# to fit per value than Gaussian mixtures or the marginal selection
+MIN_PARALLEL_COLUMNS = 8
+MIN_PARALLEL_CELLS = 200_000
+MIN_PARALLEL_MARGINAL_CELLS = 5_000_000
+
+# Candidate marginals per GaussianCopulaWrapper distribution mode
+DISTRIBUTION_CANDIDATES = {
+    'parametric': ['norm', 'beta', 'truncnorm', 'gamma', 'uniform'],
+    'bounded': ['beta', 'truncnorm', 'uniform'],
+    'truncated': ['truncnorm'],
+}
+
+
+def _worth_parallel(n_jobs: int, n_rows: int, n_columns: int, min_cells: int = MIN_PARALLEL_CELLS) -> bool:
+    return n_jobs > 1 and n_columns >= MIN_PARALLEL_COLUMNS and n_rows * n_columns >= min_cells
+
+
+def _fit_continuous_column(job):
+    column_data, max_clusters, weight_threshold = job
+    return DataTransformer(max_clusters, weight_threshold)._fit_continuous(column_data)
+
+
+def _fit_univariate(job):
+    column, distribution, column_name = job
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', module='scipy')
+        return GaussianMultivariate()._fit_column(column, distribution, column_name)
+
+
+def _select_column_distribution(job):
+    column_name, values, candidates = job
+    best_name, best_ks = None, np.inf
+    for name in candidates:
+        try:
+            instance = GaussianCopulaSynthesizer._DISTRIBUTIONS[name]()
+            instance.fit(values)
+            ks, _ = kstest(values, instance.cdf)
+            if ks < best_ks:
+                best_name, best_ks = name, ks
+        except Exception:
+            # Distribution not supported by this column
+            continue
+    return column_name, best_name
+
+
+class ParallelDataTransformer(DataTransformer):
+    """``DataTransformer`` that fits the continuous columns in parallel"""
+
+    def __init__(self, max_clusters=10, weight_threshold=0.005, n_jobs: Optional[int] = None):
+        super().__init__(max_clusters=max_clusters, weight_threshold=weight_threshold)
+        self.n_jobs = n_jobs if n_jobs is not None else default_max_workers()
+
+    def fit(self, raw_data, discrete_columns=()):
+        if not isinstance(raw_data, pd.DataFrame):
+            return super().fit(raw_data, discrete_columns)
+
+        continuous_columns = [col for col in raw_data.columns if col not in discrete_columns]
+        if not _worth_parallel(self.n_jobs, len(raw_data), len(continuous_columns)):
+            return super().fit(raw_data, discrete_columns)
+
+        self.output_info_list = []
+        self.output_dimensions = 0
+        self.dataframe = True
+        self._column_raw_dtypes = raw_data.infer_objects().dtypes
+
+        jobs = [
+            (raw_data[[col]], self._max_clusters, self._weight_threshold)
+            for col in continuous_columns
+        ]
+        logger.info(f"Fitting {len(jobs)} continuous columns on {min(self.n_jobs, len(jobs))} workers")
+        with create_process_pool(min(self.n_jobs, len(jobs))) as pool:
+            continuous_infos = dict(zip(continuous_columns, pool.map(_fit_continuous_column, jobs)))
+
+        self._column_transform_info_list = []
+        for column_name in raw_data.columns:
+            if column_name in discrete_columns:
+                column_transform_info = self._fit_discrete(raw_data[[column_name]])
+            else:
+                column_transform_info = continuous_infos[column_name]
+
+            self.output_info_list.append(column_transform_info.output_info)
+            self.output_dimensions += column_transform_info.output_dimensions
+            self._column_transform_info_list.append(column_transform_info)
+
+
+class ParallelGaussianMultivariate(GaussianMultivariate):
+    """``GaussianMultivariate`` that fits the marginals of its columns in parallel"""
+
+    def __init__(self, distribution=DEFAULT_DISTRIBUTION, random_state=None, n_jobs: Optional[int] = None):
+        super().__init__(distribution=distribution, random_state=random_state)
+        self.n_jobs = n_jobs if n_jobs is not None else default_max_workers()
+
+    def _fit_columns(self, X):
+        if not _worth_parallel(self.n_jobs, len(X), X.shape[1], MIN_PARALLEL_MARGINAL_CELLS):
+            return super()._fit_columns(X)
+        jobs = [
+            (column, self._get_distribution_for_column(column_name), column_name)
+            for column_name, column in X.items()
+        ]
+        logger.info(f"Fitting {len(jobs)} marginals on {min(self.n_jobs, len(jobs))} workers")
+        with create_process_pool(min(self.n_jobs, len(jobs))) as pool:
+            univariates = list(pool.map(_fit_univariate, jobs))
+        return list(X.columns), univariates
+
+
+class ParallelGaussianCopulaSynthesizer(GaussianCopulaSynthesizer):
+    """``GaussianCopulaSynthesizer`` whose copula fits the column marginals in parallel"""
+
+    def _initialize_model(self, numerical_distributions):
+        return ParallelGaussianMultivariate(distribution=numerical_distributions)
+
+
+def select_numerical_distributions(
+    data: pd.DataFrame,
+    columns: List[str],
+    distribution: str = 'parametric',
+    n_jobs: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    Pick the best-fitting marginal (lowest KS statistic) for each numerical column.
+
+    Args:
+        data: Training data
+        columns: Numerical columns to consider
+        distribution: GaussianCopulaWrapper mode, selects the candidate family
+        n_jobs: Number of worker processes
+
+    Returns:
+        Mapping column -> SDV distribution name, for ``numerical_distributions``
+    """
+    candidates = DISTRIBUTION_CANDIDATES.get(distribution, DISTRIBUTION_CANDIDATES['parametric'])
+    if len(candidates) == 1:
+        return {col: candidates[0] for col in columns}
+
+    jobs = []
+    for col in columns:
+        values = pd.to_numeric(data[col], errors='coerce').dropna().to_numpy(dtype=float)
+        if len(values) > 1 and np.ptp(values) > 0:
+            jobs.append((col, values, candidates))
+
+    n_jobs = n_jobs if n_jobs is not None else default_max_workers()
+    if not _worth_parallel(n_jobs, len(data), len(jobs)):
+        results = [_select_column_distribution(job) for job in jobs]
+    else:
+        with create_process_pool(min(n_jobs, len(jobs))) as pool:
+            results = list(pool.map(_select_column_distribution, jobs))
+
+    return {col: name for col, name in results if name is not None}
@@ -0,0 +1,253 @@
+"""
+Multi-table (relational) synthesizer.
+
+A dataset group is a set of tables linked by declared primary and foreign
+keys. Every table gets its own single-table model; the number of children of
+each parent row is learned by the parent's model as an extra column, so
+sampling walks the tables in topological order: parent rows first, then
+exactly that many child rows per parent with the foreign key pointing at it.
+Keys are regenerated as integer sequences and never modeled.
+
+Once the child-count columns are added the per-table models are independent,
+so they are fitted in parallel worker processes. Tables are sampled and
+written to CSV in chunks; only the generated keys (and child counts of parent
+tables) stay in memory, so large child tables are streamed to disk.
+"""
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.parallel import create_process_pool, default_max_workers
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the parent-table columns holding the number of children per row
+CHILD_COUNT_PREFIX = "__children__"
+
+# Rows sampled and written at once
+SAMPLE_CHUNK_ROWS = 50000
+
+
+def _child_count_column(child_table: str) -> str:
+    return f"{CHILD_COUNT_PREFIX}{child_table}"
+
+
+def _fit_table_model(job):
+    """Worker: train the single-table model of one table"""
+    from app.ai.models.model_factory import get_model_wrapper
+
+    table_name, model_type, hyperparameters, data = job
+    model = get_model_wrapper(model_type, hyperparameters)
+    asyncio.run(model.train(data))
+    return table_name, model
+
+
+class RelationalSynthesizer:
+    """
+    Synthesizer for a group of tables linked by primary / foreign keys.
+
+    Args:
+        model_type: Single-table model used for every table (see model_factory)
+        hyperparameters: Hyperparameters of the single-table models
+        primary_keys: Table name -> primary key column
+        relationships: List of {"parent_table", "child_table", "foreign_key"}.
+            When a table has several parents, the first relationship drives
+            its row count and the other foreign keys are drawn uniformly among
+            the generated parent keys.
+        n_jobs: Worker processes used to fit the tables
+    """
+
+    def __init__(
+        self,
+        model_type: str,
+        hyperparameters: Optional[Dict[str, Any]] = None,
+        primary_keys: Optional[Dict[str, str]] = None,
+        relationships: Optional[List[Dict[str, str]]] = None,
+        n_jobs: Optional[int] = None
+    ):
+        self.model_type = model_type
+        self.hyperparameters = hyperparameters or {}
+        self.primary_keys = primary_keys or {}
+        self.relationships = relationships or []
+        self.n_jobs = n_jobs if n_jobs is not None else default_max_workers()
+        self.order: List[str] = []
+        self.columns: Dict[str, List[str]] = {}
+        self.table_sizes: Dict[str, int] = {}
+        self.models: Dict[str, Any] = {}
+
+    def _parent_relationships(self, table: str) -> List[Dict[str, str]]:
+        return [rel for rel in self.relationships if rel["child_table"] == table]
+
+    def _count_relationships(self, table: str) -> List[Dict[str, str]]:
+        """Relationships whose child row count is modeled by ``table``"""
+        return [
+            rel for rel in self.relationships
+            if rel["parent_table"] == table and self._parent_relationships(rel["child_table"])[0] is rel
+        ]
+
+    def _topological_order(self, tables: List[str]) -> List[str]:
+        order, remaining = [], list(tables)
+        while remaining:
+            ready = [
+                t for t in remaining
+                if all(rel["parent_table"] in order for rel in self._parent_relationships(t))
+            ]
+            if not ready:
+                raise ValueError("Relationships between tables form a cycle")
+            order.extend(ready)
+            remaining = [t for t in remaining if t not in ready]
+        return order
+
+    def _validate(self, tables: Dict[str, pd.DataFrame]) -> None:
+        for table, pk in self.primary_keys.items():
+            if table not in tables or pk not in tables[table].columns:
+                raise ValueError(f"Primary key {table}.{pk} not found")
+            if not tables[table][pk].is_unique:
+                raise ValueError(f"Primary key {table}.{pk} has duplicate values")
+        for rel in self.relationships:
+            child = tables.get(rel["child_table"])
+            if child is None or rel["foreign_key"] not in child.columns:
+                raise ValueError(f"Foreign key {rel['child_table']}.{rel['foreign_key']} not found")
+            if rel["parent_table"] not in self.primary_keys:
+                raise ValueError(f"Parent table {rel['parent_table']} has no primary key")
+
+    async def fit(self, tables: Dict[str, pd.DataFrame]) -> None:
+        """
+        Fit one model per table, in parallel.
+
+        Args:
+            tables: Table name -> data
+        """
+        self._validate(tables)
+        self.order = self._topological_order(list(tables))
+        self.columns = {name: list(df.columns) for name, df in tables.items()}
+        self.table_sizes = {name: len(df) for name, df in tables.items()}
+
+        training = {}
+        for name in self.order:
+            df = tables[name]
+            key_columns = [self.primary_keys[name]] if name in self.primary_keys else []
+            key_columns += [rel["foreign_key"] for rel in self._parent_relationships(name)]
+            data = df.drop(columns=key_columns).reset_index(drop=True)
+
+            for rel in self._count_relationships(name):
+                child = tables[rel["child_table"]]
+                counts = child.groupby(rel["foreign_key"]).size()
+                parent_keys = df[self.primary_keys[name]]
+                orphans = (~child[rel["foreign_key"]].dropna().isin(parent_keys)).sum()
+                if orphans:
+                    logger.warning(f"{orphans} rows of {rel['child_table']} reference no {name} row and are ignored")
+                data[_child_count_column(rel["child_table"])] = (
+                    parent_keys.map(counts).fillna(0).astype(int).to_numpy()
+                )
+            training[name] = data
+
+        jobs = [
+            (name, self.model_type, self.hyperparameters, data)
+            for name, data in training.items() if len(data.columns)
+        ]
+        self.models = {name: None for name in self.order}
+        n_jobs = min(self.n_jobs, len(jobs))
+        logger.info(f"Fitting {len(jobs)} table models ({self.model_type}) on {max(n_jobs, 1)} workers")
+
+        if n_jobs <= 1:
+            for job in jobs:
+                _, model = await asyncio.get_running_loop().run_in_executor(None, _fit_table_model, job)
+                self.models[job[0]] = model
+        else:
+            loop = asyncio.get_running_loop()
+            with create_process_pool(n_jobs) as pool:
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(pool, _fit_table_model, job) for job in jobs
+                ])
+            self.models.update(dict(results))
+
+    async def _generate_rows(self, table: str, n_rows: int) -> pd.DataFrame:
+        model = self.models[table]
+        if model is None:
+            return pd.DataFrame(index=range(n_rows))
+        return (await model.generate(n_rows)).head(n_rows).reset_index(drop=True)
+
+    async def sample_to_directory(
+        self,
+        output_dir: str,
+        scale: float = 1.0,
+        chunk_rows: int = SAMPLE_CHUNK_ROWS,
+        evaluators: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Sample every table and write it to ``output_dir/<table>.csv``.
+
+        Args:
+            output_dir: Directory receiving one CSV per table
+            scale: Size of the root tables relative to the original ones
+            chunk_rows: Rows generated and appended to the CSV at once
+            evaluators: Table name -> object whose ``update`` receives each written chunk
+
+        Returns:
+            Table name -> {"path", "rows"}
+        """
+        if not self.models:
+            raise ValueError("Model must be trained before generation")
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        rng = np.random.default_rng()
+        keys: Dict[str, np.ndarray] = {}
+        child_counts: Dict[str, np.ndarray] = {}
+        summary = {}
+
+        for name in self.order:
+            parents = self._parent_relationships(name)
+            if parents:
+                counts = child_counts[name]
+                n_rows = int(counts.sum())
+                driving_keys = np.repeat(keys[parents[0]["parent_table"]], counts)
+            else:
+                n_rows = max(int(round(self.table_sizes[name] * scale)), 1)
+                driving_keys = None
+
+            count_relationships = self._count_relationships(name)
+            counts_by_child = {rel["child_table"]: [] for rel in count_relationships}
+            path = output_dir / f"{name}.csv"
+            pk = self.primary_keys.get(name)
+
+            if n_rows == 0:
+                pd.DataFrame(columns=self.columns[name]).to_csv(path, index=False)
+
+            for start in range(0, n_rows, chunk_rows):
+                size = min(chunk_rows, n_rows - start)
+                chunk = await self._generate_rows(name, size)
+
+                for rel in count_relationships:
+                    column = _child_count_column(rel["child_table"])
+                    counts = pd.to_numeric(chunk.pop(column), errors="coerce").fillna(0)
+                    counts_by_child[rel["child_table"]].append(
+                        np.clip(np.round(counts.to_numpy()), 0, None).astype(np.int64)
+                    )
+
+                if pk:
+                    chunk[pk] = np.arange(start + 1, start + size + 1)
+                if parents:
+                    chunk[parents[0]["foreign_key"]] = driving_keys[start:start + size]
+                for rel in parents[1:]:
+                    parent_keys = keys[rel["parent_table"]]
+                    chunk[rel["foreign_key"]] = rng.choice(parent_keys, size) if len(parent_keys) else np.nan
+
+                chunk[self.columns[name]].to_csv(path, mode="a" if start else "w", header=start == 0, index=False)
+                if evaluators and name in evaluators:
+                    evaluators[name].update(chunk[self.columns[name]])
+
+            if pk:
+                keys[name] = np.arange(1, n_rows + 1)
+            for child, parts in counts_by_child.items():
+                child_counts[child] = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+            summary[name] = {"path": str(path), "rows": n_rows}
+            logger.info(f"Sampled {n_rows} rows for table {name}")
+
+        return summary
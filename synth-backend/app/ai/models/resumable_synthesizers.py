@@ -0,0 +1,412 @@
+"""
+CTGAN / TVAE synthesizers whose training loop can be checkpointed and resumed.
+
+The loops below follow the ones of the ``ctgan`` package epoch for epoch; the
+differences are that the state (data transformer, networks, optimizers,
+epoch counter, RNG state) is handed to a ``TrainingCheckpointer`` between
+epochs and restored from it at the start of ``fit``, that the data
+transformer fits its columns in parallel, and that the training matrix is
+kept in compact form (one-hot blocks as integer codes) and expanded per
+mini-batch. An ``epoch_callback`` returning True stops the training after
+that epoch (the model keeps the epochs trained so far). The weights of the
+sampling network can be snapshotted from the callback, and a fitted
+synthesizer copied with the weights of an earlier epoch.
+"""
+import copy
+import logging
+import warnings
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+import torch
+from torch import optim
+from tqdm import tqdm
+
+from ctgan import CTGAN, TVAE
+from ctgan.synthesizers.base import random_state
+from ctgan.synthesizers.ctgan import Discriminator, Generator
+from ctgan.synthesizers.tvae import Decoder, Encoder, _loss_function
+from sdv.single_table import CTGANSynthesizer, TVAESynthesizer
+from sdv.single_table.utils import detect_discrete_columns
+
+from app.ai.models.checkpointing import TrainingCheckpointer
+from app.ai.models.compact_data import CompactDataSampler, CompactTrainingData
+from app.ai.models.parallel_fitting import ParallelDataTransformer
+
+logger = logging.getLogger(__name__)
+
+EpochCallback = Callable[[int, dict], None]
+
+
+def _rng_state() -> dict:
+    return {"numpy": np.random.get_state(), "torch": torch.get_rng_state()}
+
+
+def _restore_rng_state(state: dict) -> None:
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+
+
+class ResumableCTGAN(CTGAN):
+    """CTGAN whose ``fit`` saves and restores its progress through a checkpointer"""
+
+    # Networks used by ``sample``
+    SAMPLING_NETWORKS = ("_generator",)
+    EPOCHS_ATTRIBUTE = "_epochs"
+
+    @random_state
+    def fit(
+        self,
+        train_data,
+        discrete_columns=(),
+        checkpointer: Optional[TrainingCheckpointer] = None,
+        epoch_callback: Optional[EpochCallback] = None
+    ):
+        self._validate_discrete_columns(train_data, discrete_columns)
+        self._validate_null_data(train_data, discrete_columns)
+
+        state = checkpointer.load() if checkpointer else None
+
+        if state is not None:
+            self._transformer = state["transformer"]
+        else:
+            self._transformer = ParallelDataTransformer()
+            self._transformer.fit(train_data, discrete_columns)
+
+        # The encoding draws a mixture mode per value from the transformer's own random state:
+        # checkpoints keep the transformer as it was before encoding, so a resumed run redraws the same modes
+        fitted_transformer = copy.deepcopy(self._transformer)
+        train_data = CompactTrainingData.from_transformer(self._transformer, train_data)
+
+        self._data_sampler = CompactDataSampler(
+            train_data, self._transformer.output_info_list, self._log_frequency
+        )
+
+        data_dim = self._transformer.output_dimensions
+
+        self._generator = Generator(
+            self._embedding_dim + self._data_sampler.dim_cond_vec(), self._generator_dim, data_dim
+        ).to(self._device)
+
+        discriminator = Discriminator(
+            data_dim + self._data_sampler.dim_cond_vec(), self._discriminator_dim, pac=self.pac
+        ).to(self._device)
+
+        optimizerG = optim.Adam(
+            self._generator.parameters(),
+            lr=self._generator_lr,
+            betas=(0.5, 0.9),
+            weight_decay=self._generator_decay,
+        )
+
+        optimizerD = optim.Adam(
+            discriminator.parameters(),
+            lr=self._discriminator_lr,
+            betas=(0.5, 0.9),
+            weight_decay=self._discriminator_decay,
+        )
+
+        start_epoch = 0
+        self.loss_values = pd.DataFrame(columns=['Epoch', 'Generator Loss', 'Discriminator Loss'])
+
+        if state is not None:
+            self._generator.load_state_dict(state["generator"])
+            discriminator.load_state_dict(state["discriminator"])
+            optimizerG.load_state_dict(state["optimizer_g"])
+            optimizerD.load_state_dict(state["optimizer_d"])
+            self.loss_values = state["loss_values"]
+            _restore_rng_state(state["rng"])
+            start_epoch = state["epoch"] + 1
+
+        mean = torch.zeros(self._batch_size, self._embedding_dim, device=self._device)
+        std = mean + 1
+
+        steps_per_epoch = max(len(train_data) // self._batch_size, 1)
+        epoch_iterator = tqdm(range(start_epoch, self._epochs), disable=(not self._verbose))
+
+        for i in epoch_iterator:
+            for _ in range(steps_per_epoch):
+                loss_d, loss_g = self._train_step(
+                    train_data, discriminator, optimizerG, optimizerD, mean, std
+                )
+
+            generator_loss = loss_g.detach().cpu().item()
+            discriminator_loss = loss_d.detach().cpu().item()
+
+            epoch_loss_df = pd.DataFrame({
+                'Epoch': [i],
+                'Generator Loss': [generator_loss],
+                'Discriminator Loss': [discriminator_loss],
+            })
+            if not self.loss_values.empty:
+                self.loss_values = pd.concat([self.loss_values, epoch_loss_df]).reset_index(
+                    drop=True
+                )
+            else:
+                self.loss_values = epoch_loss_df
+
+            if checkpointer and checkpointer.should_save(i, self._epochs):
+                checkpointer.save({
+                    "epoch": i,
+                    "transformer": fitted_transformer,
+                    "generator": self._generator.state_dict(),
+                    "discriminator": discriminator.state_dict(),
+                    "optimizer_g": optimizerG.state_dict(),
+                    "optimizer_d": optimizerD.state_dict(),
+                    "loss_values": self.loss_values,
+                    "rng": _rng_state(),
+                })
+
+            if epoch_callback and epoch_callback(i, {
+                "generator_loss": generator_loss,
+                "discriminator_loss": discriminator_loss,
+            }):
+                logger.info(f"Training stopped after epoch {i + 1}/{self._epochs}")
+                break
+
+    def _train_step(self, train_data, discriminator, optimizerG, optimizerD, mean, std):
+        """Run the discriminator steps and one generator step on a mini-batch"""
+        for _ in range(self._discriminator_steps):
+            fakez = torch.normal(mean=mean, std=std)
+
+            condvec = self._data_sampler.sample_condvec(self._batch_size)
+            if condvec is None:
+                c1, m1, col, opt = None, None, None, None
+                real = self._data_sampler.sample_data(train_data, self._batch_size, col, opt)
+            else:
+                c1, m1, col, opt = condvec
+                c1 = torch.from_numpy(c1).to(self._device)
+                m1 = torch.from_numpy(m1).to(self._device)
+                fakez = torch.cat([fakez, c1], dim=1)
+
+                perm = np.arange(self._batch_size)
+                np.random.shuffle(perm)
+                real = self._data_sampler.sample_data(
+                    train_data, self._batch_size, col[perm], opt[perm]
+                )
+                c2 = c1[perm]
+
+            fake = self._generator(fakez)
+            fakeact = self._apply_activate(fake)
+
+            real = torch.from_numpy(real.astype('float32')).to(self._device)
+
+            if c1 is not None:
+                fake_cat = torch.cat([fakeact, c1], dim=1)
+                real_cat = torch.cat([real, c2], dim=1)
+            else:
+                real_cat = real
+                fake_cat = fakeact
+
+            y_fake = discriminator(fake_cat)
+            y_real = discriminator(real_cat)
+
+            pen = discriminator.calc_gradient_penalty(real_cat, fake_cat, self._device, self.pac)
+            loss_d = -(torch.mean(y_real) - torch.mean(y_fake))
+
+            optimizerD.zero_grad(set_to_none=False)
+            pen.backward(retain_graph=True)
+            loss_d.backward()
+            optimizerD.step()
+
+        fakez = torch.normal(mean=mean, std=std)
+        condvec = self._data_sampler.sample_condvec(self._batch_size)
+
+        if condvec is None:
+            c1, m1, col, opt = None, None, None, None
+        else:
+            c1, m1, col, opt = condvec
+            c1 = torch.from_numpy(c1).to(self._device)
+            m1 = torch.from_numpy(m1).to(self._device)
+            fakez = torch.cat([fakez, c1], dim=1)
+
+        fake = self._generator(fakez)
+        fakeact = self._apply_activate(fake)
+
+        if c1 is not None:
+            y_fake = discriminator(torch.cat([fakeact, c1], dim=1))
+        else:
+            y_fake = discriminator(fakeact)
+
+        if condvec is None:
+            cross_entropy = 0
+        else:
+            cross_entropy = self._cond_loss(fake, c1, m1)
+
+        loss_g = -torch.mean(y_fake) + cross_entropy
+
+        optimizerG.zero_grad(set_to_none=False)
+        loss_g.backward()
+        optimizerG.step()
+
+        return loss_d, loss_g
+
+
+class ResumableTVAE(TVAE):
+    """TVAE whose ``fit`` saves and restores its progress through a checkpointer"""
+
+    # Networks used by ``sample``
+    SAMPLING_NETWORKS = ("decoder",)
+    EPOCHS_ATTRIBUTE = "epochs"
+
+    @random_state
+    def fit(
+        self,
+        train_data,
+        discrete_columns=(),
+        checkpointer: Optional[TrainingCheckpointer] = None,
+        epoch_callback: Optional[EpochCallback] = None
+    ):
+        state = checkpointer.load() if checkpointer else None
+
+        if state is not None:
+            self.transformer = state["transformer"]
+        else:
+            self.transformer = ParallelDataTransformer()
+            self.transformer.fit(train_data, discrete_columns)
+
+        # The encoding draws a mixture mode per value from the transformer's own random state:
+        # checkpoints keep the transformer as it was before encoding, so a resumed run redraws the same modes
+        fitted_transformer = copy.deepcopy(self.transformer)
+        train_data = CompactTrainingData.from_transformer(self.transformer, train_data)
+        n_rows = len(train_data)
+
+        data_dim = self.transformer.output_dimensions
+        encoder = Encoder(data_dim, self.compress_dims, self.embedding_dim).to(self._device)
+        self.decoder = Decoder(self.embedding_dim, self.decompress_dims, data_dim).to(self._device)
+        optimizerAE = optim.Adam(
+            list(encoder.parameters()) + list(self.decoder.parameters()), weight_decay=self.l2scale
+        )
+
+        start_epoch = 0
+        self.loss_values = pd.DataFrame(columns=['Epoch', 'Batch', 'Loss'])
+
+        if state is not None:
+            encoder.load_state_dict(state["encoder"])
+            self.decoder.load_state_dict(state["decoder"])
+            optimizerAE.load_state_dict(state["optimizer"])
+            self.loss_values = state["loss_values"]
+            _restore_rng_state(state["rng"])
+            start_epoch = state["epoch"] + 1
+
+        iterator = tqdm(range(start_epoch, self.epochs), disable=(not self.verbose))
+
+        for i in iterator:
+            loss_values = []
+            batch = []
+            permutation = torch.randperm(n_rows).numpy()
+            for id_, start in enumerate(range(0, n_rows, self.batch_size)):
+                optimizerAE.zero_grad()
+                real = torch.from_numpy(
+                    train_data[permutation[start:start + self.batch_size]]
+                ).to(self._device)
+                mu, std, logvar = encoder(real)
+                eps = torch.randn_like(std)
+                emb = eps * std + mu
+                rec, sigmas = self.decoder(emb)
+                loss_1, loss_2 = _loss_function(
+                    rec,
+                    real,
+                    sigmas,
+                    mu,
+                    logvar,
+                    self.transformer.output_info_list,
+                    self.loss_factor,
+                )
+                loss = loss_1 + loss_2
+                loss.backward()
+                optimizerAE.step()
+                self.decoder.sigma.data.clamp_(0.01, 1.0)
+
+                batch.append(id_)
+                loss_values.append(loss.detach().cpu().item())
+
+            epoch_loss_df = pd.DataFrame({
+                'Epoch': [i] * len(batch),
+                'Batch': batch,
+                'Loss': loss_values,
+            })
+            if not self.loss_values.empty:
+                self.loss_values = pd.concat([self.loss_values, epoch_loss_df]).reset_index(
+                    drop=True
+                )
+            else:
+                self.loss_values = epoch_loss_df
+
+            if checkpointer and checkpointer.should_save(i, self.epochs):
+                checkpointer.save({
+                    "epoch": i,
+                    "transformer": fitted_transformer,
+                    "encoder": encoder.state_dict(),
+                    "decoder": self.decoder.state_dict(),
+                    "optimizer": optimizerAE.state_dict(),
+                    "loss_values": self.loss_values,
+                    "rng": _rng_state(),
+                })
+
+            if epoch_callback and epoch_callback(i, {"loss": float(np.mean(loss_values)) if loss_values else None}):
+                logger.info(f"Training stopped after epoch {i + 1}/{self.epochs}")
+                break
+
+
+class _ResumableFitMixin:
+    """
+    Replaces the ``_fit`` of an SDV single-table synthesizer so that it trains
+    one of the resumable models above. ``checkpointer`` and ``epoch_callback``
+    are set by the caller before ``fit`` and are never pickled with the model.
+    """
+
+    model_class = None
+    checkpointer: Optional[TrainingCheckpointer] = None
+    epoch_callback: Optional[EpochCallback] = None
+
+    def _fit(self, processed_data):
+        transformers = self._data_processor._hyper_transformer.field_transformers
+        discrete_columns = detect_discrete_columns(self.metadata, processed_data, transformers)
+        self._model = self.model_class(**self._model_kwargs)
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='.*Attempting to run cuBLAS.*')
+            self._model.fit(
+                processed_data,
+                discrete_columns=discrete_columns,
+                checkpointer=self.checkpointer,
+                epoch_callback=self.epoch_callback,
+            )
+
+    def snapshot(self) -> dict:
+        """Weights of the sampling networks at the current epoch (callable from ``epoch_callback``)"""
+        return {
+            name: copy.deepcopy(getattr(self._model, name).state_dict())
+            for name in self.model_class.SAMPLING_NETWORKS
+        }
+
+    def from_snapshot(self, snapshot: dict, epochs: int):
+        """Copy of this fitted synthesizer sampling with the weights of ``snapshot``, taken after ``epochs`` epochs"""
+        synthesizer = copy.copy(self)
+        synthesizer._model = copy.copy(self._model)
+        for name, weights in snapshot.items():
+            network = copy.deepcopy(getattr(self._model, name))
+            network.load_state_dict(weights)
+            setattr(synthesizer._model, name, network)
+        setattr(synthesizer._model, self.model_class.EPOCHS_ATTRIBUTE, epochs)
+        synthesizer._model_kwargs = {**self._model_kwargs, 'epochs': epochs}
+        synthesizer.checkpointer = None
+        synthesizer.epoch_callback = None
+        # A snapshot taken from ``epoch_callback`` samples before the fit is over
+        synthesizer._fitted = True
+        return synthesizer
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("checkpointer", None)
+        state.pop("epoch_callback", None)
+        return state
+
+
+class ResumableCTGANSynthesizer(_ResumableFitMixin, CTGANSynthesizer):
+    model_class = ResumableCTGAN
+
+
+class ResumableTVAESynthesizer(_ResumableFitMixin, TVAESynthesizer):
+    model_class = ResumableTVAE
@@ -2,8 +2,10 @@ import pandas as pd
 import logging
 from typing import Optional, Dict, Any
 from sdv.single_table import TVAESynthesizer
+from sdv.errors import SynthesizerInputError
 from sdv.metadata import SingleTableMetadata
 from app.ai.models.base_wrapper import BaseModelWrapper
+from app.ai.models.resumable_synthesizers import ResumableTVAESynthesizer
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +48,9 @@ class TVAEWrapper(BaseModelWrapper):
             except Exception as e:
                 logger.warning(f"Could not set learning rate parameter: {e}")
             
-            self.model = TVAESynthesizer(**tvae_params)
+            self.model = ResumableTVAESynthesizer(**tvae_params)
+            self.model.checkpointer = self.checkpointer
+            self.model.epoch_callback = self.epoch_callback
             
             # Fit the model
             logger.info("Starting model fitting...")
@@ -93,7 +97,11 @@ class TVAEWrapper(BaseModelWrapper):
         """Load a pre-trained model"""
         try:
             logger.info(f"Loading TVAE model from {path}")
-            self.model = TVAESynthesizer.load(path)
+            try:
+                self.model = ResumableTVAESynthesizer.load(path)
+            except SynthesizerInputError:
+                # Model saved before training became resumable
+                self.model = TVAESynthesizer.load(path)
             logger.info("Model loaded successfully")
         except Exception as e:
             error_msg = f"TVAE load error: {str(e)}"
@@ -1,22 +1,47 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session, joinedload
+import asyncio
+import math
 import pandas as pd
 import os
 import io
 import random
+import shutil
+import tempfile
+import time
 import requests
 from pathlib import Path
-from itertools import product
+from itertools import product, cycle
 from typing import Dict, Any, Tuple, List, Optional
 import logging
 from datetime import datetime
 from contextlib import asynccontextmanager
 
+from app.core.config import settings
+
 from app.models.DataRequest import DataRequest
 from app.models.RequestParameters import RequestParameters
 from app.models.UploadedDataset import UploadedDataset
+from app.models.DatasetGroup import DatasetGroup
 from app.ai.services.quality_validator import QualityValidator
-from app.ai.models.model_factory import get_model_wrapper
+from app.ai.models.model_factory import get_model_wrapper, get_relational_model
+from app.ai.models.checkpointing import TrainingCheckpointer
+from app.ai.services.training_config import resolve_training_params, estimate_transformed_width
+from app.ai.services.trial_executor import TrialExecutor, run_model_trial
+from app.ai.services.trial_cache import dataset_fingerprint, evaluation_scheme, evict_trial_models, params_key
+from app.ai.services.optimization_study import OptimizationStudy, has_completed_study
+from app.ai.services.budget_scheduler import TrialBudget
+from app.ai.services.successive_halving import (
+    SuccessiveHalvingSearch, MIN_EPOCH_BUDGET, DEFAULT_ETA, budget_ladder, hyperband_brackets
+)
+from app.ai.services.data_fidelity import SubsampleFidelitySearch, fidelity_fractions, stratified_subsample
+from app.ai.services.evaluation_holdout import EvaluationHoldout, get_evaluation_holdout
+from app.ai.services.warm_start import register_dataset, leaderboard, warm_start_configs
+from app.ai.services.trial_pruner import TrialPruner
+from app.ai.services.pareto import pareto_front, fastest_within
+from app.ai.services.epoch_prefix import group_epoch_prefixes
+from app.ai.services.cost_model import record_stage, trial_cost_prior
+from app.ai.services.streaming_quality import StreamingQualityEvaluator
 from app.services.DataRequestService import DataRequestService
 from app.services.DatasetService import DatasetService
 from app.services.NotificationService import NotificationService
@@ -30,10 +55,24 @@ CTGAN_HYPERPARAMETERS = [
     "epochs", "batch_size", "learning_rate", "discriminator_lr", "generator_lr"
 ]
 
+# SDV's TVAESynthesizer has no learning rate
 TVAE_HYPERPARAMETERS = [
-    "epochs", "batch_size", "learning_rate", "embedding_dim", "compressor_dim"
+    "epochs", "batch_size", "embedding_dim", "compressor_dim"
+]
+
+BAYESIAN_NETWORK_HYPERPARAMETERS = [
+    "n_bins", "max_parents"
 ]
 
+# Fast model trained once at the start of an optimization run as a reference score
+BASELINE_MODEL_TYPE = "bayesian_network"
+
+# Search types that train most configurations with a reduced epoch budget
+MULTI_FIDELITY_SEARCH_TYPES = ("hyperband", "asha")
+
+# Search type that ranks configurations on row subsamples before training on the full data
+SUBSAMPLE_SEARCH_TYPE = "subsample"
+
 class AIProcessingService:
     def __init__(self):
         self.quality_validator = QualityValidator()
@@ -47,6 +86,8 @@ class AIProcessingService:
         self.data_dir = self.base_path / "data"
         self.dataset_dir = self.data_dir / "datasets"
         self.synthetic_dir = self.data_dir / "synthetic"
+        self.checkpoint_dir = self.data_dir / "checkpoints"
+        self.trial_model_dir = self.data_dir / "trial_models"
         
         # Create necessary directories
         self._ensure_directories()
@@ -55,8 +96,38 @@ class AIProcessingService:
         """Ensure all required directories exist"""
         self.dataset_dir.mkdir(parents=True, exist_ok=True)
         self.synthetic_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"Directories initialized: {self.dataset_dir}, {self.synthetic_dir}")
 
+    def _make_checkpointer(
+        self,
+        request_id: int,
+        stage: str,
+        model_type: str,
+        hyperparameters: Dict[str, Any],
+        data: pd.DataFrame
+    ) -> TrainingCheckpointer:
+        """
+        Build the checkpointer of one training run of a request.
+        The directory is derived from the request id and stage so that a
+        restarted job finds the checkpoint of the run it was in.
+        """
+        return TrainingCheckpointer(
+            directory=str(self.checkpoint_dir / f"request_{request_id}" / stage),
+            signature={
+                "model_type": model_type,
+                "hyperparameters": hyperparameters,
+                "shape": list(data.shape),
+                "columns": [str(c) for c in data.columns]
+            },
+            every_epochs=settings.CHECKPOINT_EVERY_EPOCHS,
+            every_minutes=settings.CHECKPOINT_EVERY_MINUTES
+        )
+
+    def clear_checkpoints(self, request_id: int) -> None:
+        """Remove every checkpoint of a request once it no longer needs resuming"""
+        TrainingCheckpointer(str(self.checkpoint_dir / f"request_{request_id}")).clear()
+
     def optimize_hyperparameters(search_type, hyperparameters, n_trials):
         if search_type == "grid":
             # Implémentation de la recherche par grille
@@ -93,7 +164,9 @@ class AIProcessingService:
         data: pd.DataFrame,
         params: RequestParameters,
         search_type: str = "grid",
-        n_random: int = 5
+        n_random: int = 5,
+        request_id: Optional[int] = None,
+        db: Optional[Session] = None
     ) -> Tuple[Any, Dict[str, Any], float]:
         """
         Search for optimal hyperparameters for the model
@@ -101,89 +174,773 @@ class AIProcessingService:
         Args:
             data: DataFrame containing training data
             params: Request parameters
-            search_type: Search type ("grid" or "random")
-            n_random: Number of trials for random search
+            search_type: Search type ("grid", "random", "hyperband", "asha" or "subsample")
+            n_random: Number of trials for random search (configurations started by ASHA)
+            request_id: Request being processed, enables training checkpoints
+            db: Database session; with request_id, trials are persisted and a
+                restarted search skips the trials already completed
             
         Returns:
             Tuple containing (best_model, best_parameters, best_score)
         """
         # Parameter grid to test
-        param_grid = {
-            'epochs': [300, 500, 1000],
-            'batch_size': [500, 1000, 2000],
-            'learning_rate': [0.001, 0.0001, 0.00001]
-        }
+        param_grid = self._get_param_grid(params.model_type)
+
+        # Trials already run on the same data are served from the trial cache
+        fingerprint = dataset_fingerprint(data)
+        artifact_dir = str(self.trial_model_dir / fingerprint[:16])
+
+        # Every trial (and the baseline) is scored on the same holdout, with a fixed synthetic sample size
+        holdout = get_evaluation_holdout(data, fingerprint)
+
+        # Already optimized dataset (a search of this model type completed on it): its best
+        # configuration is reused without new trials; otherwise the best configurations of
+        # similar datasets, scored on the same scheme, are tried first
+        warm_start = []
+        if settings.WARM_START_ENABLED:
+            register_dataset(fingerprint, data)
+            best_known = await self._reuse_best_known(
+                data, params.model_type, param_grid, fingerprint, artifact_dir, holdout,
+                params.optimization_quality_tolerance
+            )
+            if best_known is not None:
+                return best_known
+            warm_start = warm_start_configs(
+                fingerprint, data, params.model_type, list(param_grid), settings.WARM_START_CONFIGS,
+                scheme=evaluation_scheme(holdout.evaluation)
+            )
 
         best_score = -float('inf')
         best_params = None
         best_model = None
         tested_combinations = []
 
+        baseline_score = await self._evaluate_baseline(data, params.model_type, holdout)
+        if baseline_score is not None:
+            tested_combinations.append({
+                'params': {'model_type': BASELINE_MODEL_TYPE},
+                'score': baseline_score,
+                'baseline': True
+            })
+
+        if search_type in MULTI_FIDELITY_SEARCH_TYPES:
+            if 'epochs' in param_grid:
+                study = self._open_study(db, request_id, search_type, param_grid, fingerprint=fingerprint)
+                return await self._successive_halving_search(
+                    data, params, param_grid, search_type, n_random, request_id,
+                    baseline_score, tested_combinations, fingerprint, artifact_dir, study, holdout
+                )
+            logger.info(f"{params.model_type} has no epoch budget, running a grid search instead of {search_type}")
+
+        if search_type == SUBSAMPLE_SEARCH_TYPE:
+            fractions = fidelity_fractions(len(data))
+            if len(fractions) > 1:
+                study = self._open_study(db, request_id, search_type, param_grid, fingerprint=fingerprint)
+                return await self._subsample_search(
+                    data, params, param_grid, fractions, request_id,
+                    baseline_score, tested_combinations, fingerprint, study, holdout
+                )
+            logger.info(f"{len(data)} rows are too few to subsample, running a grid search instead")
+
         # Generate parameter combinations
         param_combinations = self._generate_param_combinations(
-            param_grid, search_type, n_random
+            param_grid, search_type, n_random, seed=request_id, warm_start=warm_start
         )
 
-        logger.info(f"Testing {len(param_combinations)} parameter combinations...")
+        study = self._open_study(db, request_id, search_type, param_grid, len(param_combinations), fingerprint)
+        completed_trials = study.completed_trials() if study else {}
 
-        # Test each combination
-        for i, (epochs, batch_size, learning_rate) in enumerate(param_combinations):
-            current_params = {
-                "epochs": epochs,
-                "batch_size": batch_size,
-                "learning_rate": learning_rate
-            }
-            
-            logger.info(f"Testing combination {i+1}/{len(param_combinations)}: {current_params}")
-            
-            try:
-                # Create and train model
-                model = get_model_wrapper(
-                    model_type=params.model_type,
-                    hyperparameters=current_params
-                )
-
-                await model.train(data)
-                synthetic_data = await model.generate(len(data))
-                
-                # Evaluate quality
-                quality_score = self.quality_validator.evaluate(
-                    real_data=data,
-                    synthetic_data=synthetic_data
-                )
+        pending = []
+        for i, combination in enumerate(param_combinations):
+            current_params = dict(zip(param_grid.keys(), combination))
 
+            # Completed before a restart: only the score is needed, the model is reloaded if it wins
+            previous = completed_trials.get(params_key(current_params))
+            if previous is not None:
+                if previous['score'] is None:
+                    # Pruned before the restart
+                    continue
+                # Scored with the epochs actually trained (fewer when stopped at the deadline)
                 tested_combinations.append({
-                    'params': current_params.copy(),
-                    'score': quality_score
+                    'params': previous['trained_params'].copy(),
+                    'score': previous['score'],
+                    'training_time': previous['training_time'],
+                    'memory_usage': previous['memory_usage']
                 })
+                if previous['score'] > best_score:
+                    best_score = previous['score']
+                    best_params = previous['trained_params'].copy()
+                    best_model = None
+                continue
+            pending.append(current_params)
 
-                logger.info(f"Quality score: {quality_score:.4f}")
+        if completed_trials:
+            logger.info(
+                f"{len(param_combinations) - len(pending)} trials already completed, {len(pending)} remaining"
+            )
 
-                # Check if this is the best score
-                if quality_score > best_score:
-                    best_score = quality_score
-                    best_params = current_params.copy()
-                    best_model = model
-                    logger.info(f"New best score: {quality_score:.4f}")
+        # Combinations differing only by their epochs share one run up to the largest value,
+        # the smaller values are scored on snapshots taken on the way
+        trial_numbers = {
+            params_key(dict(zip(param_grid.keys(), combination))): i + 1
+            for i, combination in enumerate(param_combinations)
+        }
+        jobs = []
+        for group in group_epoch_prefixes(pending):
+            current_params = group['params']
+            trial_number = trial_numbers[params_key(current_params)]
+            checkpointer = None
+            if request_id is not None:
+                checkpointer = self._make_checkpointer(
+                    request_id, f"trial_{trial_number - 1}", params.model_type, current_params, data
+                )
+            jobs.append({
+                'model_type': params.model_type,
+                'params': current_params,
+                'data': data,
+                'checkpointer': checkpointer,
+                'fingerprint': fingerprint,
+                'artifact_dir': artifact_dir,
+                'holdout': holdout,
+                'snapshot_epochs': group['snapshot_epochs'],
+                'trial_number': trial_number,
+                'grid_params': current_params
+            })
 
-            except Exception as e:
-                logger.error(f"Error testing parameters {current_params}: {str(e)}")
-                continue
+        executor = TrialExecutor()
+        budget = self._make_budget(
+            study, completed_trials, executor, data, params.model_type
+        )
+        logger.info(
+            f"Testing {len(pending)} parameter combinations in {len(jobs)} training runs "
+            f"on {executor.max_workers} workers..."
+        )
+
+        # Trials run concurrently: whenever a worker frees up, the next trial is planned
+        # against the remaining time budget and started; results arrive in completion order.
+        # Trials with epochs are pruned when the holdout score of a probe of their current weights
+        # falls behind the scores of the finished trials at the same epoch
+        completed = 0
+        skipped = 0
+        pruned = 0
+        curves = []
+        pruning = settings.TRIAL_PRUNING_ENABLED and 'epochs' in param_grid
+        queue = list(jobs)
+        running = {}
+        with executor:
+            while True:
+                while queue and len(running) < executor.max_workers and not budget.exhausted:
+                    job = queue.pop(0)
+                    planned = budget.plan(job['params'], reserved=len(running))
+                    if planned is None:
+                        skipped += 1 + len(job['snapshot_epochs'])
+                        continue
+                    if planned != job['params']:
+                        # A shrunk run never reaches the snapshots above its epochs
+                        reachable = [epochs for epochs in job['snapshot_epochs'] if epochs < planned['epochs']]
+                        skipped += len(job['snapshot_epochs']) - len(reachable)
+                        job = {**job, 'params': planned, 'snapshot_epochs': reachable, 'checkpointer': None}
+                    job = {
+                        **job,
+                        'deadline': budget.training_deadline(),
+                        'pruner': TrialPruner(list(curves)) if pruning else None
+                    }
+                    running[executor.submit(run_model_trial, job)] = job
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    current_params = job['params']
+                    error = future.exception()
+
+                    if error is not None:
+                        completed += 1 + len(job['snapshot_epochs'])
+                        logger.error(f"Error testing parameters {current_params}: {str(error)}")
+                        budget.record(current_params, None)
+                        if study:
+                            study.record(job['trial_number'], job['grid_params'], error=error)
+                        continue
+
+                    # The snapshots of the smaller epoch values come with the run, before its own result
+                    run = future.result()
+                    # Snapshots not reached before the deadline or the pruning of the run
+                    missed = len(job['snapshot_epochs']) - len(run['snapshots'])
+                    if run['pruned']:
+                        pruned += missed
+                    else:
+                        skipped += missed
+                    results = [
+                        (result, trial_numbers[params_key(result['params'])], result['params'])
+                        for result in run['snapshots']
+                    ]
+                    results.append((run, job['trial_number'], job['grid_params']))
+
+                    for result, trial_number, planned_params in results:
+                        completed += 1
+                        # Parameters actually trained (fewer epochs when stopped at the deadline)
+                        current_params = result['params']
+                        quality_score = result['score']
+                        budget.record(current_params, result['training_time'], result['evaluation_time'])
+                        if result['curve']:
+                            curves.append(result['curve'])
+
+                        # Recorded with its planned parameters, the key that a restart looks up
+                        if result['pruned']:
+                            pruned += 1
+                            logger.info(f"Combination {completed}/{len(pending) - skipped} {current_params}: pruned")
+                            if study:
+                                study.record(
+                                    trial_number, planned_params,
+                                    training_time=result['training_time'],
+                                    memory_usage=result['memory_usage'], pruned=True,
+                                    epochs_trained=current_params.get('epochs')
+                                )
+                            continue
+
+                        if study:
+                            study.record(
+                                trial_number, planned_params,
+                                quality_score, result['training_time'], result['memory_usage'],
+                                epochs_trained=current_params.get('epochs')
+                            )
+                        tested_combinations.append({
+                            'params': current_params.copy(),
+                            'score': quality_score,
+                            'training_time': result['training_time'],
+                            'memory_usage': result['memory_usage']
+                        })
+
+                        logger.info(
+                            f"Combination {completed}/{len(pending) - skipped} {current_params}: "
+                            f"quality score {quality_score:.4f}{' (cached)' if result['cached'] else ''}"
+                        )
+
+                        # Check if this is the best score
+                        if quality_score > best_score:
+                            best_score = quality_score
+                            best_params = current_params.copy()
+                            best_model = result['model']
+                            logger.info(f"New best score: {quality_score:.4f}")
+
+        skipped += sum(1 + len(job['snapshot_epochs']) for job in queue)
+        if skipped:
+            logger.info(f"{skipped} combinations skipped to stay within the optimization budget")
+        if pruned:
+            logger.info(f"{pruned} combinations pruned during training")
+
+        if best_model is None and best_params is not None:
+            # The best trial finished before a restart or was served from the trial cache
+            # after its model was evicted: reload or retrain its model
+            logger.info(f"Restoring the model of the best trial {best_params}")
+            best_model = (await self._restore_trial_model(
+                data, params.model_type, best_params, fingerprint, artifact_dir, holdout
+            ))['model']
 
         if best_model is None:
+            if study:
+                study.finish("failed")
             raise HTTPException(
                 status_code=500,
                 detail="No parameter combination worked successfully"
             )
 
+        if study:
+            study.finish()
+
         logger.info(f"Best parameters found: {best_params} with score: {best_score:.4f}")
-        return best_model, best_params, best_score
+        if baseline_score is not None:
+            logger.info(
+                f"Improvement over the {BASELINE_MODEL_TYPE} baseline: {best_score - baseline_score:+.4f}"
+            )
+        return await self._apply_quality_tolerance(
+            data, params, tested_combinations, (best_model, best_params, best_score),
+            fingerprint, artifact_dir, holdout
+        )
+
+    async def _successive_halving_search(
+        self,
+        data: pd.DataFrame,
+        params: RequestParameters,
+        param_grid: Dict[str, List],
+        search_type: str,
+        n_random: int,
+        request_id: Optional[int],
+        baseline_score: Optional[float],
+        tested_combinations: List[Dict[str, Any]],
+        fingerprint: Optional[str] = None,
+        artifact_dir: Optional[str] = None,
+        study: Optional[OptimizationStudy] = None,
+        holdout: Optional[EvaluationHoldout] = None
+    ) -> Tuple[Any, Dict[str, Any], float]:
+        """
+        Hyperband / ASHA search: the non-epoch hyperparameters of the grid are
+        first trained with a small epoch budget and only the best ones are
+        promoted up to the largest epoch value of the grid.
+        Trials are persisted to the study; after a restart the trials already
+        run are served from the trial cache.
+        """
+        configs = [
+            dict(zip([k for k in param_grid if k != 'epochs'], combination))
+            for combination in product(*[v for k, v in param_grid.items() if k != 'epochs'])
+        ]
+        best = {'score': -float('inf'), 'params': None, 'model': None}
+        completed_trials = study.completed_trials() if study else {}
+        executor = TrialExecutor()
+        time_budget = self._make_budget(
+            study, completed_trials, executor, data, params.model_type
+        )
+
+        def make_job(config, budget, trial_index):
+            current_params = {**config, 'epochs': budget}
+            checkpointer = None
+            if request_id is not None:
+                checkpointer = self._make_checkpointer(
+                    request_id, f"{search_type}_{trial_index}", params.model_type, current_params, data
+                )
+            return {
+                'model_type': params.model_type,
+                'params': current_params,
+                'data': data,
+                'checkpointer': checkpointer,
+                'fingerprint': fingerprint,
+                'artifact_dir': artifact_dir,
+                'holdout': holdout,
+                'deadline': time_budget.training_deadline()
+            }
+
+        trial_number = study.next_trial_number() if study else 1
+
+        def on_result(record):
+            nonlocal trial_number
+            result = record['result']
+            planned_params = {**record['config'], 'epochs': record['budget']}
+            current_params = result['params'] if result else planned_params
+            time_budget.record(
+                current_params,
+                result['training_time'] if result else None,
+                result['evaluation_time'] if result else None
+            )
+            if study:
+                study.record(
+                    trial_number, planned_params, record['score'],
+                    result['training_time'] if result else None,
+                    result['memory_usage'] if result else None, record['error'],
+                    epochs_trained=current_params['epochs']
+                )
+            trial_number += 1
+            if record['error'] is not None:
+                return
+            tested_combinations.append({
+                'params': current_params,
+                'score': record['score'],
+                'training_time': result['training_time'],
+                'memory_usage': result['memory_usage']
+            })
+            if record['score'] > best['score']:
+                best.update(score=record['score'], params=current_params, model=record['result']['model'])
+                logger.info(f"New best score: {record['score']:.4f}")
+            # Only the best model is kept in memory
+            record['result'] = None
+
+        search = SuccessiveHalvingSearch(
+            executor=executor,
+            trial_fn=run_model_trial,
+            make_job=make_job,
+            get_score=lambda result: result['score'],
+            min_budget=MIN_EPOCH_BUDGET,
+            max_budget=max(param_grid['epochs']),
+            on_result=on_result,
+            time_budget=time_budget
+        )
+
+        if search_type == "asha":
+            n_configs = max(n_random, search.eta ** (len(search.budgets) - 1))
+            config_cycle = cycle(random.sample(configs, len(configs)))
+            await search.asha(lambda: next(config_cycle), n_configs)
+        else:
+            await search.hyperband(lambda n: random.sample(configs, min(n, len(configs))))
+
+        if study:
+            study.finish("completed" if best['params'] is not None else "failed")
+
+        if best['params'] is None:
+            raise HTTPException(
+                status_code=500,
+                detail="No parameter combination worked successfully"
+            )
+        if best['model'] is None:
+            # Served from the trial cache after its model was evicted
+            best['model'] = (await self._restore_trial_model(
+                data, params.model_type, best['params'], fingerprint, artifact_dir, holdout
+            ))['model']
+
+        full_budget_epochs = len(configs) * sum(param_grid['epochs'])
+        used_epochs = sum(record['budget'] for record in search.records)
+        logger.info(
+            f"Best parameters found: {best['params']} with score: {best['score']:.4f} "
+            f"({used_epochs} epochs trained, {full_budget_epochs} for the full grid)"
+        )
+        if baseline_score is not None:
+            logger.info(
+                f"Improvement over the {BASELINE_MODEL_TYPE} baseline: {best['score'] - baseline_score:+.4f}"
+            )
+        return await self._apply_quality_tolerance(
+            data, params, tested_combinations, (best['model'], best['params'], best['score']),
+            fingerprint, artifact_dir, holdout
+        )
+
+    async def _subsample_search(
+        self,
+        data: pd.DataFrame,
+        params: RequestParameters,
+        param_grid: Dict[str, List],
+        fractions: List[float],
+        request_id: Optional[int],
+        baseline_score: Optional[float],
+        tested_combinations: List[Dict[str, Any]],
+        fingerprint: Optional[str] = None,
+        study: Optional[OptimizationStudy] = None,
+        holdout: Optional[EvaluationHoldout] = None
+    ) -> Tuple[Any, Dict[str, Any], float]:
+        """
+        Multi-fidelity search on rows: every combination of the grid is scored
+        on a small stratified subsample and only the best ones are promoted to
+        larger subsamples, then to the full data. Promotion stops early once
+        the rankings of two subsample sizes agree.
+        Trials are persisted to the study with their ``data_fraction``; after a
+        restart the trials already run are served from the trial cache.
+        """
+        configs = [dict(zip(param_grid.keys(), combination)) for combination in product(*param_grid.values())]
+        best = {'score': -float('inf'), 'params': None, 'model': None}
+        completed_trials = study.completed_trials() if study else {}
+        executor = TrialExecutor()
+        time_budget = self._make_budget(
+            study, completed_trials, executor, data, params.model_type
+        )
+
+        # Fixed seed so that a restarted search draws the same subsamples (and hits the trial cache)
+        subsamples = {}
+        for fraction in fractions:
+            subsample = stratified_subsample(data, fraction, seed=request_id or 0)
+            subsample_fingerprint = fingerprint if fraction >= 1.0 else dataset_fingerprint(subsample)
+            subsamples[fraction] = (subsample, subsample_fingerprint)
+        logger.info(f"Subsample search on {[len(subsamples[f][0]) for f in fractions]} rows")
+
+        def make_job(config, fraction, trial_index):
+            subsample, subsample_fingerprint = subsamples[fraction]
+            checkpointer = None
+            if request_id is not None:
+                checkpointer = self._make_checkpointer(
+                    request_id, f"subsample_{trial_index}", params.model_type, config, subsample
+                )
+            return {
+                'model_type': params.model_type,
+                'params': config,
+                'data': subsample,
+                'checkpointer': checkpointer,
+                'fingerprint': subsample_fingerprint,
+                'artifact_dir': str(self.trial_model_dir / subsample_fingerprint[:16]) if subsample_fingerprint else None,
+                'holdout': holdout,
+                'deadline': time_budget.training_deadline()
+            }
+
+        trial_number = study.next_trial_number() if study else 1
+
+        def on_result(record):
+            nonlocal trial_number
+            result = record['result']
+            current_params = result['params'] if result else record['config']
+            time_budget.record(
+                current_params,
+                result['training_time'] if result else None,
+                result['evaluation_time'] if result else None,
+                data_fraction=record['fraction']
+            )
+            if study:
+                study.record(
+                    trial_number, {**record['config'], 'data_fraction': record['fraction']}, record['score'],
+                    result['training_time'] if result else None,
+                    result['memory_usage'] if result else None, record['error'],
+                    epochs_trained=current_params.get('epochs')
+                )
+            trial_number += 1
+            if record['error'] is not None:
+                return
+            tested_combinations.append({
+                'params': current_params,
+                'score': record['score'],
+                'training_time': result['training_time'],
+                'memory_usage': result['memory_usage'],
+                'data_fraction': record['fraction']
+            })
+            # Only full-data scores are comparable with each other and with the baseline
+            if record['fraction'] >= 1.0 and record['score'] > best['score']:
+                best.update(score=record['score'], params=current_params, model=result['model'])
+                logger.info(f"New best score: {record['score']:.4f}")
+            record['result'] = None
+
+        search = SubsampleFidelitySearch(
+            executor=executor,
+            trial_fn=run_model_trial,
+            make_job=make_job,
+            get_score=lambda result: result['score'],
+            fractions=fractions,
+            on_result=on_result,
+            time_budget=time_budget
+        )
+        await search.run(configs)
+
+        if study:
+            study.finish("completed" if best['params'] is not None else "failed")
+
+        # Models trained on a subsample are never delivered
+        for _, subsample_fingerprint in subsamples.values():
+            if subsample_fingerprint and subsample_fingerprint != fingerprint:
+                evict_trial_models(subsample_fingerprint, 0)
+
+        if best['params'] is None:
+            raise HTTPException(
+                status_code=500,
+                detail="No parameter combination worked successfully"
+            )
+        artifact_dir = str(self.trial_model_dir / fingerprint[:16]) if fingerprint else None
+        if best['model'] is None:
+            # Served from the trial cache after its model was evicted
+            best['model'] = (await self._restore_trial_model(
+                data, params.model_type, best['params'], fingerprint, artifact_dir, holdout
+            ))['model']
+
+        full_trials = sum(1 for record in search.records if record['fraction'] >= 1.0)
+        logger.info(
+            f"Best parameters found: {best['params']} with score: {best['score']:.4f} "
+            f"({full_trials} of {len(configs)} combinations trained on the full data)"
+        )
+        if baseline_score is not None:
+            logger.info(
+                f"Improvement over the {BASELINE_MODEL_TYPE} baseline: {best['score'] - baseline_score:+.4f}"
+            )
+        return await self._apply_quality_tolerance(
+            data, params, tested_combinations, (best['model'], best['params'], best['score']),
+            fingerprint, artifact_dir, holdout
+        )
+
+    async def _reuse_best_known(
+        self,
+        data: pd.DataFrame,
+        model_type: str,
+        param_grid: Dict[str, List],
+        fingerprint: str,
+        artifact_dir: str,
+        holdout: EvaluationHoldout,
+        quality_tolerance: Optional[float] = None
+    ) -> Optional[Tuple[Any, Dict[str, Any], float]]:
+        """
+        Best configuration already scored on this exact dataset (same holdout),
+        with its model reloaded from the trial cache, or None unless a search
+        of this model type completed on the dataset (trials cached by an
+        interrupted or smaller search do not make it optimized). With a
+        quality tolerance, the fastest configuration scoring within it of the
+        best one is reused instead.
+        """
+        if not has_completed_study(fingerprint, model_type):
+            return None
+        known = leaderboard(
+            fingerprint, model_type, holdout.evaluation, limit=None if quality_tolerance else 1
+        )
+        known = [entry for entry in known if set(entry['params']) == set(param_grid)]
+        best_known = fastest_within(known, quality_tolerance or 0.0)
+        if best_known is None:
+            return None
+        best_params = best_known['params']
+        logger.info(
+            f"Dataset already optimized, reusing its "
+            f"{'fastest' if quality_tolerance else 'best'} configuration {best_params} "
+            f"(score {best_known['score']:.4f})"
+        )
+        result = await self._restore_trial_model(data, model_type, best_params, fingerprint, artifact_dir, holdout)
+        return result['model'], best_params, result['score']
+
+    async def _apply_quality_tolerance(
+        self,
+        data: pd.DataFrame,
+        params: RequestParameters,
+        tested_combinations: List[Dict[str, Any]],
+        best: Tuple[Any, Dict[str, Any], float],
+        fingerprint: Optional[str],
+        artifact_dir: Optional[str],
+        holdout: Optional[EvaluationHoldout]
+    ) -> Tuple[Any, Dict[str, Any], float]:
+        """
+        Log the quality / training time / memory Pareto front of the search and,
+        with a quality tolerance on the request, replace the best trial by the
+        fastest one scoring within the tolerance of it (its model is reloaded
+        from the trial cache). The search is over: the saved models of the
+        dataset are then evicted down to the TRIAL_MODELS_KEPT best ones and
+        the delivered one.
+        """
+        # Baseline and subsample trials are not candidates for the delivered model
+        trials = [
+            trial for trial in tested_combinations
+            if not trial.get('baseline') and trial.get('data_fraction', 1.0) >= 1.0
+        ]
+        for trial in pareto_front(trials):
+            memory = f", {trial['memory_usage']:.0f} MB" if trial.get('memory_usage') is not None else ""
+            logger.info(
+                f"Pareto front: {trial['params']} score {trial['score']:.4f}, "
+                f"{trial['training_time'] or 0:.1f}s{memory}"
+            )
+
+        delivered = best
+        tolerance = params.optimization_quality_tolerance
+        chosen = fastest_within(trials, tolerance) if tolerance else None
+        if chosen is not None and params_key(chosen['params']) != params_key(best[1]):
+            logger.info(
+                f"Fastest configuration within {tolerance} of the best score: {chosen['params']} "
+                f"(score {chosen['score']:.4f} in {chosen['training_time']:.1f}s)"
+            )
+            try:
+                result = await self._restore_trial_model(
+                    data, params.model_type, chosen['params'], fingerprint, artifact_dir, holdout
+                )
+            except Exception as e:
+                logger.warning(f"Model of {chosen['params']} could not be restored, keeping the best trial: {e}")
+            else:
+                delivered = result['model'], chosen['params'], chosen['score']
+
+        if fingerprint:
+            evict_trial_models(fingerprint, settings.TRIAL_MODELS_KEPT, [delivered[1]])
+        return delivered
+
+    async def _restore_trial_model(
+        self,
+        data: pd.DataFrame,
+        model_type: str,
+        trial_params: Dict[str, Any],
+        fingerprint: Optional[str],
+        artifact_dir: Optional[str],
+        holdout: Optional[EvaluationHoldout]
+    ) -> Dict[str, Any]:
+        """
+        Trial result with the model of these parameters: reloaded from the
+        trial cache, or retrained when its saved model was evicted
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, run_model_trial, {
+            'model_type': model_type,
+            'params': trial_params,
+            'data': data,
+            'fingerprint': fingerprint,
+            'artifact_dir': artifact_dir,
+            'holdout': holdout,
+            'require_model': True
+        })
+
+    def _make_budget(
+        self,
+        study: Optional[OptimizationStudy],
+        completed_trials: Dict[str, Dict[str, Any]],
+        executor: TrialExecutor,
+        data: Optional[pd.DataFrame] = None,
+        model_type: Optional[str] = None
+    ) -> TrialBudget:
+        """
+        Time / evaluation budget of a search: the limits of the study's
+        OptimizationConfig, minus what its trials completed before a restart used.
+        With the data and model type, the first trials are planned with the
+        learned cost model of past jobs, at the thread budget of the executor's workers
+        """
+        cost_prior = None
+        if data is not None and model_type:
+            cost_prior = trial_cost_prior(
+                model_type, len(data), estimate_transformed_width(data), executor.trial_threads
+            )
+        if study is None:
+            return TrialBudget(timeout_minutes=settings.OPTIMIZATION_TIMEOUT_HOURS * 60, cost_prior=cost_prior)
+        spent = sum(trial['training_time'] or 0 for trial in completed_trials.values()) / executor.max_workers
+        return TrialBudget(
+            timeout_minutes=study.config.timeout_minutes,
+            max_evaluations=study.config.max_evaluations,
+            already_spent_seconds=spent,
+            already_evaluated=len(completed_trials),
+            cost_prior=cost_prior
+        )
+
+    def _open_study(
+        self,
+        db: Optional[Session],
+        request_id: Optional[int],
+        search_type: str,
+        param_grid: Dict[str, List],
+        n_planned: Optional[int] = None,
+        fingerprint: Optional[str] = None
+    ) -> Optional[OptimizationStudy]:
+        """Open (or resume) the persisted study of a request, None without a session or on error"""
+        if db is None or request_id is None:
+            return None
+        try:
+            return OptimizationStudy(db, request_id, search_type, param_grid, n_planned, fingerprint)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Optimization study of request {request_id} not persisted: {e}")
+            return None
+
+    def _get_param_grid(self, model_type: str) -> Dict[str, List]:
+        """Hyperparameter grid searched for a model type"""
+        if model_type == "bayesian_network":
+            return {
+                'n_bins': [10, 20, 40],
+                'max_parents': [1, 2, 3]
+            }
+        if model_type == "gaussian_copula":
+            return {
+                'distribution': ['parametric', 'bounded', 'truncated']
+            }
+        grid = {
+            'epochs': [300, 500, 1000],
+            'batch_size': [500, 1000, 2000],
+            'learning_rate': [0.001, 0.0001, 0.00001]
+        }
+        if model_type == "tvae":
+            # Ignored by SDV's TVAESynthesizer: its values would train identical models
+            del grid['learning_rate']
+        return grid
+
+    async def _evaluate_baseline(
+        self,
+        data: pd.DataFrame,
+        model_type: str,
+        holdout: Optional[EvaluationHoldout] = None
+    ) -> Optional[float]:
+        """
+        Train the fast baseline model and return its quality score, so that the
+        trials of a slower model can be compared against it (scored on the
+        trials' holdout when given). Returns None when the requested model is
+        the baseline itself or the baseline fails.
+        """
+        if model_type == BASELINE_MODEL_TYPE:
+            return None
+        try:
+            baseline = get_model_wrapper(model_type=BASELINE_MODEL_TYPE, hyperparameters={})
+            await baseline.train(data)
+            if holdout is not None:
+                score = holdout.evaluate(await baseline.generate(holdout.n_synthetic))
+            else:
+                synthetic_data = await baseline.generate(len(data))
+                score = self.quality_validator.evaluate(real_data=data, synthetic_data=synthetic_data)
+            logger.info(f"Baseline {BASELINE_MODEL_TYPE} quality score: {score:.4f}")
+            return score
+        except Exception as e:
+            logger.warning(f"Baseline {BASELINE_MODEL_TYPE} failed: {str(e)}")
+            return None
 
     def _generate_param_combinations(
         self, 
         param_grid: Dict[str, List], 
         search_type: str, 
-        n_random: int
+        n_random: int,
+        seed: Optional[int] = None,
+        warm_start: Optional[List[Dict[str, Any]]] = None
     ) -> List[Tuple]:
         """
         Generate parameter combinations based on search type
@@ -192,19 +949,87 @@ class AIProcessingService:
             param_grid: Parameter grid
             search_type: Search type
             n_random: Number of random trials
+            seed: Seed of the random selection, so that a restarted search draws the same combinations
+            warm_start: Configurations to try first (best ones of similar datasets)
             
         Returns:
             List of parameter combinations
         """
+        seeds = [tuple(config[name] for name in param_grid) for config in warm_start or []]
         if search_type == "random":
-            # Random selection of combinations
-            all_combinations = list(product(*param_grid.values()))
-            if len(all_combinations) <= n_random:
-                return all_combinations
-            return random.sample(all_combinations, n_random)
+            # Random selection of combinations, after the warm start ones
+            all_combinations = [c for c in product(*param_grid.values()) if c not in seeds]
+            if len(all_combinations) > n_random:
+                all_combinations = random.Random(seed).sample(all_combinations, n_random)
+            return (seeds + all_combinations)[:max(n_random, len(seeds))]
         else:
-            # Grid search - all combinations
-            return list(product(*param_grid.values()))
+            # Grid search - all combinations, warm start ones first
+            return seeds + [c for c in product(*param_grid.values()) if c not in seeds]
+
+    def planned_trial_runs(
+        self,
+        model_type: str,
+        search_type: str,
+        n_random: int,
+        n_rows: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Training runs an optimization launches when no trial is cached, pruned
+        or skipped by the budget, to estimate its duration before it starts
+
+        Args:
+            model_type: Model type
+            search_type: Search type, as given to optimize_hyperparameters
+            n_random: Number of random trials (configurations started by ASHA)
+            n_rows: Rows of the dataset
+
+        Returns:
+            {"params", "data_fraction"} of every run, combinations differing only
+            by their epochs counted once (they share a run, see group_epoch_prefixes)
+        """
+        param_grid = self._get_param_grid(model_type)
+        if search_type in MULTI_FIDELITY_SEARCH_TYPES and 'epochs' in param_grid:
+            configs = [
+                dict(zip([k for k in param_grid if k != 'epochs'], combination))
+                for combination in product(*[v for k, v in param_grid.items() if k != 'epochs'])
+            ]
+            budgets = budget_ladder(MIN_EPOCH_BUDGET, max(param_grid['epochs']))
+            if search_type == "asha":
+                n_configs = max(n_random, DEFAULT_ETA ** (len(budgets) - 1))
+                rungs = [
+                    (max(n_configs // DEFAULT_ETA ** level, 1), budget) for level, budget in enumerate(budgets)
+                ]
+            else:
+                rungs = []
+                for bracket in hyperband_brackets(MIN_EPOCH_BUDGET, max(param_grid['epochs'])):
+                    n = len(configs)
+                    for rung in bracket:
+                        n = min(rung['n_configs'], n)
+                        rungs.append((n, rung['budget']))
+            config_cycle = cycle(configs)
+            return [
+                {'params': {**next(config_cycle), 'epochs': budget}, 'data_fraction': 1.0}
+                for n, budget in rungs for _ in range(n)
+            ]
+
+        fractions = fidelity_fractions(n_rows)
+        if search_type == SUBSAMPLE_SEARCH_TYPE and len(fractions) > 1:
+            configs = [dict(zip(param_grid.keys(), combination)) for combination in product(*param_grid.values())]
+            runs = []
+            n = len(configs)
+            for fraction in fractions:
+                # The promoted configurations are not known yet: spread over the grid
+                runs.extend(
+                    {'params': configs[i * len(configs) // n], 'data_fraction': fraction} for i in range(n)
+                )
+                n = max(int(math.ceil(n / DEFAULT_ETA)), 1)
+            return runs
+
+        combinations = self._generate_param_combinations(param_grid, search_type, n_random, seed=0)
+        return [
+            {'params': group['params'], 'data_fraction': 1.0}
+            for group in group_epoch_prefixes([dict(zip(param_grid.keys(), c)) for c in combinations])
+        ]
 
     async def load_dataset_robustly(
         self,
@@ -530,6 +1355,18 @@ class AIProcessingService:
                         detail=f"Erreur lors du chargement du dataset: {str(e)}"
                     )
 
+                # Pick the epochs / batch_size left to auto (stored NULL) from the data;
+                # a batch size set by the user is kept and the epochs follow it
+                if params.auto_config and (params.epochs is None or params.batch_size is None):
+                    auto_params = resolve_training_params(
+                        original_data, params.model_type, batch_size=params.batch_size
+                    )
+                    if params.epochs is None:
+                        params.epochs = auto_params["epochs"]
+                    if params.batch_size is None:
+                        params.batch_size = auto_params["batch_size"]
+                    db.commit()
+
                 # Initialize variables
                 model = None
                 synthetic_data = None
@@ -552,7 +1389,9 @@ class AIProcessingService:
                             data=original_data,
                             params=params,
                             search_type=params.optimization_method or "grid",
-                            n_random=params.optimization_n_trials or 5
+                            n_random=params.optimization_n_trials or 5,
+                            request_id=request_id,
+                            db=db
                         )
                         
                         # Update best_params with optimization results
@@ -567,6 +1406,9 @@ class AIProcessingService:
                         
                         # Generate data with best model
                         synthetic_data = await model.generate(len(original_data))
+                        # The optimization score was measured on the evaluation holdout:
+                        # the delivered data is scored against the whole dataset
+                        quality_score = None
                         
                     except Exception as opt_error:
                         logger.warning(f"Optimization failed, using default parameters: {str(opt_error)}")
@@ -585,20 +1427,41 @@ class AIProcessingService:
                         hyperparameters=best_params
                     )
 
+                # Stage durations feed the cost model behind the time estimates
+                width = estimate_transformed_width(original_data)
+
                 # Train model (if not already trained during optimization)
                 if not optimized:
+                    model.checkpointer = self._make_checkpointer(
+                        request_id, "final", params.model_type, best_params, original_data
+                    )
+                    stage_start = time.time()
                     await model.train(original_data)
+                    record_stage(
+                        "training", params.model_type, len(original_data), width, time.time() - stage_start,
+                        epochs=best_params.get("epochs"), batch_size=best_params.get("batch_size")
+                    )
 
                 # Generate synthetic data (if not already generated during optimization)
                 if synthetic_data is None:
+                    stage_start = time.time()
                     synthetic_data = await model.generate(len(original_data))
+                    record_stage(
+                        "sampling", params.model_type, len(original_data), width, time.time() - stage_start,
+                        output_rows=len(synthetic_data)
+                    )
 
                 # Evaluate quality (if not already evaluated during optimization)
                 if quality_score is None:
+                    stage_start = time.time()
                     quality_score = self.quality_validator.evaluate(
                         real_data=original_data,
                         synthetic_data=synthetic_data
                     )
+                    record_stage(
+                        "evaluation", params.model_type, len(original_data), width, time.time() - stage_start,
+                        output_rows=len(synthetic_data)
+                    )
 
                 # Upload synthetic data directly to Supabase Storage
                 output_rel_path = f"{current_user_id}/synthetic/{request_id}_synthetic_data.csv"
@@ -673,15 +1536,118 @@ class AIProcessingService:
                     "notification_created": notification_created
                 }
 
+                self.clear_checkpoints(request_id)
+
                 logger.info(f"Request {request_id} completed successfully")
                 return result
 
-        except HTTPException:
-            raise
         except Exception as e:
+            # A failed request is not resumed (a cancelled or killed job keeps its checkpoints)
+            self.clear_checkpoints(request_id)
+            if isinstance(e, HTTPException):
+                raise
             logger.error(f"Error processing request {request_id}: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def process_relational_request(
+        self,
+        db: Session,
+        request_id: int,
+        current_user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Process a multi-table generation request on a dataset group: fit one
+        model per table, sample the tables in topological order and upload
+        one synthetic CSV per table
+        """
+        data_request = db.query(DataRequest).options(
+            joinedload(DataRequest.request_parameters),
+            joinedload(DataRequest.dataset_group)
+        ).filter(DataRequest.id == request_id).first()
+
+        if not data_request or not data_request.dataset_group:
+            raise HTTPException(status_code=404, detail="Request or dataset group not found")
+
+        params = data_request.request_parameters
+        group = data_request.dataset_group
+        current_user_id = current_user_id or data_request.user_id
+        output_dir = tempfile.mkdtemp(prefix=f"relational_{request_id}_")
+
+        try:
+            async with self._handle_request_status(db, data_request):
+                tables = {}
+                for table_name, dataset_id in group.tables.items():
+                    uploaded_dataset = db.query(UploadedDataset).filter(UploadedDataset.id == dataset_id).first()
+                    tables[table_name], _ = await self.load_dataset_robustly(db, uploaded_dataset)
+                    logger.info(f"Table {table_name} loaded: {len(tables[table_name])} rows")
+
+                model = get_relational_model(
+                    model_type=params.model_type,
+                    hyperparameters={
+                        "epochs": params.epochs,
+                        "batch_size": params.batch_size,
+                        "learning_rate": params.learning_rate
+                    },
+                    primary_keys=group.primary_keys,
+                    relationships=group.relationships
+                )
+                await model.fit(tables)
+
+                # sample_size is the requested size of the root tables
+                child_tables = {rel["child_table"] for rel in group.relationships}
+                root_rows = sum(len(df) for name, df in tables.items() if name not in child_tables)
+                scale = (params.sample_size / root_rows) if params.sample_size and root_rows else 1.0
+                # Quality is scored on the chunks as they are written, the CSVs are never read back
+                key_columns = {
+                    name: {group.primary_keys.get(name)} | {
+                        rel["foreign_key"] for rel in group.relationships if rel["child_table"] == name
+                    }
+                    for name in tables
+                }
+                evaluators = {
+                    name: StreamingQualityEvaluator(df.drop(columns=[c for c in key_columns[name] if c in df.columns]))
+                    for name, df in tables.items()
+                }
+                summary = await model.sample_to_directory(output_dir, scale=scale, evaluators=evaluators)
+
+                outputs = {}
+                for table_name, table_summary in summary.items():
+                    output_rel_path = f"{current_user_id}/synthetic/{request_id}_{table_name}.csv"
+                    with open(table_summary["path"], "rb") as f:
+                        supabase_path = await self.storage.upload_file(output_rel_path, f, content_type="text/csv")
+                    if not supabase_path:
+                        raise HTTPException(
+                            status_code=500,
+                            detail=f"Failed to upload synthetic table {table_name}"
+                        )
+                    download_url = await self.storage.get_download_url(supabase_path, expires_in=7 * 24 * 3600)
+                    self.dataset_service.save_generated_data(
+                        db=db,
+                        request_id=request_id,
+                        file_path=table_summary["path"],
+                        user_id=current_user_id,
+                        supabase_path=supabase_path,
+                        download_url=download_url
+                    )
+                    outputs[table_name] = {
+                        "rows": table_summary["rows"],
+                        "quality_score": round(evaluators[table_name].score(), 4) if table_summary["rows"] else None,
+                        "supabase_path": supabase_path,
+                        "download_url": download_url
+                    }
+
+                logger.info(
+                    f"Relational request {request_id} completed: "
+                    + ", ".join(f"{name} (quality {table['quality_score']})" for name, table in outputs.items())
+                )
+                return {
+                    "request_id": request_id,
+                    "tables": outputs,
+                    "model_type": params.model_type
+                }
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
     async def get_processing_status(self, db: Session, request_id: int) -> Dict[str, Any]:
         """
         Get processing status of a request
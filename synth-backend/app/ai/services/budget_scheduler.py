@@ -0,0 +1,151 @@
+"""
+Wall-clock and evaluation budget of an optimization run.
+
+The budget comes from the study's OptimizationConfig (``timeout_minutes``,
+``max_evaluations``). The cost of the next trial is estimated from the trials
+completed so far (time per epoch when the model has an epoch count, time per
+trial otherwise, plus the time spent generating and scoring). A trial that
+would not fit in the remaining time is shrunk to the number of epochs that
+fits, or skipped when even the smallest budget does not fit. Running trials
+are given a training deadline so that the run ends on time with the best
+model found so far. Training costs are kept for the full data: a trial
+trained on a fraction of the rows is assumed to train in that fraction of
+the time of a full trial. Generating and scoring does not depend on the
+fraction: every trial is scored on the same fixed evaluation holdout. Until
+a trial of the same kind has completed, the cost comes from the learned cost
+model of past jobs (``cost_prior``), when there is one.
+"""
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Smallest number of epochs a shrunk trial is trained for
+MIN_SHRUNK_EPOCHS = 50
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+class TrialBudget:
+    """
+    Remaining time and evaluations of an optimization run.
+
+    Args:
+        timeout_minutes: Wall-clock budget, None for no limit
+        max_evaluations: Maximum number of trials, None for no limit
+        already_spent_seconds: Time consumed before a restart
+        already_evaluated: Trials completed before a restart
+        cost_prior: Estimated duration of a trial (params, data_fraction) before any trial completed
+    """
+
+    def __init__(
+        self,
+        timeout_minutes: Optional[float] = None,
+        max_evaluations: Optional[int] = None,
+        already_spent_seconds: float = 0.0,
+        already_evaluated: int = 0,
+        cost_prior: Optional[Callable[[Dict[str, Any], float], Optional[float]]] = None
+    ):
+        self.deadline = (
+            time.time() + timeout_minutes * 60 - already_spent_seconds
+            if timeout_minutes else None
+        )
+        self.max_evaluations = max_evaluations or None
+        self.evaluations = already_evaluated
+        self._seconds_per_epoch: List[float] = []
+        self._seconds_per_trial: List[float] = []
+        self._evaluation_seconds: List[float] = []
+        self.cost_prior = cost_prior
+
+    def remaining_seconds(self) -> float:
+        """Time left before the deadline (infinite without timeout)"""
+        if self.deadline is None:
+            return float('inf')
+        return max(self.deadline - time.time(), 0.0)
+
+    @property
+    def exhausted(self) -> bool:
+        """True once the deadline or the evaluation count is reached"""
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return True
+        return self.remaining_seconds() <= 0
+
+    def record(
+        self,
+        params: Dict[str, Any],
+        training_time: Optional[float],
+        evaluation_time: Optional[float] = None,
+        data_fraction: float = 1.0
+    ) -> None:
+        """Account for a finished trial and refine the cost model"""
+        self.evaluations += 1
+        if training_time is None:
+            return
+        training_time /= data_fraction
+        epochs = params.get('epochs')
+        if epochs:
+            self._seconds_per_epoch.append(training_time / float(epochs))
+        else:
+            self._seconds_per_trial.append(training_time)
+        if evaluation_time is not None:
+            self._evaluation_seconds.append(evaluation_time)
+
+    def estimate_seconds(self, params: Dict[str, Any], data_fraction: float = 1.0) -> Optional[float]:
+        """Estimated duration of a trial, None before any trial of the same kind finished (and without prior)"""
+        evaluation = _mean(self._evaluation_seconds) or 0.0
+        epochs = params.get('epochs')
+        if epochs and self._seconds_per_epoch:
+            return _mean(self._seconds_per_epoch) * float(epochs) * data_fraction + evaluation
+        if not epochs and self._seconds_per_trial:
+            return _mean(self._seconds_per_trial) * data_fraction + evaluation
+        if self.cost_prior is not None:
+            return self.cost_prior(params, data_fraction)
+        return None
+
+    def plan(self, params: Dict[str, Any], reserved: int = 0, data_fraction: float = 1.0) -> Optional[Dict[str, Any]]:
+        """
+        Parameters to run for a trial given the remaining budget.
+
+        Args:
+            params: Planned hyperparameters
+            reserved: Evaluations already scheduled but not finished
+            data_fraction: Fraction of the rows the trial is trained on
+
+        Returns:
+            ``params``, ``params`` with fewer epochs when only a shorter trial
+            fits, or None when the trial must be skipped
+        """
+        if self.max_evaluations is not None and self.evaluations + reserved >= self.max_evaluations:
+            return None
+        remaining = self.remaining_seconds()
+        if remaining <= 0:
+            return None
+
+        estimate = self.estimate_seconds(params, data_fraction)
+        if estimate is None or estimate <= remaining:
+            return params
+
+        epochs = params.get('epochs')
+        if epochs:
+            # Without a completed trial the prior estimate is spread evenly over the epochs
+            seconds_per_epoch = (
+                _mean(self._seconds_per_epoch) * data_fraction
+                if self._seconds_per_epoch else estimate / float(epochs)
+            )
+            available = remaining - (_mean(self._evaluation_seconds) or 0.0)
+            fitting_epochs = int(available / seconds_per_epoch)
+            if fitting_epochs >= min(MIN_SHRUNK_EPOCHS, int(epochs)):
+                logger.info(f"Trial {params} shrunk to {fitting_epochs} epochs to fit the time budget")
+                return {**params, 'epochs': fitting_epochs}
+
+        logger.info(f"Trial {params} skipped: estimated {estimate:.0f}s, {remaining:.0f}s left")
+        return None
+
+    def training_deadline(self) -> Optional[float]:
+        """Timestamp at which a running trial must stop training to be scored on time"""
+        if self.deadline is None:
+            return None
+        return self.deadline - (_mean(self._evaluation_seconds) or 0.0)
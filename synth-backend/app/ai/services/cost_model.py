@@ -0,0 +1,294 @@
+"""
+Learned runtime cost model of generation jobs.
+
+Every job stage that completes (training, sampling, evaluation) records its
+duration with the size of the problem (rows, transformed width, epochs,
+batch size, generated rows), the model type and the hardware (threads) in
+``stage_timings``. One log-linear ridge regression per stage is fitted on
+these observations: durations grow multiplicatively with each factor, so a
+power law in each of them is a good fit across several orders of magnitude.
+Models are refitted in each process as soon as new timings were recorded,
+so estimates improve online as jobs complete. Before MIN_OBSERVATIONS
+timings of a stage exist, no estimate is made and callers keep their
+heuristics.
+"""
+import logging
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import torch
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.StageTiming import StageTiming
+from app.ai.services.training_config import MAX_CLUSTERS
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("training", "sampling", "evaluation")
+
+MODEL_TYPES = ("ctgan", "tvae", "gaussian_copula", "bayesian_network")
+
+# Timings of a stage needed before its model is trusted
+MIN_OBSERVATIONS = 8
+
+# Most recent timings a model is fitted on
+MAX_OBSERVATIONS = 5000
+
+# Ridge penalty on the standardized coefficients
+RIDGE_PENALTY = 1.0
+
+# Epochs of a training whose epochs are not known before the job (RequestParameters default)
+DEFAULT_TRAINING_EPOCHS = 300
+
+_models: Dict[str, "StageCostModel"] = {}
+
+
+def hardware_threads() -> int:
+    """Threads the current process trains with"""
+    return torch.get_num_threads()
+
+
+def transformed_width_from_info(column_info: Dict[str, Dict[str, Any]], n_rows: int) -> int:
+    """Transformed width of a dataset from its ``column_info`` (see training_config.estimate_transformed_width)"""
+    width = 0
+    for info in column_info.values():
+        dtype = str(info.get('dtype', 'object'))
+        if dtype.startswith(('int', 'uint', 'float')):
+            width += 1 + min(MAX_CLUSTERS, max(n_rows, 1))
+        else:
+            width += max(int(info.get('unique_count', 1)), 1)
+    return max(width, 1)
+
+
+def _features(
+    model_type: str,
+    n_rows: int,
+    transformed_width: int,
+    epochs: Optional[int],
+    batch_size: Optional[int],
+    output_rows: Optional[int],
+    n_threads: int
+) -> List[float]:
+    return [
+        math.log1p(n_rows),
+        math.log1p(transformed_width),
+        math.log1p(epochs or 0),
+        math.log1p(batch_size or 0),
+        math.log1p(output_rows or 0),
+        math.log(max(n_threads, 1))
+    ] + [1.0 if model_type == known else 0.0 for known in MODEL_TYPES]
+
+
+class StageCostModel:
+    """
+    Log-linear ridge regression of the duration of one stage.
+
+    Args:
+        observations: [{"model_type", "n_rows", "transformed_width", "epochs", "batch_size", "output_rows", "n_threads", "seconds"}]
+    """
+
+    def __init__(self, observations: List[Dict[str, Any]]):
+        X = np.array([
+            _features(
+                o["model_type"], o["n_rows"], o["transformed_width"],
+                o["epochs"], o["batch_size"], o["output_rows"], o["n_threads"]
+            )
+            for o in observations
+        ])
+        y = np.log(np.maximum([o["seconds"] for o in observations], 1e-3))
+        self.n_observations = len(observations)
+        # Last timing id the model was fitted on
+        self.last_id: Optional[int] = None
+        self._mean = X.mean(axis=0)
+        self._scale = X.std(axis=0)
+        self._scale[self._scale == 0] = 1.0
+        Z = (X - self._mean) / self._scale
+        self._intercept = float(y.mean())
+        self._coef = np.linalg.solve(
+            Z.T @ Z + RIDGE_PENALTY * np.eye(Z.shape[1]), Z.T @ (y - self._intercept)
+        )
+        residuals = y - self._intercept - Z @ self._coef
+        # Typical multiplicative error of the fit
+        self.log_error = float(np.sqrt(np.mean(residuals ** 2)))
+
+    def predict(
+        self,
+        model_type: str,
+        n_rows: int,
+        transformed_width: int,
+        epochs: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        output_rows: Optional[int] = None,
+        n_threads: Optional[int] = None
+    ) -> float:
+        """Estimated duration in seconds"""
+        x = np.array(_features(
+            model_type, n_rows, transformed_width, epochs, batch_size, output_rows,
+            n_threads or hardware_threads()
+        ))
+        return float(np.exp(self._intercept + ((x - self._mean) / self._scale) @ self._coef))
+
+
+def record_stage(
+    stage: str,
+    model_type: str,
+    n_rows: int,
+    transformed_width: int,
+    seconds: float,
+    epochs: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    output_rows: Optional[int] = None
+) -> None:
+    """Store the duration of a completed stage (best effort)"""
+    db = SessionLocal()
+    try:
+        db.add(StageTiming(
+            stage=stage,
+            model_type=model_type,
+            n_rows=int(n_rows),
+            transformed_width=int(transformed_width),
+            epochs=int(epochs) if epochs else None,
+            batch_size=int(batch_size) if batch_size else None,
+            output_rows=int(output_rows) if output_rows else None,
+            n_threads=hardware_threads(),
+            seconds=float(seconds)
+        ))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Stage timing not stored: {e}")
+    finally:
+        db.close()
+
+
+def get_stage_model(stage: str) -> Optional[StageCostModel]:
+    """Cost model of a stage, refitted when new timings were recorded; None before MIN_OBSERVATIONS"""
+    db = SessionLocal()
+    try:
+        count, last_id = db.query(func.count(StageTiming.id), func.max(StageTiming.id)).filter(
+            StageTiming.stage == stage
+        ).one()
+        model = _models.get(stage)
+        if model is not None and model.last_id == last_id:
+            return model
+        if count < MIN_OBSERVATIONS:
+            return None
+        rows = db.query(StageTiming).filter(StageTiming.stage == stage).order_by(
+            StageTiming.id.desc()
+        ).limit(MAX_OBSERVATIONS).all()
+        observations = [
+            {
+                "model_type": row.model_type,
+                "n_rows": row.n_rows,
+                "transformed_width": row.transformed_width,
+                "epochs": row.epochs,
+                "batch_size": row.batch_size,
+                "output_rows": row.output_rows,
+                "n_threads": row.n_threads,
+                "seconds": row.seconds
+            }
+            for row in rows
+        ]
+    except Exception as e:
+        logger.warning(f"Stage timings lookup failed: {e}")
+        return _models.get(stage)
+    finally:
+        db.close()
+
+    model = StageCostModel(observations)
+    model.last_id = last_id
+    _models[stage] = model
+    logger.info(
+        f"Cost model of stage {stage} fitted on {model.n_observations} timings "
+        f"(typical error x{math.exp(model.log_error):.2f})"
+    )
+    return model
+
+
+def estimate_job(
+    model_type: str,
+    n_rows: int,
+    transformed_width: int,
+    sample_size: int,
+    epochs: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    trial_runs: Optional[List[Dict[str, Any]]] = None,
+    n_workers: int = 1,
+    n_threads: Optional[int] = None
+) -> Optional[Dict[str, float]]:
+    """
+    Estimated duration of a generation job, per stage.
+
+    With ``trial_runs`` (the {"params", "data_fraction"} of every training
+    run of the search), the job first runs these optimization trials
+    concurrently on ``n_workers`` workers of ``n_threads`` threads each (the
+    threads of this process by default) and delivers the best trial's model
+    without retraining it.
+
+    Returns:
+        {"optimization", "training", "sampling", "evaluation", "total"} in
+        seconds, or None while a stage has no model yet
+    """
+    models = {stage: get_stage_model(stage) for stage in STAGES}
+    if any(model is None for model in models.values()):
+        return None
+
+    size = {"n_rows": n_rows, "transformed_width": transformed_width}
+    optimization = 0.0
+    training = 0.0
+    if trial_runs:
+        prior = trial_cost_prior(model_type, n_rows, transformed_width, n_threads)
+        costs = [prior(run["params"], run.get("data_fraction", 1.0)) for run in trial_runs]
+        # Runs are spread over the workers: the search lasts at least its longest run
+        optimization = max(sum(costs) / max(n_workers, 1), max(costs))
+    else:
+        training = models["training"].predict(model_type, **size, epochs=epochs, batch_size=batch_size)
+    sampling = models["sampling"].predict(model_type, **size, output_rows=sample_size)
+    evaluation = models["evaluation"].predict(model_type, **size, output_rows=sample_size)
+    return {
+        "optimization": optimization,
+        "training": training,
+        "sampling": sampling,
+        "evaluation": evaluation,
+        "total": optimization + training + sampling + evaluation
+    }
+
+
+def trial_cost_prior(
+    model_type: str,
+    n_rows: int,
+    transformed_width: int,
+    n_threads: Optional[int] = None
+) -> Callable[[Dict[str, Any], float], Optional[float]]:
+    """
+    Estimated duration of an optimization trial on a dataset (training, then
+    sampling and scoring on the evaluation holdout), used by TrialBudget
+    until trials of the run itself have completed. ``n_threads`` is the
+    thread budget of the workers running the trials (the threads of this
+    process by default)
+    """
+    holdout_rows = min(settings.EVALUATION_HOLDOUT_ROWS, n_rows)
+    synthetic_rows = settings.EVALUATION_SYNTHETIC_ROWS or holdout_rows
+
+    def prior(params: Dict[str, Any], data_fraction: float = 1.0) -> Optional[float]:
+        models = {stage: get_stage_model(stage) for stage in STAGES}
+        if any(model is None for model in models.values()):
+            return None
+        rows = max(int(n_rows * data_fraction), 1)
+        return (
+            models["training"].predict(
+                model_type, rows, transformed_width,
+                epochs=params.get('epochs'), batch_size=params.get('batch_size'), n_threads=n_threads
+            )
+            + models["sampling"].predict(
+                model_type, rows, transformed_width, output_rows=synthetic_rows, n_threads=n_threads
+            )
+            + models["evaluation"].predict(
+                model_type, holdout_rows, transformed_width, output_rows=synthetic_rows, n_threads=n_threads
+            )
+        )
+
+    return prior
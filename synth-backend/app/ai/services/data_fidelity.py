@@ -0,0 +1,233 @@
+"""
+Multi-fidelity search on row subsamples.
+
+Every configuration is first trained and scored on a small stratified
+subsample of the training data, and only the best ``1 / eta`` of each rung
+is promoted to the next, larger fraction, up to the full data. The ranking
+of two consecutive fidelities is compared on the configurations evaluated at
+both: once their Spearman rank correlation reaches
+RANK_AGREEMENT_THRESHOLD, the low-fidelity ranking is trusted and only the
+best configuration is promoted, straight to the full data.
+
+Trials run on a TrialExecutor; every completed trial is reported through
+``on_result`` as {"config", "fraction", "score", "result", "error"}. Scores
+are only comparable within one fraction.
+"""
+import math
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.stats import spearmanr
+
+from app.ai.services.trial_executor import TrialExecutor
+from app.ai.services.budget_scheduler import TrialBudget
+from app.ai.services.successive_halving import DEFAULT_ETA
+from app.ai.services.trial_cache import params_key
+
+logger = logging.getLogger(__name__)
+
+# Fractions of the rows trained on at each rung (the last one is the full data)
+DATA_FRACTIONS = (0.05, 0.2, 1.0)
+
+# A subsample smaller than this is not representative enough to rank configurations
+MIN_SUBSAMPLE_ROWS = 500
+
+# Rank correlation above which the low-fidelity ranking is trusted
+RANK_AGREEMENT_THRESHOLD = 0.8
+
+# Configurations scored at both fidelities needed to measure the agreement
+MIN_AGREEMENT_PAIRS = 3
+
+# Columns with more distinct values than this are not used as strata
+MAX_STRATA = 50
+
+
+def fidelity_fractions(n_rows: int, fractions: Sequence[float] = DATA_FRACTIONS) -> List[float]:
+    """Fractions whose subsample has at least MIN_SUBSAMPLE_ROWS rows, always ending with the full data"""
+    kept = [f for f in fractions if f < 1.0 and n_rows * f >= MIN_SUBSAMPLE_ROWS]
+    return kept + [1.0]
+
+
+def stratify_column(data: pd.DataFrame) -> Optional[str]:
+    """Categorical column with the fewest distinct values (2 to MAX_STRATA), None if there is none"""
+    best, best_count = None, None
+    for column in data.columns:
+        if pd.api.types.is_numeric_dtype(data[column]) and not pd.api.types.is_bool_dtype(data[column]):
+            continue
+        count = data[column].nunique(dropna=False)
+        if 2 <= count <= MAX_STRATA and (best_count is None or count < best_count):
+            best, best_count = column, count
+    return best
+
+
+def stratified_subsample(data: pd.DataFrame, fraction: float, seed: int = 0) -> pd.DataFrame:
+    """
+    Rows drawn so that every category of the stratification column keeps its
+    share of the data (and at least one row), in their original order
+    """
+    if fraction >= 1.0:
+        return data
+    rng = np.random.default_rng(seed)
+    column = stratify_column(data)
+    if column is None:
+        n_rows = max(int(round(len(data) * fraction)), 1)
+        positions = rng.choice(len(data), size=n_rows, replace=False)
+    else:
+        positions = np.concatenate([
+            rng.choice(group, size=max(int(round(len(group) * fraction)), 1), replace=False)
+            for group in data.groupby(column, dropna=False, sort=False).indices.values()
+        ])
+    return data.iloc[np.sort(positions)]
+
+
+def rank_agreement(low_scores: Sequence[float], high_scores: Sequence[float]) -> Optional[float]:
+    """Spearman correlation of two fidelities' scores, None when it is undefined"""
+    if len(low_scores) < 2:
+        return None
+    correlation = spearmanr(low_scores, high_scores).correlation
+    return None if np.isnan(correlation) else float(correlation)
+
+
+class SubsampleFidelitySearch:
+    """
+    Successive halving over the fraction of rows trained on.
+
+    Args:
+        executor: Executor running the trials (entered as a context manager by the search)
+        trial_fn: Worker function run on each job
+        make_job: ``make_job(config, fraction, trial_index)`` -> picklable job for ``trial_fn``
+        get_score: Quality score of a ``trial_fn`` result
+        fractions: Increasing fractions of the rows, the last one being 1.0
+        eta: Promotion ratio
+        agreement_threshold: Rank correlation above which promotion stops
+        on_result: Called with every completed trial record
+        time_budget: Wall-clock / evaluation budget of the search
+    """
+
+    def __init__(
+        self,
+        executor: TrialExecutor,
+        trial_fn: Callable[[Any], Any],
+        make_job: Callable[[Dict[str, Any], float, int], Any],
+        get_score: Callable[[Any], float],
+        fractions: Sequence[float] = DATA_FRACTIONS,
+        eta: int = DEFAULT_ETA,
+        agreement_threshold: float = RANK_AGREEMENT_THRESHOLD,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        time_budget: Optional[TrialBudget] = None
+    ):
+        self.executor = executor
+        self.trial_fn = trial_fn
+        self.make_job = make_job
+        self.get_score = get_score
+        self.fractions = list(fractions)
+        self.eta = eta
+        self.agreement_threshold = agreement_threshold
+        self.on_result = on_result
+        self.time_budget = time_budget
+        self.records: List[Dict[str, Any]] = []
+        self.agreements: List[Dict[str, Any]] = []
+
+    def _record(self, config: Dict[str, Any], fraction: float, result: Any, error: Optional[Exception]) -> Dict[str, Any]:
+        score = None
+        if error is None:
+            try:
+                score = self.get_score(result)
+            except Exception as e:
+                error = e
+        record = {"config": config, "fraction": fraction, "score": score, "result": result, "error": error}
+        self.records.append(record)
+        if error is not None:
+            logger.warning(f"Trial {config} on {fraction:.0%} of the rows failed: {error}")
+        else:
+            logger.info(f"Trial {config} on {fraction:.0%} of the rows: score {score:.4f}")
+        if self.on_result:
+            self.on_result(record)
+        return record
+
+    def _fits(self, config: Dict[str, Any], fraction: float, reserved: int = 0) -> bool:
+        """Whether a trial fits in the remaining time / evaluation budget"""
+        if self.time_budget is None:
+            return True
+        return self.time_budget.plan(config, reserved, data_fraction=fraction) == config
+
+    def _top(self, records: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        succeeded = [r for r in records if r["score"] is not None]
+        return sorted(succeeded, key=lambda r: r["score"], reverse=True)[:k]
+
+    def trial_count(self, n_configs: int) -> int:
+        """Number of trials of a run without early stop of the promotions"""
+        total = 0
+        for _ in self.fractions:
+            total += n_configs
+            n_configs = max(int(math.ceil(n_configs / self.eta)), 1)
+        return total
+
+    def _agreement(self, previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Optional[float]:
+        """Rank correlation of the configurations scored at both fidelities"""
+        low = {params_key(r["config"]): r["score"] for r in previous if r["score"] is not None}
+        pairs = [
+            (low[params_key(r["config"])], r["score"])
+            for r in current
+            if r["score"] is not None and params_key(r["config"]) in low
+        ]
+        if len(pairs) < MIN_AGREEMENT_PAIRS:
+            return None
+        correlation = rank_agreement(*zip(*pairs))
+        self.agreements.append({
+            "from": previous[0]["fraction"],
+            "to": current[0]["fraction"],
+            "pairs": len(pairs),
+            "correlation": correlation
+        })
+        return correlation
+
+    async def _run_rung(self, configs: List[Dict[str, Any]], fraction: float) -> List[Dict[str, Any]]:
+        configs = [config for i, config in enumerate(configs) if self._fits(config, fraction, i)]
+        jobs = [
+            self.make_job(config, fraction, len(self.records) + i)
+            for i, config in enumerate(configs)
+        ]
+        records = []
+        async for outcome in self.executor.map(self.trial_fn, jobs):
+            records.append(self._record(configs[outcome["index"]], fraction, outcome["result"], outcome["error"]))
+        return records
+
+    async def run(self, configs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Evaluate ``configs`` on the smallest fraction and promote the best ones.
+
+        Returns:
+            Records of all trials
+        """
+        level = 0
+        previous = None
+        with self.executor:
+            while configs:
+                fraction = self.fractions[level]
+                records = await self._run_rung(configs, fraction)
+                if level == len(self.fractions) - 1 or not records:
+                    break
+                if self.time_budget is not None and self.time_budget.exhausted:
+                    logger.info("Time budget exhausted, no configuration promoted to the full data")
+                    break
+
+                correlation = self._agreement(previous, records) if previous else None
+                if correlation is not None and correlation >= self.agreement_threshold:
+                    # Low fidelities rank the configurations alike: only the best one is worth the full data
+                    logger.info(
+                        f"Rankings on {previous[0]['fraction']:.0%} and {fraction:.0%} of the rows agree "
+                        f"(Spearman {correlation:.2f}), promoting the best configuration to the full data"
+                    )
+                    configs = [r["config"] for r in self._top(records, 1)]
+                    level = len(self.fractions) - 1
+                else:
+                    if correlation is not None:
+                        logger.info(f"Rank correlation {correlation:.2f} between fidelities, promotion goes on")
+                    n_promoted = max(int(math.ceil(len(configs) / self.eta)), 1)
+                    configs = [r["config"] for r in self._top(records, n_promoted)]
+                    level += 1
+                previous = records
+        return self.records
@@ -0,0 +1,38 @@
+"""
+Epoch-prefix sharing in hyperparameter grids.
+
+CTGAN / TVAE train without a learning rate schedule: a run of E epochs
+passes through the exact state of a run of e < E epochs with the same other
+hyperparameters. The configurations of a grid that differ only by their
+epochs are therefore trained once, up to the largest value; the sampling
+networks are snapshotted at the smaller values on the way and every snapshot
+is scored (and cached) as the trial of its own epoch value.
+"""
+from typing import Any, Dict, List
+
+from app.ai.services.trial_cache import params_key
+
+
+def group_epoch_prefixes(configs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge the configurations that differ only by ``epochs``.
+
+    Returns:
+        [{"params": configuration with the largest epochs, "snapshot_epochs": smaller
+        epoch values, ascending}], in the order of first appearance of each group
+        (configurations without epochs are left alone)
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    for config in configs:
+        if config.get("epochs") is None:
+            groups[params_key(config)] = {"params": config, "snapshot_epochs": []}
+            continue
+        key = params_key({name: value for name, value in config.items() if name != "epochs"})
+        group = groups.setdefault(key, {"params": config, "snapshot_epochs": []})
+        if group["params"] is config:
+            continue
+        epochs = [group["params"]["epochs"], *group["snapshot_epochs"], config["epochs"]]
+        largest = max(epochs)
+        group["params"] = config if config["epochs"] == largest else group["params"]
+        group["snapshot_epochs"] = sorted({e for e in epochs if e != largest})
+    return list(groups.values())
@@ -0,0 +1,131 @@
+"""
+Fixed evaluation holdout of an optimization job.
+
+All trials of a search are scored against the same stratified sample of the
+real data, with a synthetic sample of the same fixed size, so that their
+scores are comparable and each evaluation costs the same whatever the size
+of the table. The real side is prepared once (sample drawn, metadata
+detected) and holdouts are cached in memory by dataset fingerprint, so every
+trial on the same data in a process reuses it (the real-side statistics of
+the quality report are cached, in memory and on disk, under the holdout
+fingerprint, see quality_engine). With QUALITY_APPROXIMATE_WIDTH, a
+synthetic sample large enough to be sampled (EVALUATION_SYNTHETIC_ROWS) is
+scored approximately, on random sub-samples until the confidence interval is
+narrow enough to rank trials (see approximate_quality); the delivered data
+is always scored exactly. The holdout rows are not withheld from training:
+the best trial's model is the delivered model.
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from sdv.metadata import SingleTableMetadata
+
+from app.core.config import settings
+from app.ai.services.approximate_quality import approximate_quality, can_approximate
+from app.ai.services.data_fidelity import stratified_subsample
+from app.ai.services.quality_validator import QualityValidator
+from app.ai.services.trial_cache import dataset_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Holdouts kept in memory per process
+MAX_CACHED_HOLDOUTS = 8
+
+_holdouts: "OrderedDict[str, EvaluationHoldout]" = OrderedDict()
+
+
+class EvaluationHoldout:
+    """
+    Stratified real-data sample and synthetic sample size used to score trials.
+
+    Args:
+        data: Real training data
+        n_rows: Rows of the holdout (defaults to EVALUATION_HOLDOUT_ROWS)
+        n_synthetic: Synthetic rows generated per trial (defaults to EVALUATION_SYNTHETIC_ROWS, then the holdout size)
+        metadata: Metadata of the data, detected from the holdout when missing
+        seed: Seed of the sample
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        n_rows: Optional[int] = None,
+        n_synthetic: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        seed: int = 0
+    ):
+        n_rows = min(n_rows or settings.EVALUATION_HOLDOUT_ROWS, len(data))
+        self.real_data = stratified_subsample(data, n_rows / len(data), seed=seed).reset_index(drop=True)
+        self.n_synthetic = n_synthetic or settings.EVALUATION_SYNTHETIC_ROWS or n_rows
+        if metadata is None:
+            detected = SingleTableMetadata()
+            detected.detect_from_dataframe(self.real_data)
+            metadata = detected.to_dict()
+        self.metadata = metadata
+        self.fingerprint = dataset_fingerprint(self.real_data)
+
+    @property
+    def approximate(self) -> bool:
+        """Whether trials are scored approximately (the synthetic sample is too small otherwise)"""
+        return settings.QUALITY_APPROXIMATE_WIDTH > 0 and can_approximate(self.n_synthetic)
+
+    @property
+    def evaluation(self) -> str:
+        """Scoring scheme of the trial cache (scores are only comparable within one scheme)"""
+        evaluation = f"holdout_{self.fingerprint[:16]}_{self.n_synthetic}"
+        if self.approximate:
+            evaluation += f"_approx{settings.QUALITY_APPROXIMATE_WIDTH:g}"
+        return evaluation
+
+    def evaluate(self, synthetic_data: pd.DataFrame) -> float:
+        """Quality score of a synthetic sample against the holdout"""
+        if self.approximate:
+            try:
+                result = approximate_quality(
+                    self.real_data,
+                    synthetic_data,
+                    settings.QUALITY_APPROXIMATE_WIDTH,
+                    metadata=self.metadata,
+                    fingerprint=self.fingerprint,
+                    persist_profile=True
+                )
+            except Exception as e:
+                logger.warning(f"Approximate evaluation failed, scoring exactly: {e}")
+            else:
+                if not result["exact"]:
+                    logger.info(
+                        f"Approximate quality score {result['score']:.4f} "
+                        f"[{result['low']:.4f}, {result['high']:.4f}] on {result['rows']} synthetic rows"
+                    )
+                return result["score"]
+        return QualityValidator().evaluate(
+            real_data=self.real_data,
+            synthetic_data=synthetic_data,
+            metadata=self.metadata,
+            fingerprint=self.fingerprint,
+            persist_profile=True
+        )
+
+
+def get_evaluation_holdout(
+    data: pd.DataFrame,
+    fingerprint: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> EvaluationHoldout:
+    """Holdout of a dataset, built on first use and then served from the in-memory cache"""
+    key = fingerprint or dataset_fingerprint(data)
+    holdout = _holdouts.get(key)
+    if holdout is None:
+        holdout = EvaluationHoldout(data, metadata=metadata)
+        logger.info(
+            f"Evaluation holdout of {len(holdout.real_data)} rows, "
+            f"{holdout.n_synthetic} synthetic rows per trial"
+        )
+        _holdouts[key] = holdout
+        while len(_holdouts) > MAX_CACHED_HOLDOUTS:
+            _holdouts.popitem(last=False)
+    else:
+        _holdouts.move_to_end(key)
+    return holdout
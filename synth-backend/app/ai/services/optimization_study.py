@@ -0,0 +1,188 @@
+"""
+Persistent optimization studies.
+
+A study is the OptimizationConfig row of a request's hyperparameter search,
+and every finished trial is written to optimization_trials as soon as its
+result arrives. When a job is restarted after a crash, the study still marked
+"running" is reopened and the trials it already completed are skipped. A
+configuration created beforehand through the API ("pending") is adopted, so
+that its timeout_minutes and max_evaluations limit the run. Trials stopped
+by the pruner are recorded as "pruned" and are not rerun either. Trials
+are recorded with their planned parameters (the key of the restart) and,
+apart, the epochs actually trained when the deadline stopped them early. A study
+records the fingerprint of the data it optimizes: ``has_completed_study``
+tells whether a dataset went through a full search for a model type.
+Persistence is best effort: a database error is logged and the search goes on.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.OptimizationConfig import OptimizationConfig
+from app.models.OptimizationTrial import OptimizationTrial
+from app.models.RequestParameters import RequestParameters
+from app.ai.services.trial_cache import normalize_params, params_key
+
+logger = logging.getLogger(__name__)
+
+
+class OptimizationStudy:
+    """
+    Optimization run of one request, persisted trial by trial.
+
+    Args:
+        db: Database session
+        request_id: Request being optimized
+        search_type: Search method ("grid", "random", "hyperband", "asha"...)
+        search_space: Searched hyperparameter grid, stored with a new study
+        n_planned: Number of trials planned
+        fingerprint: Fingerprint of the optimized data
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        request_id: int,
+        search_type: str,
+        search_space: Optional[Dict[str, Any]] = None,
+        n_planned: Optional[int] = None,
+        fingerprint: Optional[str] = None
+    ):
+        self.db = db
+        self.config = db.query(OptimizationConfig).filter(
+            OptimizationConfig.request_id == request_id,
+            OptimizationConfig.optimization_type == search_type,
+            OptimizationConfig.status == "running"
+        ).order_by(OptimizationConfig.id.desc()).first()
+
+        if self.config is not None:
+            logger.info(f"Resuming optimization study {self.config.id} of request {request_id}")
+            if fingerprint and not self.config.dataset_fingerprint:
+                self.config.dataset_fingerprint = fingerprint
+                db.commit()
+            return
+
+        # A configuration created through the API (limits set by the user) is adopted
+        self.config = db.query(OptimizationConfig).filter(
+            OptimizationConfig.request_id == request_id,
+            OptimizationConfig.status == "pending"
+        ).order_by(OptimizationConfig.id.desc()).first()
+
+        if self.config is not None:
+            self.config.optimization_type = search_type
+            self.config.dataset_fingerprint = fingerprint
+            self.config.status = "running"
+        else:
+            self.config = OptimizationConfig(
+                request_id=request_id,
+                optimization_type=search_type,
+                dataset_fingerprint=fingerprint,
+                search_space=normalize_params(search_space or {}),
+                max_evaluations=n_planned or 0,
+                timeout_minutes=int(settings.OPTIMIZATION_TIMEOUT_HOURS * 60),
+                status="running",
+                total_evaluations=0
+            )
+            db.add(self.config)
+        db.commit()
+
+    def completed_trials(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Trials already completed (or pruned) by this study.
+
+        Returns:
+            params_key of the planned parameters -> {"params", "trained_params", "score",
+            "training_time", "memory_usage"}, score None for a pruned trial; "trained_params"
+            carry the epochs actually trained
+        """
+        trials = self.db.query(OptimizationTrial).filter(
+            OptimizationTrial.config_id == self.config.id,
+            OptimizationTrial.status.in_(("completed", "pruned"))
+        ).all()
+        return {
+            params_key(trial.parameters): {
+                "params": trial.parameters,
+                "trained_params": (
+                    {**trial.parameters, "epochs": trial.epochs_trained}
+                    if trial.epochs_trained is not None and "epochs" in trial.parameters
+                    else trial.parameters
+                ),
+                "score": trial.quality_score,
+                "training_time": trial.training_time,
+                "memory_usage": trial.memory_usage
+            }
+            for trial in trials
+        }
+
+    def next_trial_number(self) -> int:
+        """Trial number following the last recorded trial"""
+        last = self.db.query(OptimizationTrial.trial_number).filter(
+            OptimizationTrial.config_id == self.config.id
+        ).order_by(OptimizationTrial.trial_number.desc()).first()
+        return (last[0] if last else 0) + 1
+
+    def record(
+        self,
+        trial_number: int,
+        params: Dict[str, Any],
+        quality_score: Optional[float] = None,
+        training_time: Optional[float] = None,
+        memory_usage: Optional[float] = None,
+        error: Optional[Exception] = None,
+        pruned: bool = False,
+        epochs_trained: Optional[int] = None
+    ) -> None:
+        """Write a finished trial (``params`` as planned, ``epochs_trained`` when it differs)"""
+        try:
+            completed_at = datetime.utcnow()
+            self.db.add(OptimizationTrial(
+                config_id=self.config.id,
+                trial_number=trial_number,
+                parameters=normalize_params(params),
+                quality_score=quality_score,
+                training_time=training_time,
+                memory_usage=memory_usage,
+                epochs_trained=epochs_trained,
+                status="failed" if error is not None else ("pruned" if pruned else "completed"),
+                error_message=str(error)[:1000] if error is not None else None,
+                started_at=completed_at - timedelta(seconds=training_time or 0),
+                completed_at=completed_at
+            ))
+            self.config.total_evaluations = (self.config.total_evaluations or 0) + 1
+            if quality_score is not None and (self.config.best_score is None or quality_score > self.config.best_score):
+                self.config.best_score = quality_score
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Could not persist trial {trial_number} of study {self.config.id}: {e}")
+
+    def finish(self, status: str = "completed") -> None:
+        """Close the study so that a later run of the request starts a new one"""
+        try:
+            self.config.status = status
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Could not close study {self.config.id}: {e}")
+
+
+def has_completed_study(fingerprint: str, model_type: str) -> bool:
+    """Whether a search of ``model_type`` already ran to completion on the data of ``fingerprint`` (False on error)"""
+    db = SessionLocal()
+    try:
+        return db.query(OptimizationConfig.id).join(
+            RequestParameters, RequestParameters.request_id == OptimizationConfig.request_id
+        ).filter(
+            OptimizationConfig.dataset_fingerprint == fingerprint,
+            OptimizationConfig.status == "completed",
+            RequestParameters.model_type == model_type
+        ).first() is not None
+    except Exception as e:
+        logger.warning(f"Completed study lookup failed: {e}")
+        return False
+    finally:
+        db.close()
@@ -0,0 +1,55 @@
+"""
+Quality / cost trade-offs of an optimization run.
+
+Trials are compared on three objectives: quality score (maximized), training
+time and peak memory growth during training (minimized). The Pareto front
+holds the trials no other trial beats on every objective; ``fastest_within``
+picks, among the trials whose score is within a tolerance of the best one,
+the cheapest to train, so that a marginal quality gain does not cost several
+times the training time.
+
+Trials are dicts with "score", "training_time" and "memory_usage" (None when
+unknown: a missing cost is not compared).
+"""
+from typing import Any, Dict, List, Optional
+
+COST_KEYS = ("training_time", "memory_usage")
+
+
+def _dominates(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """Whether ``a`` is at least as good as ``b`` on every objective and better on one"""
+    if a["score"] < b["score"]:
+        return False
+    strictly_better = a["score"] > b["score"]
+    for key in COST_KEYS:
+        if a.get(key) is None or b.get(key) is None:
+            continue
+        if a[key] > b[key]:
+            return False
+        strictly_better = strictly_better or a[key] < b[key]
+    return strictly_better
+
+
+def pareto_front(trials: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Scored trials not dominated by any other, fastest first"""
+    scored = [t for t in trials if t.get("score") is not None]
+    front = [t for t in scored if not any(_dominates(other, t) for other in scored if other is not t)]
+    return sorted(front, key=lambda t: (t.get("training_time") is None, t.get("training_time") or 0.0))
+
+
+def fastest_within(trials: List[Dict[str, Any]], tolerance: float) -> Optional[Dict[str, Any]]:
+    """
+    Fastest trial whose score is at most ``tolerance`` below the best score
+    (the best trial itself when no eligible trial has a training time)
+    """
+    scored = [t for t in trials if t.get("score") is not None]
+    if not scored:
+        return None
+    best = max(scored, key=lambda t: t["score"])
+    timed = [
+        t for t in scored
+        if t["score"] >= best["score"] - tolerance and t.get("training_time") is not None
+    ]
+    if not timed:
+        return best
+    return min(timed, key=lambda t: (t["training_time"], -t["score"]))
@@ -0,0 +1,599 @@
+"""
+Vectorized quality report.
+
+Computes the same scores as SDMetrics' single table ``QualityReport``:
+
+- Column Shapes: KSComplement on numerical / datetime columns, TVComplement
+  on categorical / ordinal / boolean columns, averaged;
+- Column Pair Trends: CorrelationSimilarity (Pearson) between two continuous
+  columns, ContingencySimilarity otherwise (continuous columns discretized
+  in 10 histogram bins), averaged over the pairs whose real correlation
+  (resp. Cramer's V association) exceeds the report thresholds;
+- overall score: mean of both properties.
+
+SDMetrics loops over columns and pairs in Python (one groupby / pearsonr per
+pair), which dominates each trial on wide tables. Here all columns are
+scored at once: the correlations of every pair with one pairwise-complete
+product, and the contingency tables of a batch of pairs with one count over
+offset joint codes. Contingency tables are computed on all rows (SDMetrics
+subsamples them above 50000 rows).
+
+The real side of the report (ECDF knots, category counts, bin edges,
+correlation matrix, contingency tables and associations) only depends on the
+real data: it is computed once per dataset fingerprint as a
+``RealDataProfile``, kept in memory, and each evaluation only scans the
+synthetic data. Profiles of evaluation holdouts, which every trial and
+later request on the dataset reuses, are also kept on disk (the
+MAX_PROFILE_FILES most recently used); profiles of one-off full-data
+scorings are not. Pairs whose real association is below the
+threshold do not count in the score, so their synthetic tables are skipped.
+"""
+import hashlib
+import itertools
+import json
+import logging
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sdv.metadata import SingleTableMetadata
+
+from app.ai.services.trial_cache import dataset_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Report thresholds of SDMetrics' QualityReport
+REAL_CORRELATION_THRESHOLD = 0.5
+REAL_ASSOCIATION_THRESHOLD = 0.3
+
+# Bins of the continuous columns in contingency tables (np.histogram_bin_edges default)
+DISCRETE_BINS = 10
+
+# Decimals kept by KSComplement
+KS_DECIMALS = 14
+
+# Joint codes counted at once when scoring pairs (rows x pairs of a batch)
+PAIR_BATCH_CELLS = 2_000_000
+
+CONTINUOUS_SDTYPES = ("numerical", "datetime")
+DISCRETE_SDTYPES = ("categorical", "ordinal", "boolean")
+
+# Real data profiles kept in memory per process, and on disk across processes
+MAX_CACHED_PROFILES = 8
+MAX_PROFILE_FILES = 32
+PROFILE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "quality_profiles"
+
+# Bumped when the content of RealDataProfile changes (older files are ignored)
+PROFILE_VERSION = 1
+
+_profiles: "OrderedDict[str, RealDataProfile]" = OrderedDict()
+
+
+def metadata_columns(metadata: Any) -> Dict[str, Dict[str, Any]]:
+    """Columns of single table metadata (dict or SDV metadata object)"""
+    if hasattr(metadata, "to_dict"):
+        metadata = metadata.to_dict()
+    if "tables" in metadata:
+        metadata = next(iter(metadata["tables"].values()))
+    return metadata.get("columns", {})
+
+
+def _continuous_values(column: pd.Series, column_metadata: Dict[str, Any]) -> np.ndarray:
+    """Float values of a numerical or datetime column (NaN for missing values)"""
+    if column_metadata["sdtype"] == "datetime":
+        if not pd.api.types.is_datetime64_any_dtype(column):
+            column = pd.to_datetime(column, format=column_metadata.get("datetime_format"), errors="coerce")
+        values = column.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float)
+        values[column.isna().to_numpy()] = np.nan
+        return values
+    return pd.to_numeric(column, errors="coerce").to_numpy(dtype=float)
+
+
+def _continuous_matrix(data: pd.DataFrame, columns: Dict[str, Dict[str, Any]], names: List[str]) -> np.ndarray:
+    if not names:
+        return np.empty((len(data), 0))
+    return np.column_stack([_continuous_values(data[name], columns[name]) for name in names])
+
+
+def _bin_edges(values: np.ndarray) -> Optional[np.ndarray]:
+    """Histogram bin edges of a column (None when they cannot be computed)"""
+    try:
+        return np.histogram_bin_edges(values[~np.isnan(values)], bins=DISCRETE_BINS)
+    except Exception:
+        return None
+
+
+def _ecdf(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct values of a column (rounded as KSComplement) and their cumulative frequencies"""
+    values = np.round(values[~np.isnan(values)], KS_DECIMALS)
+    knots, counts = np.unique(values, return_counts=True)
+    return knots, np.cumsum(counts) / max(len(values), 1)
+
+
+def _ks_complement(real_ecdf: Tuple[np.ndarray, np.ndarray], synthetic: np.ndarray) -> float:
+    """1 - Kolmogorov-Smirnov statistic between a real ECDF and a synthetic column (NaN ignored)"""
+    knots, cdf = real_ecdf
+    synthetic = np.sort(np.round(synthetic[~np.isnan(synthetic)], KS_DECIMALS))
+    if not len(knots) or not len(synthetic):
+        return np.nan
+    # Both ECDFs compared at every real and synthetic value
+    points = np.concatenate([knots, synthetic])
+    position = np.searchsorted(knots, points, side="right")
+    real_cdf = np.where(position > 0, cdf[np.maximum(position - 1, 0)], 0.0)
+    synthetic_cdf = np.searchsorted(synthetic, points, side="right") / len(synthetic)
+    return 1.0 - float(np.abs(real_cdf - synthetic_cdf).max())
+
+
+def comoments(values: np.ndarray, shift: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairwise-complete co-moments of the columns of a float matrix, shifted by
+    ``shift`` (additive over row chunks)
+
+    Returns:
+        (n, sums, squares, products): rows where both columns i and j are
+        present, then the sums of x_i, x_i^2 and x_i * x_j over these rows
+    """
+    present = (~np.isnan(values)).astype(float)
+    centered = np.where(present > 0, values - shift, 0.0)
+    return present.T @ present, centered.T @ present, (centered ** 2).T @ present, centered.T @ centered
+
+
+def correlations_from_comoments(
+    n: np.ndarray,
+    sums: np.ndarray,
+    squares: np.ndarray,
+    products: np.ndarray
+) -> np.ndarray:
+    """Pearson correlation of every pair of columns from their co-moments (NaN when undefined)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = products - sums * sums.T / n
+        variance_x = squares - sums ** 2 / n
+        variance_y = squares.T - sums.T ** 2 / n
+        correlation = covariance / np.sqrt(variance_x * variance_y)
+    correlation[(n < 2) | (variance_x <= 0) | (variance_y <= 0)] = np.nan
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def _pairwise_correlations(values: np.ndarray) -> np.ndarray:
+    """Pearson correlation of every pair of columns on their rows without missing values"""
+    present = ~np.isnan(values)
+    # Centered first to limit cancellation in the sums of products
+    means = np.where(present, values, 0.0).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+    return correlations_from_comoments(*comoments(values, means))
+
+
+def _tv_complement(real_counts: np.ndarray, synthetic_counts: np.ndarray) -> float:
+    """
+    TVComplement from the category counts of a column (missing values
+    excluded), with the regularization of SDMetrics on synthetic-only categories
+    """
+    if real_counts.sum() == 0 or synthetic_counts.sum() == 0:
+        return np.nan
+    real_counts = real_counts + 1e-6 * ((real_counts == 0) & (synthetic_counts > 0))
+    variation = np.abs(synthetic_counts / synthetic_counts.sum() - real_counts / real_counts.sum()).sum()
+    return 1.0 - 0.5 * float(variation)
+
+
+def _joint_keys(
+    codes: np.ndarray,
+    cardinalities: np.ndarray,
+    pairs: np.ndarray,
+    offsets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct joint codes of a batch of pairs (offset per pair) and their counts"""
+    first, second = pairs[:, 0], pairs[:, 1]
+    keys = (offsets + codes[:, first] * cardinalities[second] + codes[:, second]).ravel()
+    size = int(offsets[-1] + cardinalities[first[-1]] * cardinalities[second[-1]])
+    if size <= 4 * keys.size:
+        counts = np.bincount(keys, minlength=size)
+        observed = np.flatnonzero(counts)
+        return observed, counts[observed]
+    return np.unique(keys, return_counts=True)
+
+
+def _batches(n_pairs: int, n_rows: int):
+    step = max(PAIR_BATCH_CELLS // max(n_rows, 1), 1)
+    for start in range(0, n_pairs, step):
+        yield start, min(start + step, n_pairs)
+
+
+class RealDataProfile:
+    """
+    Real side of the quality report of a dataset.
+
+    Args:
+        real_data: Real data
+        metadata: Single table metadata of the real data
+    """
+
+    def __init__(self, real_data: pd.DataFrame, metadata: Any):
+        self.columns = {
+            name: dict(column_metadata)
+            for name, column_metadata in metadata_columns(metadata).items()
+            if column_metadata.get("sdtype") in CONTINUOUS_SDTYPES + DISCRETE_SDTYPES
+            and name in real_data.columns
+        }
+        self.continuous = [name for name, meta in self.columns.items() if meta["sdtype"] in CONTINUOUS_SDTYPES]
+        self.discrete = [name for name, meta in self.columns.items() if meta["sdtype"] in DISCRETE_SDTYPES]
+        self.n_rows = len(real_data)
+        values = _continuous_matrix(real_data, self.columns, self.continuous)
+
+        # Column Shapes: ECDF of the continuous columns, category counts of the discrete ones
+        self.ecdfs = [_ecdf(values[:, index]) for index in range(len(self.continuous))]
+        self.vocabularies: List[pd.Index] = []
+        codes = []
+        for name in self.discrete:
+            column_codes, uniques = pd.factorize(real_data[name])
+            # Missing values take the code after the categories
+            codes.append(np.where(column_codes < 0, len(uniques), column_codes))
+            self.vocabularies.append(pd.Index(uniques))
+
+        # Bins of the continuous columns in contingency tables
+        self.bin_edges = [_bin_edges(values[:, index]) for index in range(len(self.continuous))]
+        for index, edges in enumerate(self.bin_edges):
+            codes.append(
+                np.digitize(values[:, index], bins=edges) if edges is not None
+                else np.zeros(self.n_rows, dtype=np.int64)
+            )
+        codes = np.column_stack(codes).astype(np.int64) if codes else np.empty((self.n_rows, 0), dtype=np.int64)
+        self.cardinalities = np.array(
+            [len(vocabulary) + 1 for vocabulary in self.vocabularies] + [DISCRETE_BINS + 2] * len(self.continuous),
+            dtype=np.int64
+        )
+        self.marginals = [
+            np.bincount(codes[:, index], minlength=int(cardinality))
+            for index, cardinality in enumerate(self.cardinalities)
+        ]
+
+        # Column Pair Trends
+        self.correlations = _pairwise_correlations(values)
+        self.constant = {name for name in self.continuous if real_data[name].nunique() == 1}
+        self.code_index = {name: index for index, name in enumerate(self.discrete + self.continuous)}
+        self.pairs = list(itertools.combinations(self.columns, 2))
+        contingency_pairs = np.array([
+            (self.code_index[first], self.code_index[second]) for first, second in self.pairs
+            if not (first in self.continuous and second in self.continuous)
+        ], dtype=np.int64).reshape(-1, 2)
+        self.contingency_pairs = contingency_pairs
+        self.associations = np.full(len(contingency_pairs), np.nan)
+        # Joint counts of the pairs that count in the score: (pair, code of the first column, code of the second, count)
+        tables = []
+        for start, end in _batches(len(contingency_pairs), self.n_rows):
+            batch = contingency_pairs[start:end]
+            sizes = self.cardinalities[batch[:, 0]] * self.cardinalities[batch[:, 1]]
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            keys, counts = _joint_keys(codes, self.cardinalities, batch, offsets) if self.n_rows else (
+                np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            )
+            pair = np.searchsorted(offsets, keys, side="right") - 1
+            local = keys - offsets[pair]
+            first_codes = local // self.cardinalities[batch[pair, 1]]
+            second_codes = local % self.cardinalities[batch[pair, 1]]
+            self.associations[start:end] = self._cramers_v(batch, pair, first_codes, second_codes, counts)
+            tables.append((pair + start, first_codes, second_codes, counts))
+        for name in self.continuous:
+            if self.bin_edges[self.continuous.index(name)] is None:
+                self.associations[np.any(contingency_pairs == self.code_index[name], axis=1)] = np.nan
+        kept = (
+            [np.concatenate(parts) for parts in zip(*tables)] if tables
+            else [np.empty(0, dtype=np.int64) for _ in range(4)]
+        )
+        contributing = ~np.isnan(self.associations) & (self.associations > REAL_ASSOCIATION_THRESHOLD)
+        mask = contributing[kept[0]] if len(kept[0]) else np.zeros(0, dtype=bool)
+        self.tables = [part[mask] for part in kept]
+
+    def _cramers_v(
+        self,
+        batch: np.ndarray,
+        pair: np.ndarray,
+        first_codes: np.ndarray,
+        second_codes: np.ndarray,
+        counts: np.ndarray
+    ) -> np.ndarray:
+        """Cramer's V of the real contingency tables of a batch of pairs: chi2 / n = sum(O^2 / (row * column)) - 1"""
+        if not len(counts):
+            return np.full(len(batch), np.nan)
+        marginal_offsets = np.concatenate([[0], np.cumsum(self.cardinalities)[:-1]])
+        marginals = np.concatenate(self.marginals).astype(float)
+        rows = marginals[marginal_offsets[batch[pair, 0]] + first_codes]
+        columns = marginals[marginal_offsets[batch[pair, 1]] + second_codes]
+        phi2 = np.bincount(pair, counts.astype(float) ** 2 / (rows * columns), minlength=len(batch)) - 1.0
+        observed = np.array([np.count_nonzero(marginal) for marginal in self.marginals])
+        dof = np.minimum(observed[batch[:, 0]], observed[batch[:, 1]]) - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(dof > 0, np.sqrt(np.maximum(phi2, 0.0) / dof), np.nan)
+
+
+def _profile_key(fingerprint: str, metadata: Any) -> str:
+    if metadata is None:
+        return f"{fingerprint[:32]}_detected"
+    digest = hashlib.sha256(
+        json.dumps(metadata_columns(metadata), sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{fingerprint[:32]}_{digest[:16]}"
+
+
+def _evict_profile_files() -> None:
+    """Delete the least recently used profile files beyond MAX_PROFILE_FILES"""
+    try:
+        files = sorted(PROFILE_DIR.glob("*.pkl"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in files[MAX_PROFILE_FILES:]:
+            path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Quality profile eviction failed: {e}")
+
+
+def get_real_profile(
+    real_data: pd.DataFrame,
+    metadata: Any = None,
+    fingerprint: Optional[str] = None,
+    persist: bool = False
+) -> RealDataProfile:
+    """
+    Real data profile of a dataset, from the in-memory cache, then the disk,
+    and computed on first use (metadata detected when missing). A computed
+    profile is saved to disk only with ``persist`` (evaluation holdouts).
+    """
+    key = _profile_key(fingerprint or dataset_fingerprint(real_data), metadata)
+    profile = _profiles.get(key)
+    if profile is not None:
+        _profiles.move_to_end(key)
+        return profile
+
+    path = PROFILE_DIR / f"{key}.pkl"
+    try:
+        if path.exists():
+            with open(path, "rb") as f:
+                version, profile = pickle.load(f)
+            if version != PROFILE_VERSION:
+                profile = None
+            else:
+                # Recently used files are the last evicted
+                os.utime(path)
+    except Exception as e:
+        logger.warning(f"Quality profile {path.name} not loaded: {e}")
+        profile = None
+
+    if profile is None:
+        if metadata is None:
+            detected = SingleTableMetadata()
+            detected.detect_from_dataframe(real_data)
+            metadata = detected.to_dict()
+        profile = RealDataProfile(real_data, metadata)
+        if persist:
+            try:
+                PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+                temporary = path.with_suffix(".tmp")
+                with open(temporary, "wb") as f:
+                    pickle.dump((PROFILE_VERSION, profile), f)
+                os.replace(temporary, path)
+            except Exception as e:
+                logger.warning(f"Quality profile {path.name} not saved: {e}")
+            _evict_profile_files()
+
+    _profiles[key] = profile
+    while len(_profiles) > MAX_CACHED_PROFILES:
+        _profiles.popitem(last=False)
+    return profile
+
+
+class NativeQualityReport:
+    """
+    Drop-in replacement of SDMetrics' single table ``QualityReport``
+    (``generate``, ``get_score``, ``get_properties``, ``get_details``).
+    """
+
+    def __init__(self):
+        self._overall_score: Optional[float] = None
+        self._details: Dict[str, pd.DataFrame] = {}
+
+    def generate(
+        self,
+        real_data: pd.DataFrame,
+        synthetic_data: pd.DataFrame,
+        metadata: Any,
+        verbose: bool = False,
+        profile: Optional[RealDataProfile] = None,
+        synthetic_ranges: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Score the synthetic data against the real data (or its precomputed
+        profile). When the synthetic data is a sample of a larger table,
+        ``synthetic_ranges`` (minimum, maximum of each continuous column of the
+        whole table) gives the contingency bins of the whole table.
+        """
+        if profile is None:
+            profile = RealDataProfile(real_data, metadata)
+        values = _continuous_matrix(synthetic_data, profile.columns, profile.continuous)
+        n_rows = len(synthetic_data)
+
+        # Codes of the synthetic discrete columns in the real vocabularies (unseen categories after the missing code)
+        codes, cardinalities = [], []
+        for name, vocabulary in zip(profile.discrete, profile.vocabularies):
+            column = synthetic_data[name]
+            column_codes = vocabulary.get_indexer(column)
+            missing = column.isna().to_numpy()
+            unseen = (column_codes < 0) & ~missing
+            unseen_codes, unseen_values = pd.factorize(column[unseen])
+            column_codes[missing] = len(vocabulary)
+            column_codes[unseen] = len(vocabulary) + 1 + unseen_codes
+            codes.append(column_codes)
+            cardinalities.append(len(vocabulary) + 1 + len(unseen_values))
+        failed_discretization = set()
+        for index, name in enumerate(profile.continuous):
+            edges = _bin_edges(values[:, index] if synthetic_ranges is None else synthetic_ranges[index])
+            if edges is None:
+                failed_discretization.add(name)
+            codes.append(
+                np.digitize(values[:, index], bins=edges) if edges is not None
+                else np.zeros(n_rows, dtype=np.int64)
+            )
+            cardinalities.append(DISCRETE_BINS + 2)
+        codes = np.column_stack(codes).astype(np.int64) if codes else np.empty((n_rows, 0), dtype=np.int64)
+        cardinalities = np.maximum(np.array(cardinalities, dtype=np.int64), profile.cardinalities)
+
+        # Column Shapes
+        shape_scores = {}
+        for index, name in enumerate(profile.continuous):
+            shape_scores[name] = _ks_complement(profile.ecdfs[index], values[:, index])
+        for index, name in enumerate(profile.discrete):
+            missing = len(profile.vocabularies[index])
+            real_counts = np.zeros(cardinalities[index])
+            real_counts[:len(profile.marginals[index])] = profile.marginals[index]
+            synthetic_counts = np.bincount(codes[:, index], minlength=int(cardinalities[index])).astype(float)
+            real_counts[missing] = synthetic_counts[missing] = 0.0
+            shape_scores[name] = _tv_complement(real_counts, synthetic_counts)
+
+        # Column Pair Trends: contingency tables of the pairs above the association threshold
+        contributing = np.flatnonzero(
+            ~np.isnan(profile.associations) & (profile.associations > REAL_ASSOCIATION_THRESHOLD)
+        )
+        contingency_scores = np.full(len(profile.contingency_pairs), np.nan)
+        table_pairs, first_codes, second_codes, table_counts = profile.tables
+        if not n_rows:
+            # No synthetic frequency: the variation is half of the real frequencies (as in SDMetrics)
+            real_totals = np.bincount(table_pairs, table_counts, minlength=len(profile.contingency_pairs))
+            contingency_scores[contributing] = 1.0 - 0.5 * real_totals[contributing] / profile.n_rows
+        for start, end in _batches(len(contributing), n_rows):
+            if not n_rows:
+                break
+            pair_indices = contributing[start:end]
+            batch = profile.contingency_pairs[pair_indices]
+            sizes = cardinalities[batch[:, 0]] * cardinalities[batch[:, 1]]
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+            synthetic_keys, synthetic_counts = _joint_keys(codes, cardinalities, batch, offsets)
+            # Real cells of the batch, keyed with the (possibly widened) synthetic cardinalities
+            cells = np.isin(table_pairs, pair_indices)
+            position = np.searchsorted(pair_indices, table_pairs[cells])
+            real_keys = offsets[position] + first_codes[cells] * cardinalities[batch[position, 1]] + second_codes[cells]
+            keys, inverse = np.unique(np.concatenate([real_keys, synthetic_keys]), return_inverse=True)
+            difference = np.bincount(
+                inverse,
+                np.concatenate([table_counts[cells] / profile.n_rows, -synthetic_counts / n_rows]),
+                minlength=len(keys)
+            )
+            pair_of_key = np.searchsorted(offsets, keys, side="right") - 1
+            variation = 0.5 * np.bincount(pair_of_key, np.abs(difference), minlength=len(batch))
+            contingency_scores[pair_indices] = 1.0 - variation
+
+        self.assemble(
+            profile,
+            shape_scores,
+            _pairwise_correlations(values),
+            {name for name in profile.continuous if synthetic_data[name].nunique() == 1},
+            contingency_scores,
+            failed_discretization
+        )
+
+    def assemble(
+        self,
+        profile: RealDataProfile,
+        shape_scores: Dict[str, float],
+        synthetic_correlations: np.ndarray,
+        synthetic_constant: set,
+        contingency_scores: np.ndarray,
+        failed_discretization: set
+    ) -> None:
+        """
+        Fill the report from the synthetic-side results (column scores,
+        correlation matrix of the continuous columns, contingency similarity
+        of each pair of ``profile.contingency_pairs``)
+        """
+        columns = profile.columns
+        self._details["Column Shapes"] = pd.DataFrame({
+            "Column": list(columns),
+            "Metric": [
+                "KSComplement" if columns[name]["sdtype"] in CONTINUOUS_SDTYPES else "TVComplement"
+                for name in columns
+            ],
+            "Score": [shape_scores[name] for name in columns]
+        })
+
+        continuous_index = {name: index for index, name in enumerate(profile.continuous)}
+        constant = profile.constant | synthetic_constant
+        rows = []
+        contingency = iter(zip(contingency_scores, profile.associations))
+        for first, second in profile.pairs:
+            if first in continuous_index and second in continuous_index:
+                real = profile.correlations[continuous_index[first], continuous_index[second]]
+                synthetic = synthetic_correlations[continuous_index[first], continuous_index[second]]
+                # CorrelationSimilarity rejects columns constant in either table
+                if first in constant or second in constant:
+                    real = synthetic = np.nan
+                meets = bool(abs(real) > REAL_CORRELATION_THRESHOLD) if not np.isnan(real) else False
+                score = 1 - abs(real - synthetic) / 2 if meets else np.nan
+                rows.append((first, second, "CorrelationSimilarity", score, real, synthetic, np.nan, meets))
+            else:
+                score, association = next(contingency)
+                if first in failed_discretization or second in failed_discretization:
+                    score = association = np.nan
+                meets = bool(association > REAL_ASSOCIATION_THRESHOLD) if not np.isnan(association) else False
+                rows.append((
+                    first, second, "ContingencySimilarity", score if meets else np.nan,
+                    np.nan, np.nan, association, meets
+                ))
+        self._details["Column Pair Trends"] = pd.DataFrame(rows, columns=[
+            "Column 1", "Column 2", "Metric", "Score", "Real Correlation",
+            "Synthetic Correlation", "Real Association", "Meets Threshold?"
+        ])
+
+        property_scores = [self._property_score(name) for name in self._details]
+        self._overall_score = float(np.nanmean(property_scores)) if not all(
+            np.isnan(score) for score in property_scores
+        ) else float("nan")
+
+    def _property_score(self, property_name: str) -> float:
+        details = self._details[property_name]
+        if "Meets Threshold?" in details.columns:
+            details = details[details["Meets Threshold?"].astype(bool)]
+        return float(details["Score"].mean()) if len(details) else float("nan")
+
+    def get_score(self) -> float:
+        """Overall quality score (mean of the property scores)"""
+        if self._overall_score is None:
+            raise ValueError("The report has not been generated yet")
+        return self._overall_score
+
+    def get_properties(self) -> pd.DataFrame:
+        """Score of each property"""
+        return pd.DataFrame({
+            "Property": list(self._details),
+            "Score": [self._property_score(name) for name in self._details]
+        })
+
+    def get_details(self, property_name: str) -> pd.DataFrame:
+        """Per-column (or per-pair) scores of a property"""
+        return self._details[property_name].copy()
+
+
+def quality_report(
+    real_data: pd.DataFrame,
+    synthetic_data: pd.DataFrame,
+    metadata: Any,
+    engine: str = "native",
+    fingerprint: Optional[str] = None,
+    persist_profile: bool = False
+):
+    """
+    Generated quality report of the chosen engine ("native" or "sdmetrics");
+    the native engine reuses the cached profile of the real data (saved to
+    disk with ``persist_profile``)
+    """
+    if engine == "native":
+        report = NativeQualityReport()
+        report.generate(
+            real_data, synthetic_data, metadata,
+            profile=get_real_profile(real_data, metadata, fingerprint, persist_profile)
+        )
+        return report
+
+    from sdmetrics.reports.single_table import QualityReport
+    report = QualityReport()
+    if hasattr(metadata, "to_dict"):
+        metadata = metadata.to_dict()
+    report.generate(real_data, synthetic_data, metadata, verbose=False)
+    return report
@@ -1,27 +1,42 @@
 import pandas as pd
-from sdmetrics.reports.single_table import QualityReport
+from typing import Any, Dict, Optional
 from sdv.metadata import SingleTableMetadata
 
+from app.core.config import settings
+from app.ai.services.quality_engine import quality_report
+
 class QualityValidator:
     def __init__(self):
         self.metadata = None
 
-    def evaluate(self, real_data: pd.DataFrame, synthetic_data: pd.DataFrame) -> float:
+    def evaluate(
+        self,
+        real_data: pd.DataFrame,
+        synthetic_data: pd.DataFrame,
+        metadata: Optional[Dict[str, Any]] = None,
+        fingerprint: Optional[str] = None,
+        persist_profile: bool = False
+    ) -> float:
         """
         Évalue la qualité des données synthétiques générées
         Retourne un score entre 0 et 1
+        
+        metadata: métadonnées déjà détectées sur real_data (sinon détectées à chaque appel)
+        fingerprint: empreinte de real_data si déjà connue (clé du profil des données réelles)
+        persist_profile: garde aussi le profil sur disque (échantillons d'évaluation réutilisés)
         """
         try:
-            # Création des métadonnées
-            self.metadata = SingleTableMetadata()
-            self.metadata.detect_from_dataframe(real_data)
+            # Création des métadonnées (le moteur natif les met en cache avec le profil des données réelles)
+            if metadata is None and settings.QUALITY_ENGINE != "native":
+                self.metadata = SingleTableMetadata()
+                self.metadata.detect_from_dataframe(real_data)
+                metadata = self.metadata.to_dict()
 
-            # Génération du rapport de qualité
-            report = QualityReport()
-            report.generate(
-                real_data=real_data,
-                synthetic_data=synthetic_data,
-                metadata=self.metadata.to_dict()
+            # Génération du rapport de qualité (moteur choisi par QUALITY_ENGINE)
+            report = quality_report(
+                real_data, synthetic_data, metadata,
+                engine=settings.QUALITY_ENGINE, fingerprint=fingerprint,
+                persist_profile=persist_profile
             )
 
             # Récupération du score global
@@ -0,0 +1,351 @@
+"""
+Incremental quality evaluation over synthetic chunks.
+
+``StreamingQualityEvaluator`` gives the score of the native quality report
+(see quality_engine) without holding the synthetic data: each ``update``
+folds a chunk into additive statistics whose size does not depend on the
+number of synthetic rows, and ``score`` reads the report from them.
+
+- KSComplement: synthetic counts below / at each knot of the real ECDF. The
+  KS statistic is a supremum over both ECDFs, reached at a real knot or just
+  before one, so it is exact.
+- TVComplement: category counts, exact.
+- CorrelationSimilarity: pairwise-complete co-moment matrices, exact up to
+  floating point rounding.
+- ContingencySimilarity: joint counts of the pairs above the association
+  threshold. SDMetrics bins a synthetic continuous column between its own
+  minimum and maximum, only known at the end; its values are counted on a
+  grid of GRID_BINS sub-bins whose range doubles (merging sub-bins) when a
+  chunk falls outside. The smallest and largest value of each sub-bin are
+  kept, so a sub-bin whose values all fall in one final bin is assigned
+  exactly; only a sub-bin that straddles one of the 9 inner bin edges goes
+  to the bin of its center. With GRID_BINS = 4096 the data spans at least
+  2048 sub-bins, so at most 9 / 2048 of a uniform column can be misassigned:
+  pair scores stay within 0.01 and the overall score within 1e-3 of the
+  batch report (about 1e-5 to 5e-4 measured from 10k to 1M rows).
+"""
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.ai.services.quality_engine import (
+    DISCRETE_BINS,
+    KS_DECIMALS,
+    REAL_ASSOCIATION_THRESHOLD,
+    NativeQualityReport,
+    RealDataProfile,
+    _continuous_matrix,
+    _tv_complement,
+    comoments,
+    correlations_from_comoments,
+    get_real_profile
+)
+
+# Sub-bins of the synthetic range of a continuous column in contingency tables
+GRID_BINS = 4096
+
+
+class StreamingQualityEvaluator:
+    """
+    Quality report of synthetic data received in chunks.
+
+    Args:
+        real_data: Real data (only used to build or find its cached profile)
+        metadata: Metadata of the real data, detected when missing
+        fingerprint: Fingerprint of the real data if already known
+        profile: Real data profile, instead of ``real_data``
+    """
+
+    def __init__(
+        self,
+        real_data: Optional[pd.DataFrame] = None,
+        metadata: Any = None,
+        fingerprint: Optional[str] = None,
+        profile: Optional[RealDataProfile] = None
+    ):
+        self.profile = profile or get_real_profile(real_data, metadata, fingerprint)
+        profile = self.profile
+        self.n_rows = 0
+        n_continuous = len(profile.continuous)
+
+        # Column Shapes
+        self._below = [np.zeros(len(knots) + 1) for knots, _ in profile.ecdfs]
+        self._equal = [np.zeros(len(knots)) for knots, _ in profile.ecdfs]
+        self._unseen = [pd.Index([]) for _ in profile.discrete]
+        self._category_counts = [np.zeros(len(vocabulary) + 1) for vocabulary in profile.vocabularies]
+
+        # Correlations, ranges of the continuous columns
+        self._shift: Optional[np.ndarray] = None
+        self._comoments: Optional[List[np.ndarray]] = None
+        self._minimum = np.full(n_continuous, np.inf)
+        self._maximum = np.full(n_continuous, -np.inf)
+        self._non_finite = np.zeros(n_continuous, dtype=bool)
+        self._grids: Dict[int, Tuple[float, float]] = {}
+        # Smallest and largest value counted in each sub-bin of a grid
+        self._cell_ranges: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+        # Joint counts of the contingency pairs that count in the score
+        self._contributing = np.flatnonzero(
+            ~np.isnan(profile.associations) & (profile.associations > REAL_ASSOCIATION_THRESHOLD)
+        )
+        self._tables: Dict[int, np.ndarray] = {}
+        self._missing_rows: Dict[int, np.ndarray] = {}
+        self._maximum_rows: Dict[int, np.ndarray] = {}
+
+    def _cardinality(self, code_index: int) -> int:
+        """Current number of codes of a discrete column (real categories, missing, unseen)"""
+        return len(self.profile.vocabularies[code_index]) + 1 + len(self._unseen[code_index])
+
+    def _pair_columns(self, pair_index: int) -> Tuple[int, int, bool]:
+        """
+        (continuous column or first discrete column, other discrete column,
+        whether the pair has a continuous column), in code indices
+        """
+        first, second = self.profile.contingency_pairs[pair_index]
+        n_discrete = len(self.profile.discrete)
+        if first >= n_discrete:
+            return first - n_discrete, second, True
+        if second >= n_discrete:
+            return second - n_discrete, first, True
+        return first, second, False
+
+    def _discrete_codes(self, chunk: pd.DataFrame) -> np.ndarray:
+        codes = []
+        for index, (name, vocabulary) in enumerate(zip(self.profile.discrete, self.profile.vocabularies)):
+            column = chunk[name]
+            column_codes = vocabulary.get_indexer(column)
+            missing = column.isna().to_numpy()
+            unseen = (column_codes < 0) & ~missing
+            if unseen.any():
+                values = column[unseen]
+                new = pd.Index(pd.unique(values)).difference(self._unseen[index], sort=False)
+                self._unseen[index] = self._unseen[index].append(new)
+                column_codes[unseen] = len(vocabulary) + 1 + self._unseen[index].get_indexer(values)
+            column_codes[missing] = len(vocabulary)
+            codes.append(column_codes)
+        return np.column_stack(codes).astype(np.int64) if codes else np.empty((len(chunk), 0), dtype=np.int64)
+
+    def _cover(self, column: int, low: float, high: float) -> None:
+        """Widen the grid of a continuous column to [low, high], merging its sub-bins"""
+        if column not in self._grids:
+            width = (high - low) / GRID_BINS if high > low else max(abs(low), 1.0) * 2.0 ** -30
+            self._grids[column] = (low, width)
+            self._cell_ranges[column] = (np.full(GRID_BINS, np.inf), np.full(GRID_BINS, -np.inf))
+            return
+        start, width = self._grids[column]
+        low, high = min(low, self._minimum[column]), max(high, self._maximum[column])
+        if low >= start and high < start + GRID_BINS * width:
+            return
+        # The new grid starts on the old sub-bin of the lowest value and takes the smallest
+        # power-of-two width covering the values: the empty sub-bins around them are dropped
+        offset = math.floor((low - start) / width)
+        factor = 1
+        while start + offset * width + GRID_BINS * factor * width <= high:
+            factor *= 2
+        # Old sub-bin i falls in new sub-bin (i - offset) // factor (only empty sub-bins fall outside)
+        target = np.clip((np.arange(GRID_BINS) - offset) // factor, 0, GRID_BINS - 1)
+        for pair_index in self._contributing:
+            continuous, _, has_continuous = self._pair_columns(pair_index)
+            if has_continuous and continuous == column and pair_index in self._tables:
+                table = self._tables[pair_index]
+                merged = np.zeros_like(table)
+                np.add.at(merged, target, table)
+                self._tables[pair_index] = merged
+        lowest, highest = np.full(GRID_BINS, np.inf), np.full(GRID_BINS, -np.inf)
+        np.minimum.at(lowest, target, self._cell_ranges[column][0])
+        np.maximum.at(highest, target, self._cell_ranges[column][1])
+        self._cell_ranges[column] = (lowest, highest)
+        self._grids[column] = (start + offset * width, width * factor)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold a chunk of synthetic rows into the statistics"""
+        if not len(chunk):
+            return
+        profile = self.profile
+        values = _continuous_matrix(chunk, profile.columns, profile.continuous)
+        codes = self._discrete_codes(chunk)
+        self.n_rows += len(chunk)
+
+        # Column Shapes
+        for index, (knots, _) in enumerate(profile.ecdfs):
+            column = np.round(values[:, index][~np.isnan(values[:, index])], KS_DECIMALS)
+            left = np.searchsorted(knots, column, side="left")
+            right = np.searchsorted(knots, column, side="right")
+            self._below[index] += np.bincount(left, minlength=len(knots) + 1)
+            self._equal[index] += np.bincount(left[right > left], minlength=len(knots))
+        for index in range(len(profile.discrete)):
+            counts = np.bincount(codes[:, index], minlength=self._cardinality(index))
+            self._category_counts[index] = np.pad(
+                self._category_counts[index], (0, len(counts) - len(self._category_counts[index]))
+            ) + counts
+
+        # Correlations
+        if self._shift is None:
+            present = ~np.isnan(values)
+            self._shift = np.where(present, values, 0.0).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+        moments = comoments(values, self._shift)
+        self._comoments = list(moments) if self._comoments is None else [
+            total + part for total, part in zip(self._comoments, moments)
+        ]
+
+        # Contingency tables
+        finite = np.isfinite(values)
+        self._non_finite |= (~finite & ~np.isnan(values)).any(axis=0)
+        chunk_minimum = np.where(finite, values, np.inf).min(axis=0, initial=np.inf)
+        chunk_maximum = np.where(finite, values, -np.inf).max(axis=0, initial=-np.inf)
+        cells = {}
+        for column in range(len(profile.continuous)):
+            if not np.isfinite(chunk_minimum[column]) or not self._involved(column):
+                continue
+            self._cover(column, chunk_minimum[column], chunk_maximum[column])
+            start, width = self._grids[column]
+            x = values[finite[:, column], column]
+            cells[column] = np.clip(np.floor((x - start) / width).astype(np.int64), 0, GRID_BINS - 1)
+            np.minimum.at(self._cell_ranges[column][0], cells[column], x)
+            np.maximum.at(self._cell_ranges[column][1], cells[column], x)
+        for pair_index in self._contributing:
+            first, second, has_continuous = self._pair_columns(pair_index)
+            categories = self._cardinality(second)
+            if not has_continuous:
+                shape = (self._cardinality(first), categories)
+                counts = np.bincount(codes[:, first] * categories + codes[:, second], minlength=shape[0] * shape[1])
+                self._add(self._tables, pair_index, counts.reshape(shape))
+                continue
+            x, other = values[:, first], codes[:, second]
+            present = finite[:, first]
+            self._add(self._missing_rows, pair_index, np.bincount(other[~present], minlength=categories))
+            if not present.any():
+                continue
+            counts = np.bincount(cells[first] * categories + other[present], minlength=GRID_BINS * categories)
+            self._add(self._tables, pair_index, counts.reshape(GRID_BINS, categories))
+            # Rows at the maximum go to the last bin with the missing values (np.digitize)
+            at_maximum = np.bincount(other[x == chunk_maximum[first]], minlength=categories)
+            if chunk_maximum[first] > self._maximum[first]:
+                self._maximum_rows[pair_index] = at_maximum
+            elif chunk_maximum[first] == self._maximum[first]:
+                self._add(self._maximum_rows, pair_index, at_maximum)
+        self._minimum = np.minimum(self._minimum, chunk_minimum)
+        self._maximum = np.maximum(self._maximum, chunk_maximum)
+
+    def _involved(self, column: int) -> bool:
+        """Whether a continuous column is in a contingency pair that counts"""
+        return any(
+            has_continuous and continuous == column
+            for continuous, _, has_continuous in map(self._pair_columns, self._contributing)
+        )
+
+    @staticmethod
+    def _add(store: Dict[int, np.ndarray], key: int, counts: np.ndarray) -> None:
+        """Add counts to a stored array, padding both to the largest shape"""
+        total = store.get(key)
+        if total is None:
+            store[key] = counts.astype(float)
+            return
+        shape = np.maximum(total.shape, counts.shape)
+        store[key] = (
+            np.pad(total, [(0, s - t) for s, t in zip(shape, total.shape)])
+            + np.pad(counts, [(0, s - c) for s, c in zip(shape, counts.shape)])
+        )
+
+    def _ks_complement(self, index: int) -> float:
+        knots, cdf = self.profile.ecdfs[index]
+        n = self._below[index].sum()
+        if not len(knots) or not n:
+            return np.nan
+        # Values with k knots below them are at most knot k
+        at = np.cumsum(self._below[index])[:len(knots)] / n
+        before = at - self._equal[index] / n
+        # On [knot k-1, knot k) the real ECDF is flat and the synthetic one rises up to `before[k]`
+        previous = np.concatenate([[0.0], cdf[:-1]])
+        return 1.0 - float(max(np.abs(cdf - at).max(), np.abs(previous - before).max()))
+
+    def _binned_table(self, pair_index: int) -> Optional[np.ndarray]:
+        """Joint counts of a pair with a continuous column, in the final histogram bins (None if binning fails)"""
+        column, other, _ = self._pair_columns(pair_index)
+        if self._non_finite[column]:
+            return None
+        binned = np.zeros((DISCRETE_BINS + 2, self._cardinality(other)))
+        missing = self._missing_rows.get(pair_index)
+        if missing is not None:
+            binned[DISCRETE_BINS + 1, :len(missing)] += missing
+        if column not in self._grids:
+            return binned
+        minimum, maximum = self._minimum[column], self._maximum[column]
+        edges = np.histogram_bin_edges(np.array([minimum, maximum]), bins=DISCRETE_BINS)
+        start, width = self._grids[column]
+        grid = self._tables[pair_index]
+        grid = np.pad(grid, [(0, 0), (0, binned.shape[1] - grid.shape[1])])
+        # A sub-bin whose values all fall in one bin is assigned exactly, otherwise by its center
+        lowest, highest = self._cell_ranges[column]
+        target = np.clip(np.digitize(lowest, bins=edges), 1, DISCRETE_BINS)
+        straddling = target != np.clip(np.digitize(highest, bins=edges), 1, DISCRETE_BINS)
+        centers = start + (np.arange(GRID_BINS) + 0.5) * width
+        target[straddling] = np.clip(np.digitize(centers[straddling], bins=edges), 1, DISCRETE_BINS)
+        np.add.at(binned, target, grid)
+        at_maximum = self._maximum_rows[pair_index]
+        last = min(int((maximum - start) // width), GRID_BINS - 1)
+        binned[target[last], :len(at_maximum)] -= at_maximum
+        binned[np.digitize(maximum, bins=edges), :len(at_maximum)] += at_maximum
+        return binned
+
+    def report(self) -> NativeQualityReport:
+        """Quality report of the rows received so far"""
+        profile = self.profile
+        shape_scores = {name: self._ks_complement(index) for index, name in enumerate(profile.continuous)}
+        for index, name in enumerate(profile.discrete):
+            synthetic_counts = np.pad(
+                self._category_counts[index], (0, max(self._cardinality(index) - len(self._category_counts[index]), 0))
+            )
+            real_counts = np.zeros(len(synthetic_counts))
+            real_counts[:len(profile.marginals[index])] = profile.marginals[index]
+            missing = len(profile.vocabularies[index])
+            real_counts[missing] = synthetic_counts[missing] = 0.0
+            shape_scores[name] = _tv_complement(real_counts, synthetic_counts)
+
+        n_continuous = len(profile.continuous)
+        correlations = (
+            correlations_from_comoments(*self._comoments) if self._comoments is not None
+            else np.full((n_continuous, n_continuous), np.nan)
+        )
+        constant = {
+            name for index, name in enumerate(profile.continuous)
+            if self._below[index].sum() > 0 and self._minimum[index] == self._maximum[index]
+        }
+
+        contingency_scores = np.full(len(profile.contingency_pairs), np.nan)
+        failed_discretization = set()
+        table_pairs, first_codes, second_codes, table_counts = profile.tables
+        for pair_index in self._contributing:
+            if not self.n_rows:
+                break
+            first, second = profile.contingency_pairs[pair_index]
+            column, _, has_continuous = self._pair_columns(pair_index)
+            if has_continuous:
+                synthetic = self._binned_table(pair_index)
+                if synthetic is None:
+                    failed_discretization.add(profile.continuous[column])
+                    continue
+                if second == column + len(profile.discrete):
+                    synthetic = synthetic.T
+            else:
+                synthetic = self._tables[pair_index]
+            start, end = np.searchsorted(table_pairs, [pair_index, pair_index + 1])
+            shape = (
+                max(synthetic.shape[0], profile.cardinalities[first]),
+                max(synthetic.shape[1], profile.cardinalities[second])
+            )
+            real = np.zeros(shape)
+            np.add.at(real, (first_codes[start:end], second_codes[start:end]), table_counts[start:end])
+            synthetic = np.pad(synthetic, [(0, s - t) for s, t in zip(shape, synthetic.shape)])
+            variation = 0.5 * np.abs(real / profile.n_rows - synthetic / self.n_rows).sum()
+            contingency_scores[pair_index] = 1.0 - variation
+
+        report = NativeQualityReport()
+        report.assemble(profile, shape_scores, correlations, constant, contingency_scores, failed_discretization)
+        return report
+
+    def score(self) -> float:
+        """Overall quality score of the rows received so far"""
+        return self.report().get_score()
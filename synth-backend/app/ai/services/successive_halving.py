@@ -0,0 +1,238 @@
+"""
+Successive-halving searches (Hyperband and ASHA) with epoch budgets.
+
+Instead of training every configuration for its full number of epochs, many
+configurations are first trained with a small budget and only the best
+``1 / eta`` of them (by quality score) are promoted to a budget ``eta`` times
+larger, up to the maximum budget.
+
+- Hyperband runs several synchronous successive-halving brackets, from the
+  most aggressive one (many configurations, smallest budget) to a plain
+  search at the maximum budget, so that a bad choice of minimum budget costs
+  at most one bracket.
+- ASHA (asynchronous successive halving) promotes a configuration as soon as
+  it ranks in the top ``1 / eta`` of the trials completed at its rung, so
+  workers never wait for a whole rung to finish.
+
+Trials run on a TrialExecutor; every completed trial is reported through
+``on_result`` as {"config", "budget", "score", "result", "error"}. With a
+TrialBudget, trials whose estimated cost exceeds the remaining time are
+skipped (never shrunk, so that a rung compares equal budgets).
+"""
+import asyncio
+import math
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from app.ai.services.trial_executor import TrialExecutor
+from app.ai.services.budget_scheduler import TrialBudget
+
+logger = logging.getLogger(__name__)
+
+# Ratio between two consecutive budgets (and fraction 1/eta promoted)
+DEFAULT_ETA = 3
+
+# Smallest number of epochs a configuration is trained for
+MIN_EPOCH_BUDGET = 50
+
+
+def budget_ladder(min_budget: int, max_budget: int, eta: int = DEFAULT_ETA) -> List[int]:
+    """Budgets of the rungs, ``max_budget / eta^k`` down to at least ``min_budget``"""
+    if max_budget <= min_budget:
+        return [max_budget]
+    s_max = int(math.floor(math.log(max_budget / min_budget, eta) + 1e-9))
+    return [int(round(max_budget / eta ** (s_max - k))) for k in range(s_max + 1)]
+
+
+def hyperband_brackets(min_budget: int, max_budget: int, eta: int = DEFAULT_ETA) -> List[List[Dict[str, int]]]:
+    """
+    Rungs of every Hyperband bracket, most aggressive first.
+
+    Returns:
+        One list of {"n_configs", "budget"} per bracket
+    """
+    budgets = budget_ladder(min_budget, max_budget, eta)
+    s_max = len(budgets) - 1
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        brackets.append([
+            {"n_configs": max(int(n // eta ** i), 1), "budget": budgets[s_max - s + i]}
+            for i in range(s + 1)
+        ])
+    return brackets
+
+
+class SuccessiveHalvingSearch:
+    """
+    Multi-fidelity search over configurations with an epoch budget.
+
+    Args:
+        executor: Executor running the trials (entered as a context manager by the search)
+        trial_fn: Worker function run on each job
+        make_job: ``make_job(config, budget, trial_index)`` -> picklable job for ``trial_fn``
+        get_score: Quality score of a ``trial_fn`` result
+        min_budget: Smallest budget (epochs)
+        max_budget: Largest budget (epochs)
+        eta: Promotion ratio
+        on_result: Called with every completed trial record
+        time_budget: Wall-clock / evaluation budget of the search
+    """
+
+    def __init__(
+        self,
+        executor: TrialExecutor,
+        trial_fn: Callable[[Any], Any],
+        make_job: Callable[[Dict[str, Any], int, int], Any],
+        get_score: Callable[[Any], float],
+        min_budget: int,
+        max_budget: int,
+        eta: int = DEFAULT_ETA,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        time_budget: Optional[TrialBudget] = None
+    ):
+        self.executor = executor
+        self.trial_fn = trial_fn
+        self.make_job = make_job
+        self.get_score = get_score
+        self.budgets = budget_ladder(min_budget, max_budget, eta)
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.eta = eta
+        self.on_result = on_result
+        self.time_budget = time_budget
+        self.records: List[Dict[str, Any]] = []
+
+    def _record(self, config: Dict[str, Any], budget: int, result: Any, error: Optional[Exception]) -> Dict[str, Any]:
+        score = None
+        if error is None:
+            try:
+                score = self.get_score(result)
+            except Exception as e:
+                error = e
+        record = {"config": config, "budget": budget, "score": score, "result": result, "error": error}
+        self.records.append(record)
+        if error is not None:
+            logger.warning(f"Trial {config} at budget {budget} failed: {error}")
+        else:
+            logger.info(f"Trial {config} at budget {budget}: score {score:.4f}")
+        if self.on_result:
+            self.on_result(record)
+        return record
+
+    def _fits(self, config: Dict[str, Any], budget: int, reserved: int = 0) -> bool:
+        """Whether a trial fits in the remaining time / evaluation budget"""
+        if self.time_budget is None:
+            return True
+        params = {**config, "epochs": budget}
+        return self.time_budget.plan(params, reserved) == params
+
+    def _top(self, records: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        succeeded = [r for r in records if r["score"] is not None]
+        return sorted(succeeded, key=lambda r: r["score"], reverse=True)[:k]
+
+    def hyperband_trial_count(self, n_available: Optional[int] = None) -> int:
+        """Number of trials a Hyperband run performs (``n_available``: distinct configurations)"""
+        total = 0
+        for bracket in hyperband_brackets(self.min_budget, self.max_budget, self.eta):
+            n = bracket[0]["n_configs"] if n_available is None else min(bracket[0]["n_configs"], n_available)
+            for rung in bracket:
+                total += min(rung["n_configs"], n)
+                n = min(rung["n_configs"], n)
+        return total
+
+    async def _run_rung(self, configs: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+        configs = [config for i, config in enumerate(configs) if self._fits(config, budget, i)]
+        jobs = [
+            self.make_job(config, budget, len(self.records) + i)
+            for i, config in enumerate(configs)
+        ]
+        records = []
+        async for outcome in self.executor.map(self.trial_fn, jobs):
+            records.append(self._record(configs[outcome["index"]], budget, outcome["result"], outcome["error"]))
+        return records
+
+    async def hyperband(self, sample_configs: Callable[[int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Run every Hyperband bracket.
+
+        Args:
+            sample_configs: ``sample_configs(n)`` -> up to n configurations (without budget)
+
+        Returns:
+            Records of all trials
+        """
+        with self.executor:
+            for bracket in hyperband_brackets(self.min_budget, self.max_budget, self.eta):
+                if self.time_budget is not None and self.time_budget.exhausted:
+                    logger.info("Time budget exhausted, remaining Hyperband brackets skipped")
+                    break
+                configs = sample_configs(bracket[0]["n_configs"])
+                logger.info(
+                    f"Hyperband bracket: {len(configs)} configs, budgets "
+                    f"{[rung['budget'] for rung in bracket]}"
+                )
+                for i, rung in enumerate(bracket):
+                    records = await self._run_rung(configs, rung["budget"])
+                    if i + 1 < len(bracket):
+                        configs = [r["config"] for r in self._top(records, bracket[i + 1]["n_configs"])]
+                        if not configs:
+                            break
+        return self.records
+
+    async def asha(self, sample_config: Callable[[], Dict[str, Any]], n_configs: int) -> List[Dict[str, Any]]:
+        """
+        Run asynchronous successive halving on ``n_configs`` sampled configurations.
+
+        Args:
+            sample_config: Returns one new configuration (without budget)
+            n_configs: Configurations started at the smallest budget
+
+        Returns:
+            Records of all trials
+        """
+        rungs: List[List[Dict[str, Any]]] = [[] for _ in self.budgets]
+        promoted = [set() for _ in self.budgets]
+        started = 0
+        pending = {}
+
+        def next_trial():
+            nonlocal started
+            if self.time_budget is not None and self.time_budget.exhausted:
+                return None
+            # Promote the best unpromoted configuration of the highest possible rung
+            for level in range(len(self.budgets) - 2, -1, -1):
+                n_promotable = len(rungs[level]) // self.eta
+                for record in self._top(rungs[level], n_promotable):
+                    if id(record) not in promoted[level]:
+                        promoted[level].add(id(record))
+                        if self._fits(record["config"], self.budgets[level + 1], len(pending)):
+                            return record["config"], level + 1
+            while started < n_configs:
+                started += 1
+                config = sample_config()
+                if self._fits(config, self.budgets[0], len(pending)):
+                    return config, 0
+            return None
+
+        with self.executor:
+            while True:
+                while len(pending) < self.executor.max_workers:
+                    trial = next_trial()
+                    if trial is None:
+                        break
+                    config, level = trial
+                    job = self.make_job(config, self.budgets[level], len(self.records) + len(pending))
+                    pending[self.executor.submit(self.trial_fn, job)] = (config, level)
+
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    config, level = pending.pop(future)
+                    error = future.exception()
+                    result = None if error is not None else future.result()
+                    rungs[level].append(self._record(config, self.budgets[level], result, error))
+
+        return self.records
@@ -0,0 +1,118 @@
+"""
+Automatic choice of batch size and epoch count from the shape of the data
+and the memory available to the worker.
+"""
+import os
+import math
+import logging
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Same bounds as GenerationConfigRequest
+MIN_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 2000
+MIN_EPOCHS = 50
+MAX_EPOCHS = 1000
+
+# CTGAN packs `pac` rows per discriminator input, so its batch size must be a multiple of it
+CTGAN_PAC = 10
+
+# Upper bound of mixture components used by the CTGAN/TVAE data transformer per continuous column
+MAX_CLUSTERS = 10
+
+# Rough float32 activations/gradients kept per row by the default (256, 256) networks
+NETWORK_BYTES_PER_ROW = 4 * 4 * 256 * 2
+
+
+def estimate_transformed_width(data: pd.DataFrame, discrete_columns: Optional[list] = None) -> int:
+    """
+    Estimate the width of the matrix produced by the CTGAN/TVAE data transformer:
+    one scalar plus one-hot modes per continuous column, one-hot categories per
+    discrete column.
+    """
+    if discrete_columns is None:
+        discrete_columns = [
+            col for col in data.columns
+            if not pd.api.types.is_numeric_dtype(data[col]) or pd.api.types.is_bool_dtype(data[col])
+        ]
+    width = 0
+    for col in data.columns:
+        if col in discrete_columns:
+            width += max(int(data[col].nunique(dropna=False)), 1)
+        else:
+            width += 1 + min(MAX_CLUSTERS, max(len(data), 1))
+    return width
+
+
+def available_memory_mb() -> float:
+    """Memory the training may use, from settings or from what the machine/container has free"""
+    if settings.TRAINING_MEMORY_BUDGET_MB > 0:
+        return float(settings.TRAINING_MEMORY_BUDGET_MB)
+
+    available = None
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        pass
+
+    # A container memory limit is tighter than what the host reports
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit != "max":
+            available = min(available or int(limit), int(limit))
+    except (OSError, ValueError):
+        pass
+
+    if not available:
+        return 2048.0
+    return available / (1024 * 1024) * 0.5
+
+
+def resolve_training_params(
+    data: pd.DataFrame,
+    model_type: str,
+    memory_budget_mb: Optional[float] = None,
+    target_steps: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Pick batch size and epochs for ``data``.
+
+    The batch size grows with the row count (about ten batches per epoch),
+    within the request bounds, and is capped last by the memory budget given
+    the transformed width (even below MIN_BATCH_SIZE). The epoch count is
+    chosen so that training performs about ``target_steps`` optimizer steps
+    with that batch size, or with ``batch_size`` when the caller fixed it.
+
+    Returns:
+        Dict with ``epochs`` and ``batch_size``
+    """
+    n_rows = len(data)
+    width = estimate_transformed_width(data)
+    budget_mb = memory_budget_mb if memory_budget_mb is not None else available_memory_mb()
+    target_steps = target_steps or settings.AUTO_TARGET_OPTIMIZER_STEPS
+
+    if batch_size is None:
+        bytes_per_row = 4 * width * 4 + NETWORK_BYTES_PER_ROW
+        max_batch_by_memory = int(budget_mb * 1024 * 1024 / bytes_per_row)
+
+        batch_size = min(max(n_rows // 10, MIN_BATCH_SIZE), MAX_BATCH_SIZE)
+        batch_size = max(min(batch_size, max_batch_by_memory), 1)
+        if model_type.lower() == "ctgan":
+            batch_size = max(CTGAN_PAC, batch_size - batch_size % CTGAN_PAC)
+
+    steps_per_epoch = max(n_rows // batch_size, 1)
+    epochs = int(math.ceil(target_steps / steps_per_epoch))
+    epochs = min(max(epochs, MIN_EPOCHS), MAX_EPOCHS)
+
+    logger.info(
+        f"Auto training config for {n_rows} rows, width {width}, budget {budget_mb:.0f}MB: "
+        f"batch_size={batch_size}, epochs={epochs}"
+    )
+    return {"epochs": epochs, "batch_size": batch_size}
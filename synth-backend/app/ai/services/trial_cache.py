@@ -0,0 +1,205 @@
+"""
+Cross-request cache of hyperparameter trial results.
+
+A trial is identified by the content of the training data, the model type,
+the way its quality score is computed and its normalized hyperparameters.
+Optimizers look a trial up before training it, so that re-submitted runs on
+the same dataset only train the points they have not seen yet. Once a search
+is over, ``evict_trial_models`` deletes the saved models of all but the best
+trials of the dataset (their scores stay cached). The cache is best effort:
+database errors are logged and the trial is simply trained.
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.db.database import SessionLocal
+from app.models.TrialCacheEntry import TrialCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Evaluation scheme of trials scored against their whole training data (scores
+# are only comparable within one scheme, see EvaluationHoldout.evaluation)
+QUALITY_VALIDATOR_EVALUATION = "quality_validator"
+
+
+def evaluation_scheme(evaluation: str) -> str:
+    """
+    Scoring scheme of an evaluation without the holdout it was computed on
+    ("holdout_<fingerprint>_2000" -> "holdout_2000"): scores of different
+    datasets are only comparable as rankings within the same scheme.
+    """
+    parts = evaluation.split("_")
+    if parts[0] == "holdout" and len(parts) >= 3:
+        return "_".join([parts[0]] + parts[2:])
+    return evaluation
+
+
+def dataset_fingerprint(data: pd.DataFrame) -> str:
+    """SHA-256 of the column names, dtypes and values of a DataFrame"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in data.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _normalize_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v) for v in value]
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        return float(f"{value:.10g}")
+    return value
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-friendly hyperparameters with sorted keys, numpy scalars unwrapped and floats rounded"""
+    return {str(k): _normalize_value(params[k]) for k in sorted(params)}
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    """SHA-256 of the normalized hyperparameters"""
+    return hashlib.sha256(json.dumps(normalize_params(params), sort_keys=True).encode()).hexdigest()
+
+
+def lookup_trial(
+    fingerprint: str,
+    model_type: str,
+    params: Dict[str, Any],
+    evaluation: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached result of a trial, or None.
+
+    Returns:
+        {"quality_score", "training_time", "model_path"}
+    """
+    db = SessionLocal()
+    try:
+        entry = db.query(TrialCacheEntry).filter(
+            TrialCacheEntry.dataset_fingerprint == fingerprint,
+            TrialCacheEntry.model_type == model_type,
+            TrialCacheEntry.evaluation == evaluation,
+            TrialCacheEntry.params_key == params_key(params)
+        ).first()
+        if entry is None:
+            return None
+        return {
+            "quality_score": entry.quality_score,
+            "training_time": entry.training_time,
+            "model_path": entry.model_path
+        }
+    except Exception as e:
+        logger.warning(f"Trial cache lookup failed: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def store_trial(
+    fingerprint: str,
+    model_type: str,
+    params: Dict[str, Any],
+    evaluation: str,
+    quality_score: float,
+    training_time: Optional[float] = None,
+    model_path: Optional[str] = None
+) -> None:
+    """Insert or refresh the cached result of a trial"""
+    key = params_key(params)
+    db = SessionLocal()
+    try:
+        entry = db.query(TrialCacheEntry).filter(
+            TrialCacheEntry.dataset_fingerprint == fingerprint,
+            TrialCacheEntry.model_type == model_type,
+            TrialCacheEntry.evaluation == evaluation,
+            TrialCacheEntry.params_key == key
+        ).first()
+        if entry is None:
+            entry = TrialCacheEntry(
+                dataset_fingerprint=fingerprint,
+                model_type=model_type,
+                evaluation=evaluation,
+                params_key=key,
+                parameters=normalize_params(params)
+            )
+            db.add(entry)
+        entry.quality_score = float(quality_score)
+        entry.training_time = training_time
+        entry.model_path = model_path or entry.model_path
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Trial cache store failed: {e}")
+    finally:
+        db.close()
+
+
+def evict_trial_models(
+    fingerprint: str,
+    keep: int,
+    protected: Optional[List[Dict[str, Any]]] = None
+) -> int:
+    """
+    Delete the saved models of the trials on a dataset, except those of the
+    ``keep`` best trials of each model type and scoring scheme and of the
+    ``protected`` configurations. The scores stay cached; a later search
+    retrains an evicted configuration if it needs its model.
+
+    Returns:
+        Number of model files deleted
+    """
+    protected_keys = {params_key(params) for params in protected or []}
+    db = SessionLocal()
+    try:
+        entries = db.query(TrialCacheEntry).filter(
+            TrialCacheEntry.dataset_fingerprint == fingerprint,
+            TrialCacheEntry.model_path.isnot(None)
+        ).order_by(TrialCacheEntry.quality_score.desc()).all()
+
+        ranks: Dict[tuple, int] = {}
+        kept_paths = set()
+        evicted = []
+        for entry in entries:
+            group = (entry.model_type, entry.evaluation)
+            ranks[group] = ranks.get(group, 0) + 1
+            if ranks[group] <= keep or entry.params_key in protected_keys:
+                kept_paths.add(entry.model_path)
+            else:
+                evicted.append(entry)
+
+        # Trials scored under several schemes share one model file
+        deleted = set()
+        for entry in evicted:
+            if entry.model_path in kept_paths:
+                continue
+            if entry.model_path not in deleted:
+                try:
+                    os.remove(entry.model_path)
+                except FileNotFoundError:
+                    pass
+                deleted.add(entry.model_path)
+            entry.model_path = None
+        db.commit()
+        for directory in {os.path.dirname(path) for path in deleted}:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+        if deleted:
+            logger.info(f"Evicted {len(deleted)} trial models of dataset {fingerprint[:16]}")
+        return len(deleted)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Trial model eviction failed: {e}")
+        return 0
+    finally:
+        db.close()
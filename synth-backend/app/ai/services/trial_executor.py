@@ -0,0 +1,362 @@
+"""
+Concurrent execution of hyperparameter trials.
+
+Trials of a grid / random search (and each batch proposed by the Bayesian
+optimizer) are independent: they are run in worker processes, each with its
+own torch/BLAS thread budget, and their outcomes are streamed back in
+completion order so that the caller can track the best score and report
+progress while the remaining trials are still running.
+"""
+import asyncio
+import os
+import threading
+import time
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.parallel import create_process_pool, default_max_workers, default_threads_per_worker
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two samples of the resident memory during a trial
+MEMORY_SAMPLE_INTERVAL = 0.2
+
+
+def _resident_memory() -> Optional[int]:
+    """Resident memory of the process in bytes (None where /proc is not available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PeakMemoryMonitor:
+    """
+    Peak growth of the resident memory of the process while the block runs,
+    above its resident memory on entry, sampled by a background thread
+    (``peak_mb`` is None where it cannot be measured). The absolute peak would
+    charge a trial for what the process already held: the data, the models
+    and caches of the trials a reused worker ran before.
+    """
+
+    def __init__(self, interval: float = MEMORY_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak_mb: Optional[float] = None
+        self._baseline = None
+        self._peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, _resident_memory() or 0)
+
+    def __enter__(self) -> "PeakMemoryMonitor":
+        self._baseline = self._peak = _resident_memory()
+        if self._peak is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._peak = max(self._peak, _resident_memory() or 0)
+        self.peak_mb = max(self._peak - self._baseline, 0) / (1024 * 1024)
+
+
+def run_model_trial(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train a model wrapper with one set of hyperparameters and score it
+    (runs in a worker process).
+
+    When the job carries a dataset ``fingerprint``, a cached result is
+    returned without training, and a trained model is saved under
+    ``artifact_dir`` and recorded in the trial cache. A cached result whose
+    saved model was evicted (or cannot be loaded) still ranks the trial by its
+    score, with ``model`` None; with ``require_model`` it is retrained instead,
+    to restore the model of a winner.
+    With a ``deadline`` (timestamp), training stops after the epoch that
+    reaches it and the result reports the epochs actually trained. With a
+    ``holdout`` (EvaluationHoldout), the model generates the holdout's fixed
+    number of rows and is scored against it instead of the training data.
+    With a ``pruner`` (TrialPruner) and a holdout, the pruner is told of
+    every epoch and scores probes of the current weights on the holdout; a
+    pruned trial stops training at once and is returned
+    unscored (``score`` None, ``pruned`` True). ``memory_usage`` is the peak
+    growth of the resident memory (MB) of the process during training, None
+    for a cached trial. With ``snapshot_epochs`` (smaller epoch values of the same
+    configuration), the model is snapshotted at each of them on the way and
+    every snapshot reached is scored, saved and cached as its own trial, in
+    ``snapshots``. The durations of training, sampling and scoring are
+    recorded for the cost model. Models are built by ``create_model``
+    (``get_model_wrapper`` by default), called with the model type and the
+    hyperparameters; it must be picklable to run in a worker process.
+
+    Args:
+        job: {"model_type", "params", "data", "checkpointer", "fingerprint", "artifact_dir", "deadline", "holdout", "pruner", "snapshot_epochs", "require_model", "create_model"}
+
+    Returns:
+        {"score", "model", "params", "training_time", "evaluation_time", "memory_usage", "cached", "pruned", "curve", "snapshots"}
+    """
+    from app.ai.models.model_factory import get_model_wrapper
+    from app.ai.services.quality_validator import QualityValidator
+    from app.ai.services.trial_cache import (
+        lookup_trial, store_trial, params_key, QUALITY_VALIDATOR_EVALUATION
+    )
+    from app.ai.services.cost_model import record_stage
+    from app.ai.services.quality_engine import quality_report
+    from app.ai.services.trial_pruner import PROBE_ROWS
+    from app.ai.services.training_config import estimate_transformed_width
+
+    data = job["data"]
+    model_type, params = job["model_type"], job["params"]
+    fingerprint = job.get("fingerprint")
+    holdout = job.get("holdout")
+    evaluation = holdout.evaluation if holdout is not None else QUALITY_VALIDATOR_EVALUATION
+    snapshot_epochs = sorted(job.get("snapshot_epochs") or [])
+    create_model = job.get("create_model") or get_model_wrapper
+
+    def load_cached(trial_params):
+        cached = lookup_trial(fingerprint, model_type, trial_params, evaluation)
+        if not cached:
+            return None
+        cached_model = None
+        if cached["model_path"] and os.path.exists(cached["model_path"]):
+            try:
+                cached_model = create_model(model_type=model_type, hyperparameters=trial_params)
+                asyncio.run(cached_model.load(cached["model_path"]))
+            except Exception as e:
+                logger.warning(f"Cached model {cached['model_path']} could not be loaded: {e}")
+                cached_model = None
+        if cached_model is None and job.get("require_model"):
+            return None
+        return {
+            "score": cached["quality_score"],
+            "model": cached_model,
+            "params": trial_params,
+            "training_time": cached["training_time"],
+            "evaluation_time": 0.0,
+            "memory_usage": None,
+            "cached": True,
+            "pruned": False,
+            "curve": None,
+            "snapshots": []
+        }
+
+    def score_and_store(trained, trial_params, training_time):
+        start = time.time()
+        real_data = holdout.real_data if holdout is not None else data
+        n_synthetic = holdout.n_synthetic if holdout is not None else len(data)
+        synthetic_data = asyncio.run(trained.generate(n_synthetic))
+        sampling_time = time.time() - start
+        if holdout is not None:
+            score = holdout.evaluate(synthetic_data)
+        else:
+            score = QualityValidator().evaluate(real_data=data, synthetic_data=synthetic_data)
+        evaluation_time = time.time() - start
+        record_stage("sampling", model_type, len(data), width, sampling_time, output_rows=n_synthetic)
+        record_stage(
+            "evaluation", model_type, len(real_data), width, evaluation_time - sampling_time,
+            output_rows=n_synthetic
+        )
+
+        if fingerprint:
+            model_path = None
+            if job.get("artifact_dir"):
+                try:
+                    os.makedirs(job["artifact_dir"], exist_ok=True)
+                    model_path = os.path.join(job["artifact_dir"], f"{model_type}_{params_key(trial_params)}.pkl")
+                    asyncio.run(trained.save(model_path))
+                except Exception as e:
+                    logger.warning(f"Trial model could not be saved: {e}")
+                    model_path = None
+            store_trial(fingerprint, model_type, trial_params, evaluation, score, training_time, model_path)
+        return score, evaluation_time
+
+    if fingerprint:
+        cached = load_cached(params)
+        cached_snapshots = [load_cached({**params, "epochs": epochs}) for epochs in snapshot_epochs] if cached else []
+        if cached and all(cached_snapshots):
+            logger.info(f"Trial {params} served from the trial cache")
+            return {**cached, "snapshots": cached_snapshots}
+
+    def probe_score(epochs):
+        # Quality of a few rows sampled from the current weights, on the holdout
+        try:
+            rows = model.model.from_snapshot(model.model.snapshot(), epochs).sample(num_rows=PROBE_ROWS)
+            return quality_report(
+                holdout.real_data, rows, holdout.metadata,
+                fingerprint=holdout.fingerprint, persist_profile=True
+            ).get_score()
+        except Exception as e:
+            logger.warning(f"Pruning probe failed at epoch {epochs}: {e}")
+            return None
+
+    model = create_model(model_type=model_type, hyperparameters=params)
+    model.checkpointer = job.get("checkpointer")
+    epochs_trained = []
+    pruned = []
+    snapshots = {}
+    deadline = job.get("deadline")
+    # Pruning compares probe scores on the holdout
+    pruner = job.get("pruner") if holdout is not None else None
+    if deadline is not None or pruner is not None or snapshot_epochs:
+        def on_epoch(epoch, info):
+            epochs_trained.append(epoch + 1)
+            if epoch + 1 in snapshot_epochs:
+                snapshots[epoch + 1] = (model.model.snapshot(), time.time() - start)
+            if pruner is not None and pruner.report(epoch, lambda: probe_score(epoch + 1)):
+                pruned.append(epoch + 1)
+                return True
+            return deadline is not None and time.time() >= deadline
+        model.epoch_callback = on_epoch
+
+    start = time.time()
+    with PeakMemoryMonitor() as memory:
+        asyncio.run(model.train(data))
+    training_time = time.time() - start
+    model.checkpointer = None
+    model.epoch_callback = None
+    curve = pruner.curve if pruner is not None else None
+    width = estimate_transformed_width(data)
+    record_stage(
+        "training", model_type, len(data), width, training_time,
+        epochs=epochs_trained[-1] if epochs_trained else params.get("epochs"),
+        batch_size=params.get("batch_size")
+    )
+
+    # Snapshots reached before the end of the run (even if it was pruned or stopped at the deadline)
+    snapshot_results = []
+    for epochs, (weights, snapshot_time) in sorted(snapshots.items()):
+        snapshot_params = {**params, "epochs": epochs}
+        snapshot_model = create_model(model_type=model_type, hyperparameters=snapshot_params)
+        snapshot_model.metadata = model.metadata
+        snapshot_model.model = model.model.from_snapshot(weights, epochs)
+        snapshot_score, snapshot_evaluation_time = score_and_store(snapshot_model, snapshot_params, snapshot_time)
+        snapshot_results.append({
+            "score": snapshot_score,
+            "model": snapshot_model,
+            "params": snapshot_params,
+            "training_time": snapshot_time,
+            "evaluation_time": snapshot_evaluation_time,
+            "memory_usage": memory.peak_mb,
+            "cached": False,
+            "pruned": False,
+            "curve": None,
+            "snapshots": []
+        })
+
+    if pruned:
+        return {
+            "score": None,
+            "model": None,
+            "params": {**params, "epochs": pruned[-1]},
+            "training_time": training_time,
+            "evaluation_time": 0.0,
+            "memory_usage": memory.peak_mb,
+            "cached": False,
+            "pruned": True,
+            "curve": curve,
+            "snapshots": snapshot_results
+        }
+
+    if epochs_trained and params.get("epochs") and epochs_trained[-1] < int(params["epochs"]):
+        logger.info(f"Trial {params} stopped at the deadline after {epochs_trained[-1]} epochs")
+        params = {**params, "epochs": epochs_trained[-1]}
+
+    score, evaluation_time = score_and_store(model, params, training_time)
+    return {
+        "score": score,
+        "model": model,
+        "params": params,
+        "training_time": training_time,
+        "evaluation_time": evaluation_time,
+        "memory_usage": memory.peak_mb,
+        "cached": False,
+        "pruned": False,
+        "curve": curve,
+        "snapshots": snapshot_results
+    }
+
+
+class TrialExecutor:
+    """
+    Runs trials concurrently on up to ``max_workers`` processes.
+
+    Used as a context manager the process pool is kept across several calls
+    to ``map`` (e.g. the successive batches of a Bayesian optimization);
+    otherwise each ``map`` opens and closes its own pool. With a single
+    worker trials run one at a time in a thread, without pickling.
+
+    Args:
+        max_workers: Concurrent trials (defaults to TRIAL_MAX_WORKERS, then default_max_workers())
+        threads_per_worker: Thread budget of each trial (defaults to TRIAL_THREADS_PER_WORKER, then CPUs / workers)
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, threads_per_worker: Optional[int] = None):
+        self.max_workers = max_workers or settings.TRIAL_MAX_WORKERS or default_max_workers()
+        self.threads_per_worker = threads_per_worker or settings.TRIAL_THREADS_PER_WORKER or None
+        self._pool = None
+
+    @property
+    def trial_threads(self) -> Optional[int]:
+        """Threads each trial trains with (None when trials run inline, on the threads of this process)"""
+        if self.max_workers <= 1:
+            return None
+        return self.threads_per_worker or default_threads_per_worker(self.max_workers)
+
+    def __enter__(self) -> "TrialExecutor":
+        if self.max_workers > 1:
+            self._pool = create_process_pool(self.max_workers, self.threads_per_worker)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def submit(self, fn: Callable[[Any], Any], job: Any) -> "asyncio.Future":
+        """
+        Start ``fn(job)`` and return its future, for callers that schedule
+        trials one by one (the executor must be entered when it has several workers)
+        """
+        if self.max_workers > 1 and self._pool is None:
+            raise RuntimeError("TrialExecutor must be used as a context manager to submit trials")
+        return asyncio.get_running_loop().run_in_executor(self._pool, fn, job)
+
+    async def map(self, fn: Callable[[Any], Any], jobs: List[Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run ``fn(job)`` for every job and yield the outcomes as they complete.
+
+        Yields:
+            {"index", "job", "result", "error"}: ``error`` is the exception
+            raised by the trial, or None
+        """
+        loop = asyncio.get_running_loop()
+
+        async def run_one(pool, index, job):
+            try:
+                result = await loop.run_in_executor(pool, fn, job)
+                return {"index": index, "job": job, "result": result, "error": None}
+            except Exception as e:
+                return {"index": index, "job": job, "result": None, "error": e}
+
+        if self.max_workers <= 1 or len(jobs) <= 1:
+            for index, job in enumerate(jobs):
+                yield await run_one(None, index, job)
+            return
+
+        owns_pool = self._pool is None
+        pool = self._pool or create_process_pool(min(self.max_workers, len(jobs)), self.threads_per_worker)
+        logger.info(f"Running {len(jobs)} trials on {min(self.max_workers, len(jobs))} workers")
+        try:
+            for next_done in asyncio.as_completed([run_one(pool, i, job) for i, job in enumerate(jobs)]):
+                yield await next_done
+        finally:
+            if owns_pool:
+                pool.shutdown(wait=True, cancel_futures=True)
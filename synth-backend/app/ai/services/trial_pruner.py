@@ -0,0 +1,96 @@
+"""
+Median-stopping pruning of hyperparameter trials during training.
+
+After a warm-up, every REPORT_EVERY_EPOCHS epochs, a trial scores a probe:
+PROBE_ROWS rows sampled from its current weights, scored against the
+evaluation holdout. The trial is pruned when its probe score is worse than
+the given percentile (the median by default) of the scores the finished
+trials of the same search reached at that epoch: training stops at once, the
+trial is not scored and its worker is freed.
+
+Training losses are not used: the adversarial losses of CTGAN say nothing
+of the quality of the model, and no loss is comparable between batch sizes
+or learning rates. Probe scores are measured the same way for every trial
+(same holdout, same number of rows), so the trials of a search compare
+whatever their parameters.
+
+A pruner is a plain picklable object shipped with the trial's job: it holds
+a snapshot of the learning curves of the trials finished when the job was
+scheduled, and records the curve of its own trial, which the search adds to
+the snapshot of the next jobs.
+"""
+import logging
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Epochs between two intermediate values
+REPORT_EVERY_EPOCHS = 25
+
+# Finished trials needed at an epoch before a trial can be pruned there
+MIN_FINISHED_CURVES = 3
+
+# Synthetic rows sampled by a probe
+PROBE_ROWS = 500
+
+
+class TrialPruner:
+    """
+    Median (or percentile) stopping rule on the probe scores of the trials.
+
+    Args:
+        curves: Probe scores of the finished trials (epoch -> score)
+        warmup_epochs: Epochs trained before a trial can be pruned (defaults to TRIAL_PRUNING_WARMUP_EPOCHS)
+        percentile: A trial is pruned below this percentile of the finished trials' scores, counted
+            from the best (defaults to TRIAL_PRUNING_PERCENTILE)
+        report_every: Epochs between two intermediate values
+        min_curves: Finished trials needed at an epoch to prune there
+    """
+
+    def __init__(
+        self,
+        curves: List[Dict[int, float]],
+        warmup_epochs: Optional[int] = None,
+        percentile: Optional[float] = None,
+        report_every: int = REPORT_EVERY_EPOCHS,
+        min_curves: int = MIN_FINISHED_CURVES
+    ):
+        self.curves = curves
+        self.warmup_epochs = warmup_epochs if warmup_epochs is not None else settings.TRIAL_PRUNING_WARMUP_EPOCHS
+        self.percentile = percentile if percentile is not None else settings.TRIAL_PRUNING_PERCENTILE
+        self.report_every = report_every
+        self.min_curves = min_curves
+        self.curve: Dict[int, float] = {}
+
+    def report(self, epoch: int, probe: Callable[[], float]) -> bool:
+        """
+        Account for the end of an epoch (0-based); ``probe`` returns the
+        probe score of the current weights and is only called on report epochs.
+
+        Returns:
+            True when the trial must stop
+        """
+        step = epoch + 1
+        if step % self.report_every != 0 or step < self.warmup_epochs:
+            return False
+
+        score = probe()
+        if score is None or not np.isfinite(score):
+            return False
+        self.curve[step] = float(score)
+
+        others = [curve[step] for curve in self.curves if step in curve]
+        if len(others) < self.min_curves:
+            return False
+        threshold = float(np.percentile(others, 100.0 - self.percentile))
+        if score < threshold:
+            logger.info(
+                f"Trial pruned at epoch {step}: probe score {score:.4f} below the "
+                f"{self.percentile:g}th percentile {threshold:.4f} of {len(others)} finished trials"
+            )
+            return True
+        return False
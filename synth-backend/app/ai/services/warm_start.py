@@ -0,0 +1,216 @@
+"""
+Warm start of hyperparameter searches from previously optimized datasets.
+
+Every optimized dataset is profiled by a small vector of meta-features
+(rows, columns, column types, cardinalities, missing values: the content of
+an upload's ``column_info``) stored under its fingerprint. The leaderboard
+of a dataset is read from the trial cache, which already holds every trial
+scored on it. A new search first looks its own fingerprint up: when a
+search already completed on the same data, its best known configuration is
+reused without any new trial. Otherwise its first trials are the best
+configurations of the nearest datasets in meta-feature space, ranked on
+the scoring scheme of the new search. Lookups are best effort: on a database error the search
+simply starts without seeds.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.db.database import SessionLocal
+from app.models.DatasetProfile import DatasetProfile
+from app.models.TrialCacheEntry import TrialCacheEntry
+from app.ai.services.trial_cache import evaluation_scheme, params_key
+
+logger = logging.getLogger(__name__)
+
+# Best configurations kept per neighbouring dataset
+LEADERBOARD_SIZE = 3
+
+# Neighbouring datasets whose leaderboards seed a search
+N_NEIGHBORS = 5
+
+# Neighbours farther than this in meta-feature space are not similar enough
+MAX_NEIGHBOR_DISTANCE = 1.5
+
+
+def column_info_of(data: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Per-column summary in the format of an upload's ``column_info``"""
+    return {
+        str(col): {
+            'dtype': str(data[col].dtype),
+            'null_count': int(data[col].isnull().sum()),
+            'unique_count': int(data[col].nunique())
+        }
+        for col in data.columns
+    }
+
+
+def meta_features(n_rows: int, column_info: Dict[str, Dict[str, Any]]) -> List[float]:
+    """
+    Meta-feature vector of a dataset, on comparable scales.
+
+    Returns:
+        [log10 rows, log10 columns, share of numerical / categorical / datetime
+        columns, mean and max log10 cardinality of the categorical columns,
+        mean share of missing values]
+    """
+    n_columns = max(len(column_info), 1)
+    kinds = {"numerical": 0, "categorical": 0, "datetime": 0}
+    cardinalities = []
+    null_shares = []
+    for info in column_info.values():
+        dtype = str(info.get('dtype', 'object'))
+        if dtype.startswith(('int', 'uint', 'float')):
+            kinds["numerical"] += 1
+        elif dtype.startswith('datetime'):
+            kinds["datetime"] += 1
+        else:
+            kinds["categorical"] += 1
+            cardinalities.append(np.log10(1 + info.get('unique_count', 0)))
+        null_shares.append(info.get('null_count', 0) / max(n_rows, 1))
+    return [
+        float(np.log10(max(n_rows, 1))),
+        float(np.log10(n_columns)),
+        kinds["numerical"] / n_columns,
+        kinds["categorical"] / n_columns,
+        kinds["datetime"] / n_columns,
+        float(np.mean(cardinalities)) if cardinalities else 0.0,
+        float(np.max(cardinalities)) if cardinalities else 0.0,
+        float(np.mean(null_shares)) if null_shares else 0.0
+    ]
+
+
+def register_dataset(fingerprint: str, data: pd.DataFrame) -> None:
+    """Store (or refresh) the meta-features of an optimized dataset"""
+    db = SessionLocal()
+    try:
+        features = meta_features(len(data), column_info_of(data))
+        profile = db.query(DatasetProfile).filter(DatasetProfile.dataset_fingerprint == fingerprint).first()
+        if profile is None:
+            profile = DatasetProfile(dataset_fingerprint=fingerprint)
+            db.add(profile)
+        profile.n_rows = len(data)
+        profile.n_columns = len(data.columns)
+        profile.meta_features = features
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Dataset profile not stored: {e}")
+    finally:
+        db.close()
+
+
+def leaderboard(
+    fingerprint: str,
+    model_type: str,
+    evaluation: Optional[str] = None,
+    limit: Optional[int] = LEADERBOARD_SIZE,
+    scheme: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Best configurations scored on a dataset, best first (all of them when
+    ``limit`` is None), with the given ``evaluation`` or, for another
+    dataset's holdout, the given scoring ``scheme`` (see evaluation_scheme).
+
+    Returns:
+        [{"params", "score", "evaluation", "training_time"}]
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(TrialCacheEntry).filter(
+            TrialCacheEntry.dataset_fingerprint == fingerprint,
+            TrialCacheEntry.model_type == model_type
+        )
+        if evaluation is not None:
+            query = query.filter(TrialCacheEntry.evaluation == evaluation)
+        query = query.order_by(TrialCacheEntry.quality_score.desc())
+        if limit is not None and scheme is None:
+            query = query.limit(limit)
+        entries = query.all()
+        if scheme is not None:
+            entries = [entry for entry in entries if evaluation_scheme(entry.evaluation) == scheme][:limit]
+        return [
+            {
+                "params": entry.parameters,
+                "score": entry.quality_score,
+                "evaluation": entry.evaluation,
+                "training_time": entry.training_time
+            }
+            for entry in entries
+        ]
+    except Exception as e:
+        logger.warning(f"Leaderboard lookup failed: {e}")
+        return []
+    finally:
+        db.close()
+
+
+def nearest_datasets(fingerprint: str, data: pd.DataFrame, k: int = N_NEIGHBORS) -> List[Dict[str, Any]]:
+    """
+    Profiled datasets closest to ``data`` in meta-feature space (itself excluded).
+
+    Returns:
+        [{"fingerprint", "distance"}], nearest first
+    """
+    db = SessionLocal()
+    try:
+        profiles = db.query(DatasetProfile.dataset_fingerprint, DatasetProfile.meta_features).filter(
+            DatasetProfile.dataset_fingerprint != fingerprint
+        ).all()
+    except Exception as e:
+        logger.warning(f"Dataset profiles lookup failed: {e}")
+        return []
+    finally:
+        db.close()
+    if not profiles:
+        return []
+
+    target = np.array(meta_features(len(data), column_info_of(data)))
+    # Profiles stored by an older version with another vector length are ignored
+    profiles = [(fp, features) for fp, features in profiles if len(features) == len(target)]
+    if not profiles:
+        return []
+    distances = np.linalg.norm(np.array([features for _, features in profiles]) - target, axis=1)
+    order = np.argsort(distances)[:k]
+    return [
+        {"fingerprint": profiles[i][0], "distance": float(distances[i])}
+        for i in order
+        if distances[i] <= MAX_NEIGHBOR_DISTANCE
+    ]
+
+
+def warm_start_configs(
+    fingerprint: str,
+    data: pd.DataFrame,
+    model_type: str,
+    param_names: List[str],
+    limit: int = LEADERBOARD_SIZE,
+    scheme: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Best configurations of the nearest datasets, to be tried first.
+
+    Only configurations setting exactly ``param_names`` are returned (the
+    search spaces of the two optimizers name hyperparameters differently),
+    ranked within the scoring ``scheme`` of the search when given: a
+    neighbour's scores on its training data or with another synthetic sample
+    size do not rank its configurations the same way.
+    """
+    configs = []
+    seen = set()
+    for neighbor in nearest_datasets(fingerprint, data):
+        for entry in leaderboard(neighbor["fingerprint"], model_type, scheme=scheme):
+            config = entry["params"]
+            if set(config) != set(param_names) or params_key(config) in seen:
+                continue
+            seen.add(params_key(config))
+            configs.append(config)
+            if len(configs) >= limit:
+                break
+        if len(configs) >= limit:
+            break
+    if configs:
+        logger.info(f"Warm start from similar datasets: {configs}")
+    return configs
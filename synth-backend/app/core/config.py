@@ -38,6 +38,52 @@ class Settings(BaseSettings):
     DEFAULT_EPOCHS: int = Field(default=100, env="DEFAULT_EPOCHS")
     MAX_EPOCHS: int = Field(default=500, env="MAX_EPOCHS")
     
+    # Training checkpoints
+    CHECKPOINT_EVERY_EPOCHS: int = Field(default=25, env="CHECKPOINT_EVERY_EPOCHS")
+    CHECKPOINT_EVERY_MINUTES: float = Field(default=5.0, env="CHECKPOINT_EVERY_MINUTES")
+    RESUME_INTERRUPTED_GENERATIONS: bool = Field(default=True, env="RESUME_INTERRUPTED_GENERATIONS")
+    
+    # Configuration automatique de l'entraînement (0 = moitié de la mémoire disponible)
+    TRAINING_MEMORY_BUDGET_MB: int = Field(default=0, env="TRAINING_MEMORY_BUDGET_MB")
+    AUTO_TARGET_OPTIMIZER_STEPS: int = Field(default=4000, env="AUTO_TARGET_OPTIMIZER_STEPS")
+    
+    # Processus de calcul parallèle (0 = nombre de CPU)
+    PARALLEL_MAX_WORKERS: int = Field(default=0, env="PARALLEL_MAX_WORKERS")
+    
+    # Essais d'optimisation en parallèle (0 = PARALLEL_MAX_WORKERS / nombre de CPU par essai)
+    TRIAL_MAX_WORKERS: int = Field(default=0, env="TRIAL_MAX_WORKERS")
+    TRIAL_THREADS_PER_WORKER: int = Field(default=0, env="TRIAL_THREADS_PER_WORKER")
+    
+    # Durée maximale d'une optimisation sans limite fixée par sa configuration
+    OPTIMIZATION_TIMEOUT_HOURS: float = Field(default=24, env="OPTIMIZATION_TIMEOUT_HOURS")
+    
+    # Échantillon d'évaluation commun aux essais d'optimisation (0 = même taille que l'échantillon réel)
+    EVALUATION_HOLDOUT_ROWS: int = Field(default=5000, env="EVALUATION_HOLDOUT_ROWS")
+    EVALUATION_SYNTHETIC_ROWS: int = Field(default=0, env="EVALUATION_SYNTHETIC_ROWS")
+    
+    # Moteur du score de qualité: "native" (NumPy vectorisé, mêmes scores) ou "sdmetrics" (QualityReport)
+    QUALITY_ENGINE: str = Field(default="native", env="QUALITY_ENGINE")
+    
+    # Largeur de l'intervalle de confiance (95 %) qui arrête l'évaluation approchée des essais sur échantillons
+    # (0 = score exact ; seulement à partir de 32 000 lignes synthétiques par essai, cf. EVALUATION_SYNTHETIC_ROWS)
+    QUALITY_APPROXIMATE_WIDTH: float = Field(default=0.0, env="QUALITY_APPROXIMATE_WIDTH")
+    
+    # Modèles d'essai gardés sur disque par dataset une fois l'optimisation terminée (meilleurs scores)
+    TRIAL_MODELS_KEPT: int = Field(default=3, env="TRIAL_MODELS_KEPT")
+    
+    # Démarrage à chaud: configurations des datasets similaires essayées en premier
+    WARM_START_ENABLED: bool = Field(default=True, env="WARM_START_ENABLED")
+    WARM_START_CONFIGS: int = Field(default=3, env="WARM_START_CONFIGS")
+    
+    # Modèle de substitution de l'optimisation bayésienne: "gp", "random_forest", "tpe" ou "auto"
+    # (GP puis forêt aléatoire au-delà de 50 essais)
+    BAYESIAN_SURROGATE: str = Field(default="auto", env="BAYESIAN_SURROGATE")
+    
+    # Arrêt des essais dont le score d'une sonde est sous la médiane des essais terminés (après l'échauffement)
+    TRIAL_PRUNING_ENABLED: bool = Field(default=True, env="TRIAL_PRUNING_ENABLED")
+    TRIAL_PRUNING_WARMUP_EPOCHS: int = Field(default=100, env="TRIAL_PRUNING_WARMUP_EPOCHS")
+    TRIAL_PRUNING_PERCENTILE: float = Field(default=50.0, env="TRIAL_PRUNING_PERCENTILE")
+    
     @property
     def supported_file_types_list(self) -> list:
         return self.SUPPORTED_FILE_TYPES.split(',')
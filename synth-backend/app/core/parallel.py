@@ -0,0 +1,67 @@
+"""
+Process pools used by the CPU-bound parts of the AI pipeline (transformer
+fitting, hyperparameter trials, per-table fitting).
+
+Workers are started with the "spawn" method: the API process runs threads
+(uvicorn, torch intra-op pools) and forking it is not safe. Each worker
+limits its own torch/BLAS thread count so that N concurrent workers do not
+oversubscribe the machine, and never opens a pool of its own.
+"""
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+# Set in worker processes: nested pools would multiply the process count
+_in_worker = False
+
+
+def default_max_workers() -> int:
+    """Number of worker processes, from settings or the CPU count (1 inside a worker)"""
+    if _in_worker:
+        return 1
+    if settings.PARALLEL_MAX_WORKERS > 0:
+        return settings.PARALLEL_MAX_WORKERS
+    return max(os.cpu_count() or 1, 1)
+
+
+def default_threads_per_worker(max_workers: int) -> int:
+    """Thread budget of each of ``max_workers`` workers sharing the CPUs evenly"""
+    return max((os.cpu_count() or 1) // max(max_workers, 1), 1)
+
+
+def _init_worker(threads_per_worker: int) -> None:
+    """Cap the thread pools of the numerical libraries inside a worker"""
+    global _in_worker
+    _in_worker = True
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads_per_worker)
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+
+
+def create_process_pool(
+    max_workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None
+) -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers share the CPUs evenly.
+
+    Args:
+        max_workers: Number of worker processes (defaults to default_max_workers())
+        threads_per_worker: Thread budget of each worker (defaults to CPUs / workers)
+    """
+    max_workers = max_workers or default_max_workers()
+    if threads_per_worker is None:
+        threads_per_worker = default_threads_per_worker(max_workers)
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads_per_worker,)
+    )
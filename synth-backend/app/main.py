@@ -34,6 +34,10 @@ async def lifespan(app: FastAPI):
     # Démarrage
     await create_tables()
     logger.info("Tables de base de données créées avec succès")
+    if settings.RESUME_INTERRUPTED_GENERATIONS:
+        resumed = await generation_v2.resume_interrupted_generations()
+        if resumed:
+            logger.info(f"Générations interrompues relancées: {resumed}")
     yield
     # Arrêt (rien à faire pour l'instant)
 
@@ -21,6 +21,7 @@ class DataRequest(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     uploaded_dataset_id = Column(Integer, ForeignKey("uploaded_datasets.id"), nullable=True)
+    dataset_group_id = Column(Integer, ForeignKey("dataset_groups.id"), nullable=True)  # Génération relationnelle
     request_name = Column(String, nullable=False)
     dataset_name = Column(String, nullable=False)
     status = Column(String, default=RequestStatus.PENDING)
@@ -56,6 +57,7 @@ class DataRequest(Base):
     approver = relationship("User", foreign_keys=[approved_by])
     
     uploaded_dataset = relationship("UploadedDataset", back_populates="data_requests")
+    dataset_group = relationship("DatasetGroup", back_populates="data_requests")
     
     # Nouvelle relation pour l'optimisation avancée
     optimization_config = relationship(
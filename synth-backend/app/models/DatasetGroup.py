@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.database import Base
+
+class DatasetGroup(Base):
+    """Groupe de datasets uploadés liés par des clés (jeu de données relationnel)"""
+    __tablename__ = "dataset_groups"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String, nullable=False)
+
+    # Tables du groupe: {"customers": 12, "orders": 13} (nom de table -> id du UploadedDataset)
+    tables = Column(JSON, nullable=False)
+
+    # Clés déclarées
+    primary_keys = Column(JSON, nullable=False)  # {"customers": "customer_id"}
+    relationships = Column(JSON, nullable=False)  # [{"parent_table", "child_table", "foreign_key"}]
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relations
+    user = relationship("User", back_populates="dataset_groups")
+    data_requests = relationship("DataRequest", back_populates="dataset_group")
+
+    def __repr__(self):
+        return f"<DatasetGroup(id={self.id}, user_id={self.user_id}, name={self.name})>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from app.db.database import Base
+
+class DatasetProfile(Base):
+    """Méta-caractéristiques d'un dataset optimisé, pour retrouver les datasets similaires"""
+    __tablename__ = "dataset_profiles"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    dataset_fingerprint = Column(String(64), nullable=False, unique=True, index=True)  # sha256 du contenu
+
+    n_rows = Column(Integer, nullable=False)
+    n_columns = Column(Integer, nullable=False)
+    meta_features = Column(JSON, nullable=False)  # Vecteur de méta-caractéristiques (types, cardinalités...)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DatasetProfile(id={self.id}, n_rows={self.n_rows}, n_columns={self.n_columns})>"
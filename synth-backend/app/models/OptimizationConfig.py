@@ -12,6 +12,7 @@ class OptimizationConfig(Base):
     
     # Type d'optimisation
     optimization_type = Column(String, nullable=False)  # "bayesian", "grid", "random"
+    dataset_fingerprint = Column(String(64), index=True)  # sha256 des données optimisées
     
     # Configuration générale
     max_evaluations = Column(Integer, default=50)
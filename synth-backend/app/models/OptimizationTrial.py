@@ -18,9 +18,10 @@ class OptimizationTrial(Base):
     quality_score = Column(Float)
     training_time = Column(Float)  # en secondes
     memory_usage = Column(Float)   # en MB
+    epochs_trained = Column(Integer)  # epochs réellement entraînées (moins que prévu si arrêt à l'échéance)
     
     # Métadonnées
-    status = Column(String, default="pending")  # pending, running, completed, failed
+    status = Column(String, default="pending")  # pending, running, completed, failed, pruned
     error_message = Column(String)
     
     started_at = Column(DateTime, default=datetime.utcnow)
@@ -20,6 +20,7 @@ class RequestParameters(Base):
     epochs = Column(Integer, default=300)
     batch_size = Column(Integer, default=500)
     learning_rate = Column(Float, default=0.0002)
+    auto_config = Column(Boolean, default=False)  # epochs/batch_size choisis selon les données
     
     # Paramètres spécifiques CTGAN
     generator_lr = Column(Float, nullable=True)  # Learning rate du générateur
@@ -29,6 +30,7 @@ class RequestParameters(Base):
     optimization_enabled = Column(Boolean, default=False)
     optimization_method = Column(String, default="grid")  # Renommé pour correspondre à l'API v2
     optimization_n_trials = Column(Integer, default=5)
+    optimization_quality_tolerance = Column(Float, nullable=True)  # Écart de score toléré pour la config la plus rapide
     hyperparameters = Column(JSON, default=list)  # Liste des hyperparamètres à optimiser
 
     data_request = relationship(
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from datetime import datetime
+from app.db.database import Base
+
+class StageTiming(Base):
+    """Durée mesurée d'une étape d'un job (entraînement, échantillonnage, évaluation), pour le modèle de coût"""
+    __tablename__ = "stage_timings"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    stage = Column(String(32), nullable=False, index=True)  # training, sampling, evaluation
+    model_type = Column(String(50), nullable=False)
+
+    # Taille du problème
+    n_rows = Column(Integer, nullable=False)  # Lignes d'entraînement / lignes réelles comparées
+    transformed_width = Column(Integer, nullable=False)  # Largeur estimée après transformation des colonnes
+    epochs = Column(Integer, nullable=True)
+    batch_size = Column(Integer, nullable=True)
+    output_rows = Column(Integer, nullable=True)  # Lignes générées / évaluées
+
+    # Matériel
+    n_threads = Column(Integer, nullable=False)
+
+    seconds = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<StageTiming(id={self.id}, stage={self.stage}, model_type={self.model_type}, seconds={self.seconds:.1f})>"
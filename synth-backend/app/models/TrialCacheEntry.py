@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, UniqueConstraint
+from datetime import datetime
+from app.db.database import Base
+
+class TrialCacheEntry(Base):
+    """Résultat d'un essai d'hyperparamètres, réutilisable entre requêtes sur le même dataset"""
+    __tablename__ = "trial_cache"
+    __table_args__ = (
+        UniqueConstraint('dataset_fingerprint', 'model_type', 'evaluation', 'params_key', name='uq_trial_cache_key'),
+        {'extend_existing': True}
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Clé: contenu du dataset, modèle, méthode d'évaluation et paramètres normalisés
+    dataset_fingerprint = Column(String(64), nullable=False, index=True)  # sha256 du contenu
+    model_type = Column(String, nullable=False)
+    evaluation = Column(String, nullable=False)  # Méthode de calcul du score (les scores ne sont comparables qu'entre mêmes méthodes)
+    params_key = Column(String(64), nullable=False)  # sha256 des paramètres normalisés
+    parameters = Column(JSON, nullable=False)
+
+    # Résultats
+    quality_score = Column(Float, nullable=False)
+    training_time = Column(Float)  # en secondes
+    model_path = Column(String)  # Modèle entraîné sauvegardé (optionnel)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TrialCacheEntry(id={self.id}, model_type={self.model_type}, quality_score={self.quality_score})>"
@@ -2,6 +2,7 @@
 from .user import User
 from .UserProfile import UserProfile
 from .UploadedDataset import UploadedDataset
+from .DatasetGroup import DatasetGroup
 from .DataRequest import DataRequest
 from .RequestParameters import RequestParameters
 from .ctgan_model import CTGANModel
@@ -15,11 +16,15 @@ from .Notification import Notification
 from .OptimizationConfig import OptimizationConfig
 from .OptimizationTrial import OptimizationTrial
 from .OptimizationResult import OptimizationResult
+from .TrialCacheEntry import TrialCacheEntry
+from .DatasetProfile import DatasetProfile
+from .StageTiming import StageTiming
 
 __all__ = [
     "User",
     "UserProfile",
     "UploadedDataset",
+    "DatasetGroup",
     "DataRequest", 
     "RequestParameters",
     "CTGANModel",
@@ -29,5 +34,8 @@ __all__ = [
     "OptimizationConfig",
     "OptimizationTrial",
     "OptimizationResult",
+    "TrialCacheEntry",
+    "DatasetProfile",
+    "StageTiming",
     "AdminActionLog"
 ]
\ No newline at end of file
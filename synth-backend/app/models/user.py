@@ -30,6 +30,7 @@ class User(Base):
         cascade="all, delete-orphan"
     )
     uploaded_datasets = relationship("UploadedDataset", back_populates="user", cascade="all, delete-orphan")
+    dataset_groups = relationship("DatasetGroup", back_populates="user", cascade="all, delete-orphan")
     notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
     
     admin_logs = relationship("AdminActionLog", foreign_keys="AdminActionLog.admin_id", back_populates="admin")
@@ -6,6 +6,7 @@ from app.models.UploadedDataset import UploadedDataset
 from app.models.RequestParameters import RequestParameters
 from app.models.DataRequest import DataRequest
 from app.models.SyntheticDataset import SyntheticDataset
+from app.models.OptimizationConfig import OptimizationConfig
 from app.models.user import User
 from app.schemas.UploadedDataset import GenerationRequestCreate, GenerationRequestOut
 from app.schemas.RequestParameters import RequestParametersBase
@@ -326,6 +327,14 @@ def _process_generation_task(request_id: int):
                 'n_trials': params.optimization_n_trials,
                 'hyperparameters': params.hyperparameters or []
             }
+            # Limites fixées par l'utilisateur via l'API d'optimisation (temps, nombre d'essais)
+            limits = db.query(OptimizationConfig).filter(
+                OptimizationConfig.request_id == request_id,
+                OptimizationConfig.status == "pending"
+            ).order_by(OptimizationConfig.id.desc()).first()
+            if limits is not None:
+                optimization_config['timeout_minutes'] = limits.timeout_minutes
+                optimization_config['max_evaluations'] = limits.max_evaluations
         
         # Simuler la génération pour l'instant (à remplacer par le vrai service)
         import time
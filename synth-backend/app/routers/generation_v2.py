@@ -2,18 +2,21 @@
 Router API v2 pour la génération de données synthétiques avec optimisation
 Supporte la nouvelle structure frontend avec choix d'hyperparamètres et taille d'échantillons
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, null
 from app.db.database import get_async_db
 from app.models.UploadedDataset import UploadedDataset
+from app.models.DatasetGroup import DatasetGroup
 from app.models.RequestParameters import RequestParameters
 from app.models.DataRequest import DataRequest
 from app.models.user import User
 from app.schemas.GenerationV2 import (
     GenerationConfigRequest,
+    RelationalGenerationRequest,
     GenerationStartResponse,
+    GenerationEstimateResponse,
     GenerationStatusResponse,
     GenerationRequestDetails,
     GenerationProgress,
@@ -24,12 +27,21 @@ from app.schemas.GenerationV2 import (
 )
 from app.dependencies.auth import get_current_user
 from app.ai.services.AIProcessingService import AIProcessingService
+from app.ai.services.cost_model import estimate_job, transformed_width_from_info, DEFAULT_TRAINING_EPOCHS
+from app.ai.services.trial_executor import TrialExecutor
 from app.services.NotificationService import NotificationService
 import asyncio
 import json
+import os
 from datetime import datetime
+from pathlib import Path
 import logging
 
+try:
+    import fcntl
+except ImportError:  # Windows: pas de verrou entre processus
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/generation/v2", tags=["Generation V2"])
@@ -81,15 +93,18 @@ async def start_generation_v2(
         await db.flush()
         
         # Créer les paramètres selon le mode
+        # Epochs / batch_size laissés à auto_config (seuls à pouvoir manquer en mode simple) restent
+        # NULL: le traitement les choisit selon les données (un None prendrait le défaut de la colonne)
         if config.mode == 'simple':
             parameters = RequestParameters(
                 request_id=generation_request.id,
                 model_type=config.model_type,
                 sample_size=config.sample_size,
                 mode=config.mode,
-                epochs=config.epochs,
-                batch_size=config.batch_size,
+                epochs=config.epochs if config.epochs is not None else null(),
+                batch_size=config.batch_size if config.batch_size is not None else null(),
                 learning_rate=config.learning_rate,
+                auto_config=config.auto_config,
                 generator_lr=config.generator_lr,
                 discriminator_lr=config.discriminator_lr,
                 optimization_enabled=False,
@@ -103,12 +118,14 @@ async def start_generation_v2(
                 model_type=config.model_type,
                 sample_size=config.sample_size,
                 mode=config.mode,
-                epochs=300,  # Valeurs par défaut, seront optimisées
-                batch_size=500,
+                epochs=null() if config.auto_config else 300,  # Valeurs par défaut, seront optimisées
+                batch_size=null() if config.auto_config else 500,
                 learning_rate=0.0002,
+                auto_config=config.auto_config,
                 optimization_enabled=True,
                 optimization_method=config.optimization_method,
                 optimization_n_trials=config.n_trials,
+                optimization_quality_tolerance=config.quality_tolerance,
                 hyperparameters=config.hyperparameters
             )
         
@@ -117,7 +134,7 @@ async def start_generation_v2(
         await db.refresh(generation_request)
         
         # Estimer le temps de génération
-        estimated_time = _estimate_generation_time(config)
+        estimated_time = (await _estimate_generation(config, dataset))["minutes"]
         
         # Lancer la génération en arrière-plan
         background_tasks.add_task(
@@ -156,6 +173,129 @@ async def start_generation_v2(
         )
 
 
+@router.post("/estimate", response_model=GenerationEstimateResponse)
+async def estimate_generation_v2(
+    config: GenerationConfigRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Estime la durée d'une génération sans la lancer (mêmes paramètres que /start)
+    """
+    result = await db.execute(
+        select(UploadedDataset).where(
+            and_(
+                UploadedDataset.id == config.dataset_id,
+                UploadedDataset.user_id == current_user.id
+            )
+        )
+    )
+    dataset = result.scalar_one_or_none()
+    
+    if not dataset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dataset non trouvé ou non autorisé"
+        )
+    
+    estimate = await _estimate_generation(config, dataset)
+    return GenerationEstimateResponse(
+        dataset_id=dataset.id,
+        model_type=config.model_type,
+        mode=config.mode,
+        estimated_time_minutes=estimate["minutes"],
+        stages_seconds=estimate["stages"],
+        source=estimate["source"]
+    )
+
+
+@router.post("/relational/start", response_model=GenerationStartResponse)
+async def start_relational_generation(
+    config: RelationalGenerationRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Démarre une génération multi-tables sur un groupe de datasets relationnel:
+    les clés étrangères des tables générées référencent les lignes générées
+    des tables parentes
+    """
+    try:
+        result = await db.execute(
+            select(DatasetGroup).where(
+                and_(
+                    DatasetGroup.id == config.group_id,
+                    DatasetGroup.user_id == current_user.id
+                )
+            )
+        )
+        group = result.scalar_one_or_none()
+        
+        if not group:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Groupe de datasets non trouvé ou non autorisé"
+            )
+        
+        # Taille demandée des tables racines (sans parent)
+        child_tables = {rel["child_table"] for rel in group.relationships}
+        result = await db.execute(
+            select(UploadedDataset).where(UploadedDataset.id.in_(list(group.tables.values())))
+        )
+        rows_by_dataset = {dataset.id: dataset.n_rows for dataset in result.scalars().all()}
+        root_rows = sum(
+            rows_by_dataset.get(dataset_id, 0)
+            for table, dataset_id in group.tables.items() if table not in child_tables
+        )
+        
+        generation_request = DataRequest(
+            user_id=current_user.id,
+            dataset_group_id=group.id,
+            request_name=f"Génération relationnelle {config.model_type.upper()} - {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+            dataset_name=group.name,
+            status="pending"
+        )
+        db.add(generation_request)
+        await db.flush()
+        
+        parameters = RequestParameters(
+            request_id=generation_request.id,
+            model_type=config.model_type,
+            sample_size=max(int(round(root_rows * config.scale)), 1),
+            mode="relational",
+            epochs=config.epochs or 300,
+            batch_size=config.batch_size or 500,
+            learning_rate=config.learning_rate or 0.0002,
+            optimization_enabled=False,
+            optimization_method="none",
+            optimization_n_trials=0,
+            hyperparameters=[]
+        )
+        db.add(parameters)
+        await db.commit()
+        await db.refresh(generation_request)
+        
+        background_tasks.add_task(_process_relational_generation, generation_request.id)
+        
+        return GenerationStartResponse(
+            message=f"Génération relationnelle démarrée: {len(group.tables)} tables",
+            request_id=generation_request.id,
+            status="pending",
+            mode="relational"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Erreur lors du démarrage de la génération relationnelle: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur interne: {str(e)}"
+        )
+
+
 @router.get("/requests", response_model=GenerationRequestListResponse)
 async def get_generation_requests_v2(
     page: int = Query(1, ge=1, description="Numéro de page"),
@@ -500,8 +640,53 @@ async def get_optimization_results_v2(
 
 # === Fonctions utilitaires ===
 
+async def _estimate_generation(config: GenerationConfigRequest, dataset: UploadedDataset) -> Dict[str, Any]:
+    """
+    Estime la durée d'une génération avec le modèle de coût appris sur les
+    durées des étapes déjà exécutées (heuristique tant qu'il manque de mesures)
+    
+    En mode optimisation, les essais estimés sont les entraînements que la
+    recherche lance réellement (grille complète, instantanés d'epochs partagés,
+    paliers multi-fidélité), répartis sur les workers d'essais
+    """
+    epochs = config.epochs
+    if epochs is None and config.model_type in ('ctgan', 'tvae'):
+        epochs = DEFAULT_TRAINING_EPOCHS
+    n_rows = dataset.n_rows or 0
+    trial_runs = None
+    executor = TrialExecutor()
+    if config.mode == 'optimization':
+        trial_runs = ai_processing_service.planned_trial_runs(
+            config.model_type, config.optimization_method or "grid", config.n_trials or 5, n_rows
+        )
+    try:
+        stages = await asyncio.to_thread(
+            estimate_job,
+            config.model_type,
+            n_rows,
+            transformed_width_from_info(dataset.column_info or {}, n_rows),
+            config.sample_size,
+            epochs=epochs,
+            batch_size=config.batch_size,
+            trial_runs=trial_runs,
+            n_workers=executor.max_workers,
+            n_threads=executor.trial_threads
+        )
+    except Exception as e:
+        logger.warning(f"Estimation par le modèle de coût impossible: {e}")
+        stages = None
+    
+    if stages is None:
+        return {"minutes": _estimate_generation_time(config), "stages": None, "source": "heuristic"}
+    return {
+        "minutes": max(1, round(stages["total"] / 60)),
+        "stages": {stage: round(seconds, 1) for stage, seconds in stages.items()},
+        "source": "model"
+    }
+
+
 def _estimate_generation_time(config: GenerationConfigRequest) -> int:
-    """Estime le temps de génération en minutes"""
+    """Estime le temps de génération en minutes (heuristique de repli)"""
     base_time = 5  # 5 minutes de base
     
     # Ajuster selon la taille
@@ -518,18 +703,177 @@ def _estimate_generation_time(config: GenerationConfigRequest) -> int:
         time_from_size *= 1.2  # TVAE est généralement plus lent
     elif config.model_type == 'gaussian_copula':
         time_from_size *= 0.8  # Gaussian Copula est généralement plus rapide
+    elif config.model_type == 'bayesian_network':
+        time_from_size *= 0.1  # Réseau bayésien: quelques secondes même sur de grandes tables
     
     return max(2, int(time_from_size))
 
 
-async def _process_generation_v2(request_id: int, sample_size: int, dataset_path: str):
+def _request_lock_path(request_id: int) -> Path:
+    return ai_processing_service.checkpoint_dir / f"request_{request_id}.lock"
+
+
+def _acquire_request_lock(request_id: int) -> Optional[int]:
+    """
+    Verrou exclusif d'une génération v2, tenu par le worker qui la traite et
+    libéré par le système si ce worker meurt. Retourne son descripteur, ou
+    None si un autre processus le tient déjà.
+    """
+    fd = os.open(_request_lock_path(request_id), os.O_RDWR | os.O_CREAT)
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+    return fd
+
+
+def _release_request_lock(request_id: int, fd: int, remove: bool = True) -> None:
+    """Libère le verrou d'une génération (et supprime son fichier une fois la génération terminée)"""
+    if remove:
+        try:
+            os.unlink(_request_lock_path(request_id))
+        except FileNotFoundError:
+            pass
+    os.close(fd)
+
+
+async def resume_interrupted_generations():
+    """
+    Relance les générations v2 restées en statut "processing" après un
+    redémarrage (conteneur redémarré, worker tué...). L'entraînement reprend
+    depuis le dernier checkpoint enregistré par l'AIProcessingService.
+    
+    Seules les requêtes v2 posent un verrou pendant leur traitement: les
+    requêtes v1 ne sont pas relancées. Une requête dont le verrou est encore
+    tenu est traitée par un worker vivant; sinon, un seul worker la réclame
+    en la repassant atomiquement de "processing" à "pending" (les autres
+    workers démarrés en même temps ne la relancent donc pas).
+    """
+    from app.db.database import SessionLocal
+    
+    db = SessionLocal()
+    jobs = []
+    try:
+        interrupted = db.query(DataRequest).filter(DataRequest.status == "processing").all()
+        for request in interrupted:
+            if not _request_lock_path(request.id).exists():
+                continue
+            lock = _acquire_request_lock(request.id)
+            if lock is None:
+                continue
+            claimed = db.query(DataRequest).filter(
+                DataRequest.id == request.id,
+                DataRequest.status == "processing"
+            ).update({DataRequest.status: "pending"}, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                _release_request_lock(request.id, lock, remove=False)
+                continue
+            jobs.append((
+                request.id,
+                request.request_parameters.sample_size if request.request_parameters else None,
+                request.uploaded_dataset.file_path if request.uploaded_dataset else request.dataset_name,
+                request.dataset_group_id is not None,
+                lock
+            ))
+    finally:
+        db.close()
+    
+    for request_id, sample_size, dataset_path, relational, lock in jobs:
+        logger.info(f"Reprise de la génération interrompue {request_id}")
+        if relational:
+            asyncio.create_task(_process_relational_generation(request_id, lock))
+        else:
+            asyncio.create_task(_process_generation_v2(request_id, sample_size, dataset_path, lock))
+    
+    return [job[0] for job in jobs]
+
+
+async def _process_relational_generation(request_id: int, lock: Optional[int] = None):
+    """
+    Traite une requête de génération relationnelle en arrière-plan
+    (lock: verrou de la requête déjà pris lors d'une reprise)
+    """
+    from app.db.database import SessionLocal
+    
+    if lock is None:
+        lock = _acquire_request_lock(request_id)
+        if lock is None:
+            logger.warning(f"Requête {request_id} déjà traitée par un autre worker")
+            return
+    
+    db = SessionLocal()
+    interrupted = False
+    
+    try:
+        request = db.query(DataRequest).filter(DataRequest.id == request_id).first()
+        if not request:
+            logger.error(f"Request {request_id} not found")
+            return
+        
+        logger.info(f"Démarrage de la génération relationnelle pour la requête {request_id}")
+        
+        result = await ai_processing_service.process_relational_request(
+            db=db,
+            request_id=request_id,
+            current_user_id=request.user_id
+        )
+        logger.info(f"Génération relationnelle réussie pour la requête {request_id}: {list(result['tables'])}")
+        
+        try:
+            NotificationService.send_notification(
+                db=db,
+                user_id=request.user_id,
+                message=f"Génération relationnelle terminée: {len(result['tables'])} tables"
+            )
+        except Exception as notif_error:
+            logger.warning(f"Erreur notification: {notif_error}")
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de la génération relationnelle {request_id}: {e}")
+        
+        try:
+            request = db.query(DataRequest).filter(DataRequest.id == request_id).first()
+            if request:
+                request.status = "failed"
+                request.error_message = str(e)
+                db.commit()
+                NotificationService.send_notification(
+                    db=db,
+                    user_id=request.user_id,
+                    message=f"Génération relationnelle échouée: {str(e)}"
+                )
+        except Exception as db_error:
+            logger.error(f"Erreur mise à jour status: {db_error}")
+    
+    except asyncio.CancelledError:
+        # Arrêt du serveur: la génération reste à reprendre, son fichier de verrou est gardé
+        interrupted = True
+        raise
+    
+    finally:
+        db.close()
+        _release_request_lock(request_id, lock, remove=not interrupted)
+
+
+async def _process_generation_v2(request_id: int, sample_size: int, dataset_path: str, lock: Optional[int] = None):
     """
     Traite une requête de génération en arrière-plan
     Version améliorée avec support de la nouvelle structure et Supabase
+    (lock: verrou de la requête déjà pris lors d'une reprise)
     """
     from app.db.database import SessionLocal
     
+    if lock is None:
+        lock = _acquire_request_lock(request_id)
+        if lock is None:
+            logger.warning(f"Requête {request_id} déjà traitée par un autre worker")
+            return
+    
     db = SessionLocal()
+    interrupted = False
     
     try:
         # Récupérer la requête
@@ -590,5 +934,11 @@ async def _process_generation_v2(request_id: int, sample_size: int, dataset_path
         except Exception as db_error:
             logger.error(f"Erreur mise à jour status: {db_error}")
     
+    except asyncio.CancelledError:
+        # Arrêt du serveur: la génération reste à reprendre, son fichier de verrou est gardé
+        interrupted = True
+        raise
+    
     finally:
         db.close()
+        _release_request_lock(request_id, lock, remove=not interrupted)
@@ -8,7 +8,8 @@ from app.models.OptimizationTrial import OptimizationTrial
 from app.schemas.Optimization import OptimizationConfigCreate, OptimizationConfigOut, OptimizationTrialOut
 from app.dependencies.auth import get_current_user
 from app.services.OptimizationService import OptimizationService
-from typing import List
+from app.ai.services.pareto import pareto_front, fastest_within
+from typing import List, Optional
 
 router = APIRouter(prefix="/optimization", tags=["Optimization"])
 
@@ -143,6 +144,52 @@ async def get_best_parameters(
         "trial_number": best_trial.trial_number
     }
 
+@router.get("/pareto/{config_id}")
+async def get_pareto_front(
+    config_id: int,
+    tolerance: Optional[float] = None,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    Récupérer le front de Pareto qualité / temps d'entraînement / mémoire des essais,
+    et avec une tolérance la configuration la plus rapide dont le score reste à moins
+    de cette tolérance du meilleur
+    """
+    config = db.query(OptimizationConfig).join(DataRequest).filter(
+        OptimizationConfig.id == config_id,
+        DataRequest.user_id == user.id
+    ).first()
+    
+    if not config:
+        raise HTTPException(status_code=404, detail="Config not found")
+    
+    trials = db.query(OptimizationTrial).filter(
+        OptimizationTrial.config_id == config_id,
+        OptimizationTrial.quality_score.isnot(None)
+    ).all()
+    # Les essais sur un sous-échantillon ne sont pas comparables aux essais sur les données complètes
+    candidates = [
+        {
+            "trial_number": trial.trial_number,
+            "params": trial.parameters,
+            "score": trial.quality_score,
+            "training_time": trial.training_time,
+            "memory_usage": trial.memory_usage
+        }
+        for trial in trials
+        if (trial.parameters or {}).get("data_fraction", 1.0) >= 1.0
+    ]
+    
+    if not candidates:
+        raise HTTPException(status_code=404, detail="No completed trials found")
+    
+    return {
+        "config_id": config_id,
+        "pareto_front": pareto_front(candidates),
+        "fastest_within_tolerance": fastest_within(candidates, tolerance) if tolerance is not None else None
+    }
+
 @router.delete("/config/{config_id}")
 async def stop_optimization(
     config_id: int,
@@ -3,9 +3,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from app.db.database import get_async_db
 from app.models.UploadedDataset import UploadedDataset
+from app.models.DatasetGroup import DatasetGroup
 from app.models.user import User
 from app.dependencies.auth import get_current_user
 from app.services.SimpleSupabaseStorage import SimpleSupabaseStorage
+from app.schemas.DatasetGroup import DatasetGroupCreate
 from pydantic import BaseModel
 import logging
 import pandas as pd
@@ -233,6 +235,100 @@ async def upload_dataset(
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'upload: {str(e)}")
 
+@router.post("/groups", response_model=dict)
+async def create_dataset_group(
+    group: DatasetGroupCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Déclarer un groupe relationnel à partir de datasets déjà uploadés
+    (ex: customers + orders) avec leurs clés primaires et étrangères
+    """
+    try:
+        result = await db.execute(
+            select(UploadedDataset)
+            .where(
+                UploadedDataset.id.in_(list(group.tables.values())),
+                UploadedDataset.user_id == current_user.id
+            )
+        )
+        datasets = {dataset.id: dataset for dataset in result.scalars().all()}
+        
+        missing = [table for table, dataset_id in group.tables.items() if dataset_id not in datasets]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Datasets non trouvés ou non autorisés: {', '.join(missing)}")
+        
+        # Vérifier que les clés déclarées existent dans les colonnes des datasets
+        declared_keys = [(table, pk) for table, pk in group.primary_keys.items()]
+        declared_keys += [(rel.child_table, rel.foreign_key) for rel in group.relationships]
+        for table, column in declared_keys:
+            if column not in (datasets[group.tables[table]].columns or []):
+                raise HTTPException(status_code=400, detail=f"La colonne '{column}' n'existe pas dans la table '{table}'")
+        
+        dataset_group = DatasetGroup(
+            user_id=current_user.id,
+            name=group.name,
+            tables=group.tables,
+            primary_keys=group.primary_keys,
+            relationships=[rel.model_dump() for rel in group.relationships]
+        )
+        db.add(dataset_group)
+        await db.commit()
+        await db.refresh(dataset_group)
+        
+        logger.info(f"Dataset group created: {dataset_group.id} ({len(group.tables)} tables)")
+        
+        return {
+            "message": "Groupe de datasets créé avec succès",
+            "group_id": dataset_group.id,
+            "name": dataset_group.name,
+            "tables": dataset_group.tables,
+            "primary_keys": dataset_group.primary_keys,
+            "relationships": dataset_group.relationships
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors de la création du groupe de datasets: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erreur lors de la création du groupe: {str(e)}")
+
+@router.get("/groups")
+async def get_dataset_groups(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Récupérer les groupes relationnels de l'utilisateur
+    """
+    try:
+        result = await db.execute(
+            select(DatasetGroup)
+            .where(DatasetGroup.user_id == current_user.id)
+            .order_by(DatasetGroup.created_at.desc())
+        )
+        groups = result.scalars().all()
+        
+        return {
+            "groups": [
+                {
+                    "id": group.id,
+                    "name": group.name,
+                    "tables": group.tables,
+                    "primary_keys": group.primary_keys,
+                    "relationships": group.relationships,
+                    "created_at": group.created_at.isoformat() if group.created_at else None
+                }
+                for group in groups
+            ]
+        }
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des groupes de datasets: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur lors de la récupération des groupes")
+
 @router.get("/check-filename/{filename}")
 async def check_filename_exists(
     filename: str,
@@ -0,0 +1,64 @@
+"""
+Schémas Pydantic pour les groupes de datasets relationnels (tables liées par des clés)
+"""
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List
+from datetime import datetime
+
+
+class TableRelationship(BaseModel):
+    """Clé étrangère d'une table enfant vers la clé primaire d'une table parente"""
+    parent_table: str = Field(..., description="Table parente (ex: customers)")
+    child_table: str = Field(..., description="Table enfant (ex: orders)")
+    foreign_key: str = Field(..., description="Colonne de la table enfant qui référence la clé primaire du parent")
+
+
+class DatasetGroupCreate(BaseModel):
+    """Déclaration d'un groupe de datasets déjà uploadés et de leurs clés"""
+    name: str = Field(..., min_length=1, description="Nom du groupe")
+    tables: Dict[str, int] = Field(..., description="Nom de table -> id du dataset uploadé")
+    primary_keys: Dict[str, str] = Field(default_factory=dict, description="Nom de table -> colonne clé primaire")
+    relationships: List[TableRelationship] = Field(default_factory=list, description="Relations parent/enfant")
+
+    @model_validator(mode='after')
+    def validate_keys(self):
+        """Valider que les clés référencent des tables du groupe et que les relations sont acycliques"""
+        if len(self.tables) < 2:
+            raise ValueError('Un groupe relationnel doit contenir au moins deux tables')
+
+        for table in self.primary_keys:
+            if table not in self.tables:
+                raise ValueError(f"Clé primaire déclarée pour une table inconnue: {table}")
+
+        for rel in self.relationships:
+            for table in (rel.parent_table, rel.child_table):
+                if table not in self.tables:
+                    raise ValueError(f"Relation vers une table inconnue: {table}")
+            if rel.parent_table not in self.primary_keys:
+                raise ValueError(f"La table parente {rel.parent_table} doit avoir une clé primaire déclarée")
+            if rel.parent_table == rel.child_table:
+                raise ValueError(f"Relation réflexive non supportée: {rel.parent_table}")
+
+        # Détection de cycle (tri topologique)
+        remaining = {rel.child_table for rel in self.relationships} | {rel.parent_table for rel in self.relationships}
+        edges = [(rel.parent_table, rel.child_table) for rel in self.relationships]
+        while remaining:
+            roots = [t for t in remaining if not any(child == t and parent in remaining for parent, child in edges)]
+            if not roots:
+                raise ValueError('Les relations entre tables forment un cycle')
+            remaining -= set(roots)
+
+        return self
+
+
+class DatasetGroupOut(BaseModel):
+    id: int
+    user_id: int
+    name: str
+    tables: Dict[str, int]
+    primary_keys: Dict[str, str]
+    relationships: List[TableRelationship]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -13,7 +13,7 @@ class GenerationConfigRequest(BaseModel):
     
     # Paramètres de base
     dataset_id: int = Field(..., description="ID du dataset à utiliser")
-    model_type: Literal['ctgan', 'tvae', 'gaussian_copula'] = Field(..., description="Type de modèle IA")
+    model_type: Literal['ctgan', 'tvae', 'gaussian_copula', 'bayesian_network'] = Field(..., description="Type de modèle IA")
     sample_size: int = Field(..., ge=100, le=100000, description="Nombre d'échantillons à générer")
     
     # Mode de génération
@@ -25,6 +25,7 @@ class GenerationConfigRequest(BaseModel):
     learning_rate: Optional[float] = Field(None, ge=0.00001, le=0.01, description="Taux d'apprentissage")
     generator_lr: Optional[float] = Field(None, ge=0.00001, le=0.01, description="Learning rate du générateur (CTGAN)")
     discriminator_lr: Optional[float] = Field(None, ge=0.00001, le=0.01, description="Learning rate du discriminateur (CTGAN)")
+    auto_config: bool = Field(False, description="Choisir epochs et batch_size automatiquement selon les données")
     
     # Paramètres spécifiques à Gaussian Copula
     distribution: Optional[Literal['parametric', 'bounded', 'truncated']] = Field(None, description="Type de distribution pour les variables numériques")
@@ -32,17 +33,18 @@ class GenerationConfigRequest(BaseModel):
     default_distribution: Optional[Literal['norm', 'uniform', 'truncnorm']] = Field(None, description="Distribution de fallback si l'estimation échoue")
     
     # Configuration d'optimisation (pour mode optimization)
-    optimization_method: Optional[Literal['grid', 'random', 'bayesian']] = Field(None, description="Méthode d'optimisation")
+    optimization_method: Optional[Literal['grid', 'random', 'bayesian', 'hyperband', 'asha', 'subsample']] = Field(None, description="Méthode d'optimisation")
     n_trials: Optional[int] = Field(None, ge=3, le=50, description="Nombre d'essais pour l'optimisation")
     hyperparameters: Optional[List[str]] = Field(None, description="Liste des hyperparamètres à optimiser")
+    quality_tolerance: Optional[float] = Field(None, ge=0, le=1, description="Écart de score accepté pour retenir la configuration la plus rapide à entraîner plutôt que la meilleure")
     
     @model_validator(mode='after')
     def validate_mode_params(self):
         """Valider les paramètres selon le mode"""
         if self.mode == 'simple':
-            if self.epochs is None:
+            if self.epochs is None and not self.auto_config:
                 raise ValueError('epochs est requis en mode simple')
-            if self.batch_size is None:
+            if self.batch_size is None and not self.auto_config:
                 raise ValueError('batch_size est requis en mode simple')
             if self.learning_rate is None:
                 raise ValueError('learning_rate est requis en mode simple')
@@ -57,6 +59,17 @@ class GenerationConfigRequest(BaseModel):
         
         return self
 
+class RelationalGenerationRequest(BaseModel):
+    """Configuration d'une génération multi-tables sur un groupe de datasets"""
+    model_config = {"protected_namespaces": ()}
+    
+    group_id: int = Field(..., description="ID du groupe de datasets relationnel")
+    model_type: Literal['ctgan', 'tvae', 'gaussian_copula', 'bayesian_network'] = Field(..., description="Type de modèle IA utilisé pour chaque table")
+    scale: float = Field(1.0, ge=0.1, le=10, description="Taille des tables racines relativement aux originales")
+    epochs: Optional[int] = Field(None, ge=50, le=1000, description="Nombre d'époques")
+    batch_size: Optional[int] = Field(None, ge=100, le=2000, description="Taille de batch")
+    learning_rate: Optional[float] = Field(None, ge=0.00001, le=0.01, description="Taux d'apprentissage")
+
 class GenerationStartResponse(BaseModel):
     """Réponse lors du démarrage d'une génération"""
     message: str
@@ -65,6 +78,17 @@ class GenerationStartResponse(BaseModel):
     mode: str
     estimated_time_minutes: Optional[int] = None
 
+class GenerationEstimateResponse(BaseModel):
+    """Estimation de la durée d'une génération avant son lancement"""
+    model_config = {"protected_namespaces": ()}
+    
+    dataset_id: int
+    model_type: str
+    mode: str
+    estimated_time_minutes: int
+    stages_seconds: Optional[Dict[str, float]] = None  # optimization, training, sampling, evaluation, total
+    source: Literal['model', 'heuristic']
+
 # === Schémas pour le statut et la progression ===
 
 class GenerationProgress(BaseModel):
@@ -63,7 +63,7 @@ class SearchSpace(BaseModel):
 
 class OptimizationConfig(BaseModel):
     enabled: bool = False
-    search_type: Optional[str] = "grid"  # "grid", "random", "bayesian"
+    search_type: Optional[str] = "grid"  # "grid", "random", "bayesian", "hyperband", "asha", "subsample"
     n_trials: Optional[int] = 5
     hyperparameters: Optional[dict] = {}  # Paramètres spécifiques à optimiser
 
@@ -99,6 +99,7 @@ class OptimizationTrialOut(BaseModel):
     quality_score: Optional[float]
     training_time: Optional[float]
     memory_usage: Optional[float]
+    epochs_trained: Optional[int] = None
     status: str
     started_at: datetime
     completed_at: Optional[datetime]
@@ -8,9 +8,11 @@ class RequestParametersBase(BaseModel):
     epochs: int = 300
     batch_size: int = 500
     learning_rate: float = 0.0002
+    auto_config: bool = False
     optimization_enabled: bool = False
     optimization_method: Optional[str] = "grid"
     optimization_n_trials: Optional[int] = 5
+    optimization_quality_tolerance: Optional[float] = None
     hyperparameters: Optional[List[str]] = []
 
 class RequestParametersCreate(RequestParametersBase):
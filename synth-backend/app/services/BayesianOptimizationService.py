@@ -1,14 +1,43 @@
 import numpy as np
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
 from sklearn.gaussian_process import GaussianProcessRegressor
 from sklearn.gaussian_process.kernels import Matern
 from scipy.optimize import minimize
-from scipy.stats import norm
+from scipy.stats import norm, qmc
 import json
 
+# Candidats quasi-aléatoires (Sobol) évalués en un seul appel à predict
+N_ACQUISITION_CANDIDATES = 2048
+
+# Meilleurs candidats affinés par L-BFGS-B
+N_REFINED_CANDIDATES = 3
+
+# Les hyperparamètres du noyau ne sont réoptimisés que toutes les k observations
+KERNEL_REFIT_EVERY = 5
+
+# Au-delà de ce nombre d'observations, le mode "auto" passe du GP à la forêt aléatoire
+AUTO_SURROGATE_SWITCH = 50
+
+# TPE: fraction des meilleures observations formant la densité l(x)
+TPE_GAMMA = 0.25
+
+SURROGATES = ("auto", "gp", "random_forest", "tpe")
+
+
 class BayesianOptimizationService:
-    def __init__(self, acquisition_function: str = "expected_improvement"):
+    def __init__(self, acquisition_function: str = "expected_improvement", surrogate: str = "auto"):
+        """
+        Args:
+            acquisition_function: expected_improvement, upper_confidence_bound ou probability_improvement
+            surrogate: Modèle de substitution: "gp", "random_forest", "tpe" ou "auto"
+                (GP puis forêt aléatoire au-delà de AUTO_SURROGATE_SWITCH observations)
+        """
+        if surrogate not in SURROGATES:
+            raise ValueError(f"Surrogate non supporté: {surrogate}")
         self.acquisition_function = acquisition_function
+        self.surrogate = surrogate
         self.gp = GaussianProcessRegressor(
             kernel=Matern(length_scale=1.0, nu=2.5),
             alpha=1e-6,
@@ -16,11 +45,32 @@ class BayesianOptimizationService:
             n_restarts_optimizer=5,
             random_state=42
         )
-        self.X_observed = []
-        self.y_observed = []
+        self.forest = RandomForestRegressor(
+            n_estimators=100,
+            min_samples_leaf=2,
+            random_state=42,
+            n_jobs=1
+        )
+        self._model = None
+        self._kernel_fitted_at = 0
+        self._tpe = None
+        self._warm_start: List[Dict[str, Any]] = []
+        
+        # Observations dans des tableaux préalloués (capacité doublée si besoin)
+        self._X = np.empty((0, 0))
+        self._y = np.empty(0)
+        self._n_observed = 0
         self.bounds = []
         self.param_names = []
 
+    @property
+    def X_observed(self) -> np.ndarray:
+        return self._X[:self._n_observed]
+
+    @property
+    def y_observed(self) -> np.ndarray:
+        return self._y[:self._n_observed]
+
     def set_search_space(self, search_space: Dict[str, Any]):
         """Configure l'espace de recherche"""
         self.bounds = []
@@ -36,17 +86,35 @@ class BayesianOptimizationService:
                     # Paramètre catégoriel - convertir en indices
                     self.bounds.append((0, len(param_config["choices"]) - 1))
                     self.param_names.append(param_name)
+        
+        self._X = np.empty((64, len(self.param_names)))
+        self._y = np.empty(64)
+        self._n_observed = 0
+        self._kernel_fitted_at = 0
+
+    def warm_start(self, configs: List[Dict[str, Any]]):
+        """Configurations (meilleures des datasets similaires) suggérées avant toute autre"""
+        self._warm_start = [config for config in configs if self._in_bounds(config)]
+
+    def _in_bounds(self, parameters: Dict[str, Any]) -> bool:
+        """Vérifie que chaque paramètre est une valeur numérique dans ses bornes"""
+        for name, (low, high) in zip(self.param_names, self.bounds):
+            value = parameters.get(name)
+            if not isinstance(value, (int, float)) or not low <= value <= high:
+                return False
+        return True
 
     def suggest_next_parameters(self) -> Dict[str, Any]:
         """Suggère les prochains paramètres à tester"""
-        if len(self.X_observed) < 2:
+        if self._warm_start:
+            return self._warm_start.pop(0)
+        
+        if self._n_observed < 2:
             # Random sampling pour les premiers points
             return self._random_sample()
         
-        # Fit le modèle gaussien
-        X = np.array(self.X_observed)
-        y = np.array(self.y_observed)
-        self.gp.fit(X, y)
+        # Ajuster le modèle de substitution
+        self._fit_surrogate(self.X_observed, self.y_observed)
         
         # Optimiser la fonction d'acquisition
         best_x = self._optimize_acquisition()
@@ -54,39 +122,173 @@ class BayesianOptimizationService:
         # Convertir en paramètres nommés
         return self._array_to_params(best_x)
 
+    def suggest_batch(self, q: int, strategy: str = "constant_liar") -> List[Dict[str, Any]]:
+        """
+        Suggère q paramètres distincts à évaluer en parallèle
+        
+        Les configurations de démarrage à chaud passent en premier. Après chaque
+        suggestion, une observation fictive est ajoutée au point choisi (sa
+        prédiction pour "kriging_believer", le pire score observé pour
+        "constant_liar") et le modèle est réajusté sans réoptimiser son noyau,
+        ce qui écarte les suggestions suivantes de ce point
+        """
+        suggestions, self._warm_start = self._warm_start[:q], self._warm_start[q:]
+        if len(suggestions) == q:
+            return suggestions
+        
+        if self._n_observed < 2:
+            return suggestions + [self._array_to_params(x) for x in self._candidate_batch(q - len(suggestions))]
+        
+        X = self.X_observed.copy()
+        y = self.y_observed.copy()
+        self._fit_surrogate(X, y)
+        best_f = np.max(y)
+        liar_value = np.min(y)
+        
+        # Les configurations de démarrage à chaud sont des points en attente comme les autres
+        if suggestions:
+            X = np.vstack([X, [self._params_to_array(config) for config in suggestions]])
+            y = np.append(y, [liar_value] * len(suggestions))
+            self._fit_surrogate(X, y, refit_kernel=False)
+        
+        while len(suggestions) < q:
+            x = self._optimize_acquisition(best_f=best_f)
+            suggestions.append(self._array_to_params(x))
+            if len(suggestions) == q:
+                break
+
+            if strategy == "kriging_believer" and self._tpe is None:
+                fantasy = self._predict(x.reshape(1, -1))[0][0]
+            else:
+                fantasy = liar_value
+            X = np.vstack([X, x])
+            y = np.append(y, fantasy)
+            self._fit_surrogate(X, y, refit_kernel=False)
+        
+        return suggestions
+
     def update_observations(self, parameters: Dict[str, Any], score: float):
         """Met à jour les observations avec un nouveau résultat"""
-        x = self._params_to_array(parameters)
-        self.X_observed.append(x)
-        self.y_observed.append(score)
-
-    def _optimize_acquisition(self) -> np.ndarray:
-        """Optimise la fonction d'acquisition"""
-        best_x = None
-        best_acquisition = -np.inf
-        
-        # Multi-start optimization
-        for _ in range(10):
-            x0 = self._random_sample_array()
+        if self._n_observed == len(self._y):
+            capacity = max(2 * len(self._y), 64)
+            X = np.empty((capacity, len(self.param_names)))
+            y = np.empty(capacity)
+            X[:self._n_observed] = self.X_observed
+            y[:self._n_observed] = self.y_observed
+            self._X, self._y = X, y
+        self._X[self._n_observed] = self._params_to_array(parameters)
+        self._y[self._n_observed] = score
+        self._n_observed += 1
+
+    def _active_surrogate(self, n_observations: int) -> str:
+        if self.surrogate == "auto":
+            return "gp" if n_observations <= AUTO_SURROGATE_SWITCH else "random_forest"
+        return self.surrogate
+
+    def _fit_surrogate(self, X: np.ndarray, y: np.ndarray, refit_kernel: Optional[bool] = None) -> None:
+        """
+        Ajuste le modèle de substitution
+        
+        Pour le GP, le noyau n'est réoptimisé (avec redémarrages) que toutes les
+        KERNEL_REFIT_EVERY observations; entre deux, le GP est réajusté avec le
+        dernier noyau optimisé, sans optimiseur
+        """
+        surrogate = self._active_surrogate(len(y))
+        self._tpe = None
+        
+        if surrogate == "tpe":
+            self._tpe = self._fit_tpe(X, y)
+            self._model = None
+        elif surrogate == "random_forest":
+            self._model = self.forest.fit(X, y)
+        else:
+            if refit_kernel is None:
+                refit_kernel = (
+                    not hasattr(self.gp, "kernel_")
+                    or len(y) - self._kernel_fitted_at >= KERNEL_REFIT_EVERY
+                )
+            if refit_kernel:
+                self.gp.fit(X, y)
+                self._kernel_fitted_at = len(y)
+                self._model = self.gp
+            else:
+                self._model = clone(self.gp).set_params(kernel=self.gp.kernel_, optimizer=None).fit(X, y)
+
+    def _predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Moyenne et écart-type prédits par le modèle de substitution"""
+        if isinstance(self._model, RandomForestRegressor):
+            # Dispersion entre les arbres comme incertitude
+            per_tree = np.stack([tree.predict(X) for tree in self._model.estimators_])
+            return per_tree.mean(axis=0), per_tree.std(axis=0)
+        return self._model.predict(X, return_std=True)
+
+    def _fit_tpe(self, X: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
+        """Densités de Parzen des bonnes (l) et mauvaises (g) observations"""
+        n_good = max(int(np.ceil(TPE_GAMMA * len(y))), 1)
+        order = np.argsort(y)[::-1]
+        width = np.array([high - low for low, high in self.bounds], dtype=float)
+        width[width == 0] = 1.0
+
+        def parzen(points):
+            # Largeur de bande de Scott par dimension, bornée par 1% de l'intervalle
+            scale = np.std(points, axis=0) * len(points) ** (-1.0 / (points.shape[1] + 4))
+            return points, np.maximum(scale, 0.01 * width)
+        
+        return {"good": parzen(X[order[:n_good]]), "bad": parzen(X[order[n_good:]])}
+
+    def _tpe_log_ratio(self, X: np.ndarray) -> np.ndarray:
+        """log l(x) - log g(x), maximisé par TPE"""
+        def log_density(X, kde):
+            centers, scale = kde
+            if len(centers) == 0:
+                return np.zeros(len(X))
+            z = (X[:, None, :] - centers[None, :, :]) / scale
+            log_kernels = -0.5 * np.sum(z ** 2, axis=2) - np.sum(np.log(scale))
+            m = log_kernels.max(axis=1, keepdims=True)
+            return (m + np.log(np.exp(log_kernels - m).mean(axis=1, keepdims=True)))[:, 0]
+        return log_density(X, self._tpe["good"]) - log_density(X, self._tpe["bad"])
+
+    def _optimize_acquisition(self, best_f: Optional[float] = None) -> np.ndarray:
+        """
+        Optimise la fonction d'acquisition
+        
+        Un lot de candidats Sobol est évalué en un seul appel vectorisé au modèle,
+        puis seuls les meilleurs sont affinés par L-BFGS-B (GP uniquement: les
+        surrogates forêt et TPE ne sont pas dérivables)
+        """
+        candidates = self._candidate_batch(N_ACQUISITION_CANDIDATES)
+        values = self._acquisition_function(candidates, best_f)
+        top = np.argsort(values)[::-1][:N_REFINED_CANDIDATES]
+        
+        best_x = candidates[top[0]]
+        best_acquisition = values[top[0]]
+        if not isinstance(self._model, GaussianProcessRegressor):
+            return best_x
+        
+        for x0 in candidates[top]:
             res = minimize(
-                fun=lambda x: -self._acquisition_function(x.reshape(1, -1)),
+                fun=lambda x: -float(self._acquisition_function(x.reshape(1, -1), best_f)[0]),
                 x0=x0,
                 bounds=self.bounds,
                 method='L-BFGS-B'
             )
-            
+        
             if res.success and -res.fun > best_acquisition:
                 best_acquisition = -res.fun
                 best_x = res.x
         
-        return best_x if best_x is not None else self._random_sample_array()
+        return best_x
 
-    def _acquisition_function(self, X: np.ndarray) -> float:
-        """Calcule la valeur de la fonction d'acquisition"""
-        mu, sigma = self.gp.predict(X, return_std=True)
+    def _acquisition_function(self, X: np.ndarray, best_f: Optional[float] = None) -> np.ndarray:
+        """Calcule la fonction d'acquisition pour chaque ligne de X"""
+        if self._tpe is not None:
+            return self._tpe_log_ratio(X)
         
-        if self.acquisition_function == "expected_improvement":
+        mu, sigma = self._predict(X)
+        if best_f is None:
             best_f = np.max(self.y_observed)
+        
+        if self.acquisition_function == "expected_improvement":
             z = (mu - best_f) / (sigma + 1e-9)
             return sigma * (z * norm.cdf(z) + norm.pdf(z))
         
@@ -95,12 +297,18 @@ class BayesianOptimizationService:
             return mu + kappa * sigma
         
         elif self.acquisition_function == "probability_improvement":
-            best_f = np.max(self.y_observed)
             z = (mu - best_f) / (sigma + 1e-9)
             return norm.cdf(z)
         
         return mu
 
+    def _candidate_batch(self, n: int) -> np.ndarray:
+        """Points quasi-aléatoires (Sobol brouillé) couvrant l'espace de recherche"""
+        low, high = np.array(self.bounds, dtype=float).T
+        sampler = qmc.Sobol(d=len(self.bounds), scramble=True, seed=np.random.randint(2**31))
+        unit = sampler.random_base2(m=max(int(np.ceil(np.log2(n))), 0))[:n]
+        return low + unit * (high - low)
+
     def _random_sample(self) -> Dict[str, Any]:
         """Échantillonnage aléatoire"""
         x = self._random_sample_array()
@@ -122,4 +330,4 @@ class BayesianOptimizationService:
         params = {}
         for i, name in enumerate(self.param_names):
             params[name] = x[i]
-        return params
\ No newline at end of file
+        return params
@@ -1,34 +1,64 @@
 """
 Service de génération de données synthétiques
-Supporte CTGAN, TVAE et l'optimisation bayésienne
+Supporte CTGAN, TVAE, le réseau bayésien rapide et l'optimisation bayésienne
 """
+import asyncio
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional, Tuple
+from functools import partial
 import os
 import json
 import time
 from datetime import datetime
+from pathlib import Path
 import logging
 
 # SDV imports
-from sdv.single_table import CTGANSynthesizer, TVAESynthesizer
 from sdv.metadata import SingleTableMetadata
-from sdv.evaluation.single_table import evaluate_quality
 
 # Optimisation
 from sklearn.model_selection import ParameterGrid
-from skopt import gp_minimize
-from skopt.space import Real, Integer, Categorical
-from skopt.utils import use_named_args
+
+from app.core.config import settings
+from app.ai.models.base_wrapper import BaseModelWrapper
+from app.ai.models.bayesian_network import BayesianNetworkSynthesizer
+from app.ai.models.resumable_synthesizers import ResumableCTGANSynthesizer, ResumableTVAESynthesizer
+from app.ai.services.training_config import resolve_training_params, estimate_transformed_width
+from app.ai.services.budget_scheduler import TrialBudget
+from app.ai.services.cost_model import trial_cost_prior
+from app.ai.services.trial_executor import TrialExecutor, run_model_trial
+from app.ai.services.trial_pruner import TrialPruner
+from app.ai.services.trial_cache import dataset_fingerprint, evaluation_scheme, evict_trial_models, lookup_trial
+from app.ai.services.evaluation_holdout import get_evaluation_holdout
+from app.ai.services.optimization_study import has_completed_study
+from app.ai.services.warm_start import register_dataset, leaderboard, warm_start_configs
+from app.ai.services.successive_halving import SuccessiveHalvingSearch, MIN_EPOCH_BUDGET
+from app.ai.services.data_fidelity import SubsampleFidelitySearch, fidelity_fractions, stratified_subsample
+from app.ai.services.epoch_prefix import group_epoch_prefixes
+from app.ai.services.quality_engine import quality_report
+from app.services.BayesianOptimizationService import BayesianOptimizationService
 
 logger = logging.getLogger(__name__)
 
+# Modèles entraînés par les essais d'optimisation, réutilisés pour la génération finale
+TRIAL_MODEL_DIR = Path(__file__).resolve().parent.parent / "data" / "trial_models"
+
+# Classe de chaque type de modèle, pour recharger un modèle sauvegardé
+MODEL_CLASSES = {
+    'ctgan': ResumableCTGANSynthesizer,
+    'tvae': ResumableTVAESynthesizer,
+    'bayesian_network': BayesianNetworkSynthesizer
+}
+
+# Paramètres que le TVAESynthesizer de SDV n'accepte pas: les chercher entraînerait des modèles identiques
+TVAE_UNSUPPORTED_PARAMETERS = ('learning_rate',)
+
 
 class SyntheticDataGenerationService:
     
     def __init__(self):
-        self.supported_models = ['ctgan', 'tvae', 'bayesian']
+        self.supported_models = ['ctgan', 'tvae', 'bayesian_network', 'bayesian']
         self.default_params = {
             'ctgan': {
                 'epochs': 300,
@@ -41,9 +71,12 @@ class SyntheticDataGenerationService:
             'tvae': {
                 'epochs': 300,
                 'batch_size': 500,
-                'learning_rate': 1e-3,
                 'compress_dims': (128, 128),
                 'decompress_dims': (128, 128),
+            },
+            'bayesian_network': {
+                'n_bins': 20,
+                'max_parents': 2,
             }
         }
     
@@ -70,6 +103,14 @@ class SyntheticDataGenerationService:
             metadata = SingleTableMetadata()
             metadata.detect_from_dataframe(df)
             
+            # Epochs / batch_size "auto": choisis selon la taille des données et la mémoire
+            # (seules les valeurs "auto" sont remplacées, les epochs suivent un batch_size fixé)
+            auto_keys = [key for key in ('epochs', 'batch_size') if parameters.get(key) == 'auto']
+            if auto_keys:
+                fixed_batch_size = parameters.get('batch_size') if 'batch_size' not in auto_keys else None
+                auto_params = resolve_training_params(df, model_type, batch_size=fixed_batch_size)
+                parameters.update({key: auto_params[key] for key in auto_keys})
+            
             # Optimisation des hyperparamètres si demandée
             if optimization_config and optimization_config.get('enabled', False):
                 if progress_callback:
@@ -79,15 +120,23 @@ class SyntheticDataGenerationService:
                     df, metadata, model_type, optimization_config, progress_callback
                 )
                 parameters.update(best_params)
+                
+                # Le modèle du meilleur essai est repris tel quel: seul l'échantillonnage reste à faire
+                model = self._load_trial_model(df, metadata, model_type, best_params)
+                
+                # Optimisation terminée: seuls les meilleurs modèles d'essai du dataset restent sur disque
+                evict_trial_models(dataset_fingerprint(df), settings.TRIAL_MODELS_KEPT, [best_params])
             else:
                 best_score = None
+                model = None
             
             # Entraînement du modèle
-            if progress_callback:
-                progress_callback(50, f"Entraînement du modèle {model_type.upper()}...")
-            
-            model = self._create_model(model_type, parameters)
-            model.fit(df)
+            if model is None:
+                if progress_callback:
+                    progress_callback(50, f"Entraînement du modèle {model_type.upper()}...")
+                
+                model = self._create_model(model_type, parameters, metadata)
+                model.fit(df)
             
             # Génération des données synthétiques
             if progress_callback:
@@ -135,10 +184,14 @@ class SyntheticDataGenerationService:
         else:
             raise ValueError(f"Format de fichier non supporté: {ext}")
     
-    def _create_model(self, model_type: str, parameters: Dict[str, Any]):
-        """Crée une instance du modèle avec les paramètres spécifiés"""
+    def _create_model(self, model_type: str, parameters: Dict[str, Any], metadata: SingleTableMetadata):
+        """
+        Crée une instance du modèle avec les paramètres spécifiés
+        (CTGAN / TVAE peuvent être photographiés en cours d'entraînement, cf. epoch_prefix)
+        """
         if model_type == 'ctgan':
-            return CTGANSynthesizer(
+            return ResumableCTGANSynthesizer(
+                metadata,
                 epochs=parameters.get('epochs', 300),
                 batch_size=parameters.get('batch_size', 500),
                 generator_lr=parameters.get('generator_lr', 2e-4),
@@ -148,17 +201,44 @@ class SyntheticDataGenerationService:
                 verbose=True
             )
         elif model_type == 'tvae':
-            return TVAESynthesizer(
+            # Le TVAESynthesizer de SDV n'a pas de taux d'apprentissage (cf. TVAE_UNSUPPORTED_PARAMETERS)
+            return ResumableTVAESynthesizer(
+                metadata,
                 epochs=parameters.get('epochs', 300),
                 batch_size=parameters.get('batch_size', 500),
-                learning_rate=parameters.get('learning_rate', 1e-3),
                 compress_dims=parameters.get('compress_dims', (128, 128)),
                 decompress_dims=parameters.get('decompress_dims', (128, 128)),
                 verbose=True
             )
+        elif model_type == 'bayesian_network':
+            return BayesianNetworkSynthesizer(
+                n_bins=parameters.get('n_bins', 20),
+                max_parents=parameters.get('max_parents', 2)
+            )
         else:
             raise ValueError(f"Modèle non supporté: {model_type}")
     
+    def _load_trial_model(
+        self,
+        df: pd.DataFrame,
+        metadata: SingleTableMetadata,
+        model_type: str,
+        params: Dict[str, Any]
+    ):
+        """Modèle entraîné par l'essai de ces paramètres sur ces données, ou None s'il n'a pas été sauvegardé"""
+        fingerprint = dataset_fingerprint(df)
+        holdout = get_evaluation_holdout(df, fingerprint, metadata.to_dict())
+        cached = lookup_trial(fingerprint, model_type, params, holdout.evaluation)
+        if not cached or not cached['model_path'] or not os.path.exists(cached['model_path']):
+            return None
+        try:
+            model = MODEL_CLASSES[model_type].load(cached['model_path'])
+            logger.info(f"Modèle du meilleur essai {params} réutilisé sans réentraînement")
+            return model
+        except Exception as e:
+            logger.warning(f"Modèle de l'essai {params} illisible, réentraînement: {e}")
+            return None
+    
     async def _optimize_hyperparameters(
         self,
         df: pd.DataFrame,
@@ -173,55 +253,101 @@ class SyntheticDataGenerationService:
         search_type = optimization_config.get('search_type', 'grid')
         n_trials = optimization_config.get('n_trials', 5)
         hyperparameters = optimization_config.get('hyperparameters', [])
+        if model_type == 'tvae':
+            unsupported = [name for name in hyperparameters if name in TVAE_UNSUPPORTED_PARAMETERS]
+            if unsupported:
+                logger.warning(f"{unsupported}: pas des paramètres du TVAE de SDV, exclus de la recherche")
+                hyperparameters = [name for name in hyperparameters if name not in TVAE_UNSUPPORTED_PARAMETERS]
+        budget = self._make_budget(df, model_type, optimization_config)
+        
+        # Dataset déjà optimisé (une recherche de ce modèle y est allée à son terme):
+        # sa meilleure configuration est reprise sans nouvel essai
+        warm_start = []
+        if settings.WARM_START_ENABLED:
+            fingerprint = dataset_fingerprint(df)
+            param_names = list(self._get_param_space(model_type, hyperparameters))
+            register_dataset(fingerprint, df)
+            holdout = get_evaluation_holdout(df, fingerprint, metadata.to_dict())
+            best_known = []
+            if has_completed_study(fingerprint, model_type):
+                best_known = leaderboard(fingerprint, model_type, holdout.evaluation, limit=1)
+            if best_known and set(best_known[0]['params']) == set(param_names):
+                logger.info(f"Dataset déjà optimisé, configuration reprise: {best_known[0]['params']}")
+                return best_known[0]['params'], best_known[0]['score']
+            warm_start = warm_start_configs(
+                fingerprint, df, model_type, param_names, settings.WARM_START_CONFIGS,
+                scheme=evaluation_scheme(holdout.evaluation)
+            )
         
         if search_type == 'grid':
-            return await self._grid_search(df, metadata, model_type, hyperparameters, progress_callback)
+            return await self._grid_search(df, metadata, model_type, hyperparameters, progress_callback, budget)
         elif search_type == 'random':
-            return await self._random_search(df, metadata, model_type, hyperparameters, n_trials, progress_callback)
+            return await self._random_search(df, metadata, model_type, hyperparameters, n_trials, progress_callback, budget)
         elif search_type == 'bayesian':
-            return await self._bayesian_optimization(df, metadata, model_type, hyperparameters, n_trials, progress_callback)
+            return await self._bayesian_optimization(
+                df, metadata, model_type, hyperparameters, n_trials, progress_callback, warm_start, budget
+            )
+        elif search_type in ('hyperband', 'asha'):
+            return await self._successive_halving(
+                df, metadata, model_type, hyperparameters, search_type, n_trials, progress_callback, budget
+            )
+        elif search_type == 'subsample':
+            return await self._subsample_search(df, metadata, model_type, hyperparameters, progress_callback, budget)
         else:
             raise ValueError(f"Méthode d'optimisation non supportée: {search_type}")
     
+    def _make_budget(
+        self,
+        df: pd.DataFrame,
+        model_type: str,
+        optimization_config: Dict[str, Any]
+    ) -> TrialBudget:
+        """
+        Budget de temps / d'évaluations de la recherche: timeout_minutes et
+        max_evaluations de la configuration d'optimisation (OPTIMIZATION_TIMEOUT_HOURS
+        par défaut). Les premiers essais sont planifiés avec le modèle de coût appris,
+        aux threads des workers qui les exécutent
+        """
+        return TrialBudget(
+            timeout_minutes=optimization_config.get('timeout_minutes') or settings.OPTIMIZATION_TIMEOUT_HOURS * 60,
+            max_evaluations=optimization_config.get('max_evaluations'),
+            cost_prior=trial_cost_prior(
+                model_type, len(df), estimate_transformed_width(df), TrialExecutor().trial_threads
+            )
+        )
+    
     async def _grid_search(
         self,
         df: pd.DataFrame,
         metadata: SingleTableMetadata,
         model_type: str,
         hyperparameters: List[str],
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        budget: Optional[TrialBudget] = None
     ) -> Tuple[Dict[str, Any], float]:
-        """Recherche par grille des meilleurs hyperparamètres"""
+        """Recherche par grille des meilleurs hyperparamètres (essais exécutés en parallèle)"""
         
         # Définir l'espace de recherche
         param_grid = self._get_param_grid(model_type, hyperparameters)
         
-        best_params = None
-        best_score = 0
-        total_combinations = len(list(ParameterGrid(param_grid)))
-        
-        for i, params in enumerate(ParameterGrid(param_grid)):
-            try:
-                # Entraîner le modèle avec ces paramètres
-                model = self._create_model(model_type, params)
-                model.fit(df)
-                
-                # Générer un échantillon pour évaluation
-                synthetic_sample = model.sample(min(1000, len(df)))
-                score = self._evaluate_quality(df, synthetic_sample, metadata)
-                
-                if score > best_score:
-                    best_score = score
-                    best_params = params.copy()
-                
-                if progress_callback:
-                    progress = 20 + (i / total_combinations) * 25  # 20-45% pour grid search
-                    progress_callback(progress, f"Grid Search: {i+1}/{total_combinations}")
-                    
-            except Exception as e:
-                logger.warning(f"Échec de l'évaluation pour les paramètres {params}: {e}")
-                continue
+        # Les combinaisons qui ne diffèrent que par les epochs partagent un entraînement
+        # jusqu'à la plus grande valeur, les plus petites sont évaluées sur des instantanés
+        jobs = [
+            {
+                'model_type': model_type,
+                'params': group['params'],
+                'snapshot_epochs': group['snapshot_epochs'],
+                'df': df,
+                'metadata': metadata
+            }
+            for group in group_epoch_prefixes(list(ParameterGrid(param_grid)))
+        ]
         
+        with TrialExecutor() as executor:
+            best_params, best_score, _ = await self._run_trials(
+                executor, jobs, "Grid Search", progress_callback,
+                total=sum(1 + len(job['snapshot_epochs']) for job in jobs), budget=budget
+            )
         return best_params or self.default_params[model_type], best_score
     
     async def _random_search(
@@ -231,101 +357,342 @@ class SyntheticDataGenerationService:
         model_type: str,
         hyperparameters: List[str],
         n_trials: int,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        budget: Optional[TrialBudget] = None
     ) -> Tuple[Dict[str, Any], float]:
-        """Recherche aléatoire des meilleurs hyperparamètres"""
+        """Recherche aléatoire des meilleurs hyperparamètres (essais exécutés en parallèle)"""
         
-        # Définir l'espace de recherche
+        # Définir l'espace de recherche et tirer tous les essais à l'avance
         param_space = self._get_param_space(model_type, hyperparameters)
+        jobs = [
+            {'model_type': model_type, 'params': self._sample_random_params(param_space), 'df': df, 'metadata': metadata}
+            for _ in range(n_trials)
+        ]
+        
+        with TrialExecutor() as executor:
+            best_params, best_score, _ = await self._run_trials(
+                executor, jobs, "Random Search", progress_callback, budget=budget
+            )
+        return best_params or self.default_params[model_type], best_score
+    
+    async def _bayesian_optimization(
+        self,
+        df: pd.DataFrame,
+        metadata: SingleTableMetadata,
+        model_type: str,
+        hyperparameters: List[str],
+        n_trials: int,
+        progress_callback: Optional[callable] = None,
+        warm_start: Optional[List[Dict[str, Any]]] = None,
+        budget: Optional[TrialBudget] = None
+    ) -> Tuple[Dict[str, Any], float]:
+        """
+        Optimisation bayésienne des hyperparamètres (BayesianOptimizationService)
+        
+        Le service propose des lots de points (stratégie "constant liar")
+        évalués en parallèle, un point par worker, avec le modèle de substitution
+        BAYESIAN_SURROGATE. Les premiers essais sont les configurations de
+        démarrage à chaud comprises dans l'espace de recherche.
+        La recherche s'arrête quand le budget est épuisé; un essai raccourci est
+        rapporté au service avec les epochs réellement entraînées
+        """
+        
+        # Espace de recherche du service (indices des choix, exposant des taux d'apprentissage)
+        search_space = self._get_bayesian_search_space(model_type, hyperparameters)
+        optimizer = BayesianOptimizationService(surrogate=settings.BAYESIAN_SURROGATE)
+        optimizer.set_search_space(search_space)
+        seeds = [self._encode_bayesian_point(config, search_space) for config in warm_start or []]
+        optimizer.warm_start([point for point in seeds if point is not None])
         
         best_params = None
         best_score = 0
+        trial_count = 0
         
-        for i in range(n_trials):
-            try:
-                # Échantillonner aléatoirement des paramètres
-                params = self._sample_random_params(param_space)
+        with TrialExecutor() as executor:
+            while trial_count < n_trials and not (budget is not None and budget.exhausted):
+                batch_size = min(executor.max_workers, n_trials - trial_count)
+                points = optimizer.suggest_batch(batch_size)
+                jobs = [
+                    {
+                        'model_type': model_type, 'params': self._decode_bayesian_point(point, search_space),
+                        'df': df, 'metadata': metadata
+                    }
+                    for point in points
+                ]
                 
-                # Entraîner le modèle
-                model = self._create_model(model_type, params)
-                model.fit(df)
-                
-                # Évaluer
-                synthetic_sample = model.sample(min(1000, len(df)))
-                score = self._evaluate_quality(df, synthetic_sample, metadata)
+                batch_params, batch_score, trials = await self._run_trials(
+                    executor, jobs, "Bayesian Optimization", progress_callback,
+                    completed=trial_count, total=n_trials, budget=budget
+                )
+                trial_count += len(jobs)
                 
-                if score > best_score:
-                    best_score = score
-                    best_params = params.copy()
+                if batch_params is not None and batch_score > best_score:
+                    best_score = batch_score
+                    best_params = batch_params
                 
-                if progress_callback:
-                    progress = 20 + (i / n_trials) * 25  # 20-45% pour random search
-                    progress_callback(progress, f"Random Search: {i+1}/{n_trials}")
-                    
-            except Exception as e:
-                logger.warning(f"Échec de l'évaluation pour les paramètres {params}: {e}")
-                continue
+                # Essais sautés faute de budget: rien à apprendre, la recherche s'arrête
+                told = 0
+                for point, trial in zip(points, trials):
+                    if trial is None:
+                        continue
+                    # Point réellement entraîné (essai raccourci), s'il reste dans l'espace de recherche
+                    trained = self._encode_bayesian_point(trial['params'], search_space)
+                    # Score neutre en cas d'échec
+                    optimizer.update_observations(
+                        trained if trained is not None else point,
+                        trial['score'] if trial['score'] is not None else 0
+                    )
+                    told += 1
+                if not told:
+                    break
         
         return best_params or self.default_params[model_type], best_score
     
-    async def _bayesian_optimization(
+    async def _successive_halving(
         self,
         df: pd.DataFrame,
         metadata: SingleTableMetadata,
         model_type: str,
         hyperparameters: List[str],
+        search_type: str,
         n_trials: int,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        budget: Optional[TrialBudget] = None
+    ) -> Tuple[Dict[str, Any], float]:
+        """
+        Hyperband / ASHA: les configurations sont d'abord entraînées avec peu
+        d'époques et seul le meilleur tiers est promu vers un budget supérieur
+        """
+        param_space = self._get_param_space(model_type, hyperparameters)
+        epochs_range = param_space.pop('epochs', None)
+        
+        # Sans époques (réseau bayésien) ou sans autre paramètre, pas de budget à réduire
+        if 'epochs' not in self.default_params.get(model_type, {}) or not param_space:
+            logger.info(f"{search_type} sans objet pour {model_type} / {hyperparameters}, recherche aléatoire")
+            return await self._random_search(df, metadata, model_type, hyperparameters, n_trials, progress_callback, budget)
+        
+        max_epochs = epochs_range[1] if epochs_range else self.default_params[model_type]['epochs']
+        best = {'params': None, 'score': 0}
+        completed = 0
+        
+        def make_job(config, epochs, trial_index):
+            return {
+                'model_type': model_type, 'params': {**config, 'epochs': epochs}, 'df': df, 'metadata': metadata,
+                'deadline': budget.training_deadline() if budget is not None else None
+            }
+        
+        search = SuccessiveHalvingSearch(
+            executor=TrialExecutor(),
+            trial_fn=_evaluate_trial,
+            make_job=make_job,
+            get_score=lambda result: result['score'],
+            min_budget=MIN_EPOCH_BUDGET,
+            max_budget=max_epochs,
+            time_budget=budget
+        )
+        
+        if search_type == 'asha':
+            n_configs = max(n_trials, search.eta ** (len(search.budgets) - 1))
+            total = sum(max(n_configs // search.eta ** level, 1) for level in range(len(search.budgets)))
+        else:
+            total = search.hyperband_trial_count()
+        
+        def on_result(record):
+            nonlocal completed
+            completed += 1
+            result = record['result']
+            if budget is not None:
+                budget.record(
+                    result['params'] if result else {**record['config'], 'epochs': record['budget']},
+                    result['training_time'] if result else None,
+                    result['evaluation_time'] if result else None
+                )
+            if record['score'] is not None and record['score'] > best['score']:
+                best.update(params=result['params'], score=record['score'])
+            if progress_callback:
+                progress = 20 + min(completed / total, 1) * 25
+                progress_callback(progress, f"{search_type.upper()}: {completed}/{total}")
+        
+        search.on_result = on_result
+        if search_type == 'asha':
+            await search.asha(lambda: self._sample_random_params(param_space), n_configs)
+        else:
+            await search.hyperband(lambda n: [self._sample_random_params(param_space) for _ in range(n)])
+        
+        logger.info(f"{search_type}: {sum(r['budget'] for r in search.records)} époques entraînées au total")
+        return best['params'] or self.default_params[model_type], best['score']
+    
+    async def _subsample_search(
+        self,
+        df: pd.DataFrame,
+        metadata: SingleTableMetadata,
+        model_type: str,
+        hyperparameters: List[str],
+        progress_callback: Optional[callable] = None,
+        budget: Optional[TrialBudget] = None
     ) -> Tuple[Dict[str, Any], float]:
-        """Optimisation bayésienne des hyperparamètres"""
+        """
+        Multi-fidélité sur les lignes: la grille est d'abord évaluée sur des
+        sous-échantillons stratifiés et seules les meilleures configurations
+        sont entraînées sur toutes les données
+        """
+        fractions = fidelity_fractions(len(df))
+        if len(fractions) == 1:
+            logger.info(f"{len(df)} lignes, trop peu pour sous-échantillonner: recherche par grille")
+            return await self._grid_search(df, metadata, model_type, hyperparameters, progress_callback, budget)
+        
+        subsamples = {fraction: stratified_subsample(df, fraction) for fraction in fractions}
+        # Toutes les fidélités sont évaluées sur l'échantillon d'évaluation des données complètes
+        holdout = get_evaluation_holdout(df, metadata=metadata.to_dict())
+        configs = list(ParameterGrid(self._get_param_grid(model_type, hyperparameters)))
+        best = {'params': None, 'score': 0}
+        completed = 0
+        
+        def make_job(config, fraction, trial_index):
+            return {
+                'model_type': model_type, 'params': config, 'df': subsamples[fraction],
+                'metadata': metadata, 'holdout': holdout,
+                'deadline': budget.training_deadline() if budget is not None else None
+            }
+        
+        search = SubsampleFidelitySearch(
+            executor=TrialExecutor(),
+            trial_fn=_evaluate_trial,
+            make_job=make_job,
+            get_score=lambda result: result['score'],
+            fractions=fractions,
+            time_budget=budget
+        )
+        total = search.trial_count(len(configs))
+        
+        def on_result(record):
+            nonlocal completed
+            completed += 1
+            result = record['result']
+            if budget is not None:
+                budget.record(
+                    result['params'] if result else record['config'],
+                    result['training_time'] if result else None,
+                    result['evaluation_time'] if result else None,
+                    data_fraction=record['fraction']
+                )
+            # Seuls les scores sur toutes les données sont comparables entre eux
+            if record['fraction'] >= 1.0 and record['score'] is not None and record['score'] > best['score']:
+                best.update(params=result['params'], score=record['score'])
+            if progress_callback:
+                progress = 20 + min(completed / total, 1) * 25
+                progress_callback(progress, f"SUBSAMPLE: {completed}/{total}")
+        
+        search.on_result = on_result
+        await search.run(configs)
+        
+        logger.info(
+            f"subsample: {sum(1 for r in search.records if r['fraction'] >= 1.0)}/{len(configs)} "
+            f"configurations entraînées sur toutes les données"
+        )
+        return best['params'] or self.default_params[model_type], best['score']
+    
+    async def _run_trials(
+        self,
+        executor: TrialExecutor,
+        jobs: List[Dict[str, Any]],
+        label: str,
+        progress_callback: Optional[callable] = None,
+        completed: int = 0,
+        total: Optional[int] = None,
+        budget: Optional[TrialBudget] = None
+    ) -> Tuple[Optional[Dict[str, Any]], float, List[Optional[Dict[str, Any]]]]:
+        """
+        Exécute des essais en parallèle et suit le meilleur score au fil des résultats
         
-        # Définir l'espace de recherche pour scikit-optimize
-        dimensions = self._get_skopt_dimensions(model_type, hyperparameters)
-        param_names = list(dimensions.keys())
-        dimension_list = list(dimensions.values())
+        Un essai part dès qu'un worker se libère; avec un budget, il est planifié sur
+        le temps restant: un essai qui ne tient pas est raccourci aux epochs qui
+        tiennent, ou sauté; les essais en cours s'arrêtent à l'échéance.
+        Les instantanés d'un essai (``snapshot_epochs``) comptent comme des essais;
+        ceux qu'un essai raccourci, arrêté ou élagué n'atteint pas sont comptés sautés.
+        Avec TRIAL_PRUNING_ENABLED, un essai avec epochs est élagué quand le score
+        d'une sonde de ses poids courants passe sous ceux des essais terminés à la
+        même epoch (cf. TrialPruner): il n'est pas noté
         
+        Returns:
+            Tuple (meilleurs paramètres ou None, meilleur score, {"params", "score"} de chaque
+            essai dans l'ordre des jobs avec les paramètres réellement entraînés et un score
+            None si échec ou élagage, None pour un essai sauté faute de budget)
+        """
+        total = total or len(jobs)
         best_params = None
         best_score = 0
-        trial_count = 0
+        trials = [None] * len(jobs)
+        curves = []
+        skipped = 0
+        
+        def account(params, result):
+            nonlocal completed, best_params, best_score
+            completed += 1
+            if budget is not None:
+                budget.record(
+                    params,
+                    result['training_time'] if result else None,
+                    result['evaluation_time'] if result else None
+                )
+            if result is not None and result['curve']:
+                curves.append(result['curve'])
+            if result is not None and result['score'] is not None and result['score'] > best_score:
+                best_score = result['score']
+                best_params = params.copy()
+            if progress_callback:
+                planned = max(total - skipped, 1)
+                progress = 20 + min(completed / planned, 1) * 25  # 20-45% pour l'optimisation
+                progress_callback(progress, f"{label}: {completed}/{planned}")
         
-        @use_named_args(dimension_list)
-        def objective(**params):
-            nonlocal best_params, best_score, trial_count
-            trial_count += 1
+        queue = list(enumerate(jobs))
+        running = {}
+        while True:
+            while queue and len(running) < executor.max_workers and not (budget is not None and budget.exhausted):
+                index, job = queue.pop(0)
+                snapshot_epochs = job.get('snapshot_epochs') or []
+                if settings.TRIAL_PRUNING_ENABLED and 'epochs' in job['params']:
+                    job = {**job, 'pruner': TrialPruner(list(curves))}
+                if budget is not None:
+                    planned = budget.plan(job['params'], reserved=len(running))
+                    if planned is None:
+                        skipped += 1 + len(snapshot_epochs)
+                        continue
+                    if planned != job['params'] and snapshot_epochs:
+                        # Un essai raccourci n'atteint pas les instantanés au-delà de ses epochs
+                        reachable = [epochs for epochs in snapshot_epochs if epochs < planned['epochs']]
+                        skipped += len(snapshot_epochs) - len(reachable)
+                        job = {**job, 'snapshot_epochs': reachable}
+                    job = {**job, 'params': planned, 'deadline': budget.training_deadline()}
+                running[executor.submit(_evaluate_trial, job)] = (index, job)
+            if not running:
+                break
             
-            try:
-                # Créer et entraîner le modèle
-                model = self._create_model(model_type, params)
-                model.fit(df)
-                
-                # Évaluer
-                synthetic_sample = model.sample(min(1000, len(df)))
-                score = self._evaluate_quality(df, synthetic_sample, metadata)
-                
-                if score > best_score:
-                    best_score = score
-                    best_params = params.copy()
-                
-                if progress_callback:
-                    progress = 20 + (trial_count / n_trials) * 25
-                    progress_callback(progress, f"Bayesian Optimization: {trial_count}/{n_trials}")
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                index, job = running.pop(future)
+                params = job['params']
+                error = future.exception()
                 
-                # Retourner l'inverse du score (minimisation)
-                return -score
+                if error is not None:
+                    logger.warning(f"Échec de l'évaluation pour les paramètres {params}: {error}")
+                    trials[index] = {'params': params, 'score': None}
+                    completed += len(job.get('snapshot_epochs') or [])
+                    account(params, None)
+                    continue
                 
-            except Exception as e:
-                logger.warning(f"Échec de l'évaluation pour les paramètres {params}: {e}")
-                return 0  # Score neutre en cas d'échec
-        
-        # Lancer l'optimisation bayésienne
-        result = gp_minimize(
-            func=objective,
-            dimensions=dimension_list,
-            n_calls=n_trials,
-            random_state=42
-        )
+                result = future.result()
+                # Instantanés non atteints avant l'échéance ou l'élagage de l'essai
+                skipped += len(job.get('snapshot_epochs') or []) - len(result['snapshots'])
+                for snapshot in result['snapshots']:
+                    account(snapshot['params'], snapshot)
+                trials[index] = {'params': result['params'], 'score': result['score']}
+                account(result['params'], result)
         
-        return best_params or self.default_params[model_type], best_score
+        skipped += sum(1 + len(job.get('snapshot_epochs') or []) for _, job in queue)
+        if skipped:
+            logger.info(f"{label}: {skipped} essais sautés pour respecter le budget d'optimisation")
+        return best_params, best_score, trials
     
     def _get_param_grid(self, model_type: str, hyperparameters: List[str]) -> Dict[str, List]:
         """Définit la grille de paramètres pour la recherche par grille"""
@@ -346,34 +713,85 @@ class SyntheticDataGenerationService:
                 grid['epochs'] = [100, 300, 500]
             if 'batch_size' in hyperparameters:
                 grid['batch_size'] = [250, 500, 1000]
-            if 'learning_rate' in hyperparameters:
-                grid['learning_rate'] = [5e-4, 1e-3, 2e-3]
+        
+        elif model_type == 'bayesian_network':
+            grid = {}
+            if 'n_bins' in hyperparameters:
+                grid['n_bins'] = [10, 20, 40]
+            if 'max_parents' in hyperparameters:
+                grid['max_parents'] = [1, 2, 3]
         
         return grid if grid else {'epochs': [300]}  # Paramètre par défaut
     
-    def _get_skopt_dimensions(self, model_type: str, hyperparameters: List[str]) -> Dict[str, Any]:
-        """Définit les dimensions pour l'optimisation bayésienne"""
-        dimensions = {}
+    def _get_bayesian_search_space(self, model_type: str, hyperparameters: List[str]) -> Dict[str, Any]:
+        """
+        Définit l'espace de recherche de l'optimisation bayésienne: bornes
+        ("min_value", "max_value") ou choix ("choices"); "log" pour un paramètre
+        exploré en exposant de 10, "integer" pour un paramètre entier
+        """
+        epochs = {'min_value': 50, 'max_value': 1000, 'integer': True}
+        batch_size = {'choices': [250, 500, 1000]}
+        space = {}
         
         if model_type == 'ctgan':
             if 'epochs' in hyperparameters:
-                dimensions['epochs'] = Integer(50, 1000, name='epochs')
+                space['epochs'] = epochs
             if 'batch_size' in hyperparameters:
-                dimensions['batch_size'] = Categorical([250, 500, 1000], name='batch_size')
+                space['batch_size'] = batch_size
             if 'generator_lr' in hyperparameters:
-                dimensions['generator_lr'] = Real(1e-5, 1e-3, prior='log-uniform', name='generator_lr')
+                space['generator_lr'] = {'min_value': -5.0, 'max_value': -3.0, 'log': True}
             if 'discriminator_lr' in hyperparameters:
-                dimensions['discriminator_lr'] = Real(1e-5, 1e-3, prior='log-uniform', name='discriminator_lr')
+                space['discriminator_lr'] = {'min_value': -5.0, 'max_value': -3.0, 'log': True}
         
         elif model_type == 'tvae':
             if 'epochs' in hyperparameters:
-                dimensions['epochs'] = Integer(50, 1000, name='epochs')
+                space['epochs'] = epochs
             if 'batch_size' in hyperparameters:
-                dimensions['batch_size'] = Categorical([250, 500, 1000], name='batch_size')
-            if 'learning_rate' in hyperparameters:
-                dimensions['learning_rate'] = Real(1e-4, 1e-2, prior='log-uniform', name='learning_rate')
+                space['batch_size'] = batch_size
+        
+        elif model_type == 'bayesian_network':
+            if 'n_bins' in hyperparameters:
+                space['n_bins'] = {'min_value': 5, 'max_value': 50, 'integer': True}
+            if 'max_parents' in hyperparameters:
+                space['max_parents'] = {'min_value': 1, 'max_value': 4, 'integer': True}
         
-        return dimensions if dimensions else {'epochs': Integer(50, 1000, name='epochs')}
+        return space if space else {'epochs': epochs}
+    
+    def _decode_bayesian_point(self, point: Dict[str, Any], search_space: Dict[str, Any]) -> Dict[str, Any]:
+        """Hyperparamètres d'un point proposé par l'optimisation bayésienne"""
+        params = {}
+        for name, config in search_space.items():
+            value = float(point[name])
+            if 'choices' in config:
+                params[name] = config['choices'][int(np.clip(round(value), 0, len(config['choices']) - 1))]
+            elif config.get('log'):
+                params[name] = float(10 ** value)
+            elif config.get('integer'):
+                params[name] = int(round(value))
+            else:
+                params[name] = value
+        return params
+    
+    def _encode_bayesian_point(
+        self,
+        params: Dict[str, Any],
+        search_space: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Point de l'optimisation bayésienne de ces hyperparamètres, None hors de l'espace de recherche"""
+        point = {}
+        for name, config in search_space.items():
+            value = params.get(name)
+            if 'choices' in config:
+                if value not in config['choices']:
+                    return None
+                point[name] = config['choices'].index(value)
+                continue
+            if not isinstance(value, (int, float, np.number)) or (config.get('log') and value <= 0):
+                return None
+            point[name] = float(np.log10(value)) if config.get('log') else float(value)
+            if not config['min_value'] <= point[name] <= config['max_value']:
+                return None
+        return point
     
     def _sample_random_params(self, param_space: Dict[str, Any]) -> Dict[str, Any]:
         """Échantillonne aléatoirement des paramètres"""
@@ -407,8 +825,13 @@ class SyntheticDataGenerationService:
                 space['epochs'] = (50, 1000)
             if 'batch_size' in hyperparameters:
                 space['batch_size'] = [250, 500, 1000]
-            if 'learning_rate' in hyperparameters:
-                space['learning_rate'] = (1e-4, 1e-2)
+        
+        elif model_type == 'bayesian_network':
+            space = {}
+            if 'n_bins' in hyperparameters:
+                space['n_bins'] = (5, 50)
+            if 'max_parents' in hyperparameters:
+                space['max_parents'] = (1, 4)
         
         return space if space else {'epochs': (50, 1000)}
     
@@ -420,15 +843,11 @@ class SyntheticDataGenerationService:
     ) -> float:
         """Évalue la qualité des données synthétiques"""
         try:
-            # Utiliser SDMetrics pour évaluer la qualité
-            quality_report = evaluate_quality(
-                real_data, 
-                synthetic_data, 
-                metadata
-            )
+            # Rapport de qualité SDMetrics ou son équivalent vectorisé (QUALITY_ENGINE)
+            report = quality_report(real_data, synthetic_data, metadata, engine=settings.QUALITY_ENGINE)
             
             # Retourner le score global (0-1)
-            return quality_report.get_score()
+            return report.get_score()
             
         except Exception as e:
             logger.warning(f"Erreur lors de l'évaluation de la qualité: {e}")
@@ -455,3 +874,67 @@ class SyntheticDataGenerationService:
             
         except Exception as e:
             raise Exception(f"Erreur lors de la sauvegarde: {str(e)}")
+
+
+class SynthesizerTrialModel(BaseModelWrapper):
+    """
+    Adaptateur des synthétiseurs du service (``_create_model``) à l'interface
+    des wrappers de modèles: run_model_trial entraîne, évalue, sauvegarde et
+    recharge ainsi les essais de ce service comme ceux du pipeline principal
+    """
+    
+    def __init__(self, model_type: str, hyperparameters: Dict[str, Any], metadata: SingleTableMetadata):
+        super().__init__(hyperparameters)
+        self.model_type = model_type
+        self.metadata = metadata
+    
+    async def train(self, data: pd.DataFrame) -> None:
+        self.model = SyntheticDataGenerationService()._create_model(self.model_type, self.params, self.metadata)
+        if isinstance(self.model, (ResumableCTGANSynthesizer, ResumableTVAESynthesizer)):
+            self.model.checkpointer = self.checkpointer
+            self.model.epoch_callback = self.epoch_callback
+        self.model.fit(data)
+    
+    async def generate(self, num_rows: int) -> pd.DataFrame:
+        return self.model.sample(num_rows)
+    
+    async def save(self, path: str) -> None:
+        self.model.save(path)
+    
+    async def load(self, path: str) -> None:
+        self.model = MODEL_CLASSES[self.model_type].load(path)
+
+
+def _evaluate_trial(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Entraîne et évalue un modèle pour un jeu d'hyperparamètres (exécuté dans un worker)
+    
+    L'essai est exécuté par run_model_trial (cache d'essais, échéance, élagage,
+    instantanés, mémoire et durées du modèle de coût) avec les synthétiseurs du
+    service. Tous les essais d'un dataset sont évalués sur le même échantillon
+    stratifié des données réelles, avec un nombre fixe de lignes synthétiques;
+    les modèles sont sauvegardés sous TRIAL_MODEL_DIR pour la génération finale
+    et ne sont pas renvoyés au processus principal
+    
+    Returns:
+        Le résultat de run_model_trial sans "model", ses instantanés de même
+    """
+    df = job['df']
+    fingerprint = dataset_fingerprint(df)
+    result = run_model_trial({
+        'model_type': job['model_type'],
+        'params': job['params'],
+        'data': df,
+        'fingerprint': fingerprint,
+        'artifact_dir': str(TRIAL_MODEL_DIR / fingerprint[:16]),
+        'holdout': job.get('holdout') or get_evaluation_holdout(df, fingerprint, job['metadata'].to_dict()),
+        'deadline': job.get('deadline'),
+        'pruner': job.get('pruner'),
+        'snapshot_epochs': job.get('snapshot_epochs'),
+        'create_model': partial(SynthesizerTrialModel, metadata=job['metadata'])
+    })
+    return {
+        **result,
+        'model': None,
+        'snapshots': [{**snapshot, 'model': None} for snapshot in result['snapshots']]
+    }
@@ -0,0 +1,39 @@
+import os
+
+# Settings required by app.core.config (the tests never reach the database nor Supabase)
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("JWT_SECRET_KEY", "test")
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture(autouse=True)
+def isolated_profiles(tmp_path, monkeypatch):
+    """Real-data profiles cached in a temporary directory and a fresh in-memory cache"""
+    from app.ai.services import quality_engine
+
+    monkeypatch.setattr(quality_engine, "PROFILE_DIR", tmp_path / "quality_profiles")
+    monkeypatch.setattr(quality_engine, "_profiles", type(quality_engine._profiles)())
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Fresh SQLite database behind SessionLocal (and the caches that imported it)"""
+    from app.db import database as db_module
+    from app.db.database import Base
+    import app.main  # noqa: F401 (registers every model)
+    from app.ai.services import cost_model, trial_cache
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    for module in (db_module, trial_cache, cost_model):
+        monkeypatch.setattr(module, "SessionLocal", factory)
+    return factory
@@ -0,0 +1,80 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.services import SyntheticDataGenerationService as sdgs_module
+from app.services.BayesianOptimizationService import BayesianOptimizationService
+from app.services.SyntheticDataGenerationService import SyntheticDataGenerationService
+
+HYPERPARAMETERS = ["epochs", "batch_size", "generator_lr"]
+
+
+@pytest.fixture
+def service():
+    return SyntheticDataGenerationService()
+
+
+def test_warm_start_configs_are_suggested_first():
+    optimizer = BayesianOptimizationService(surrogate="gp")
+    optimizer.set_search_space({"x": {"min_value": 0, "max_value": 1}, "y": {"min_value": 0, "max_value": 1}})
+    optimizer.warm_start([{"x": 0.1, "y": 0.2}, {"x": 2.0, "y": 0.5}, {"x": 0.3, "y": 0.4}])
+
+    # The out-of-bounds configuration is dropped
+    assert optimizer.suggest_batch(1) == [{"x": 0.1, "y": 0.2}]
+    batch = optimizer.suggest_batch(3)
+    assert batch[0] == {"x": 0.3, "y": 0.4}
+    assert len(batch) == 3
+
+    for point, score in zip(batch, [0.5, 0.6, 0.7]):
+        optimizer.update_observations(point, score)
+    assert len(optimizer.suggest_batch(2)) == 2
+
+
+def test_search_space_round_trip(service):
+    space = service._get_bayesian_search_space("ctgan", HYPERPARAMETERS)
+    params = {"epochs": 300, "batch_size": 1000, "generator_lr": 2e-4}
+
+    point = service._encode_bayesian_point(params, space)
+    assert point["batch_size"] == 2
+    decoded = service._decode_bayesian_point(point, space)
+    assert decoded["epochs"] == 300 and decoded["batch_size"] == 1000
+    assert decoded["generator_lr"] == pytest.approx(2e-4)
+
+    assert service._encode_bayesian_point({**params, "batch_size": 300}, space) is None
+    assert service._encode_bayesian_point({**params, "epochs": 3}, space) is None
+
+
+def test_search_runs_the_warm_start_then_the_suggestions(service, monkeypatch):
+    tried = []
+
+    def evaluate(job):
+        tried.append(job["params"])
+        return {
+            "score": 1 - job["params"]["generator_lr"] * 100,
+            "params": job["params"],
+            "training_time": 0.0,
+            "evaluation_time": 0.0,
+            "cached": False,
+            "pruned": False,
+            "curve": None,
+            "snapshots": []
+        }
+
+    # Trials run in this process, one at a time
+    monkeypatch.setattr(settings, "TRIAL_MAX_WORKERS", 1)
+    monkeypatch.setattr(sdgs_module, "_evaluate_trial", evaluate)
+    warm_start = {"epochs": 300, "batch_size": 500, "generator_lr": 1e-5}
+    data = pd.DataFrame({"x": range(10)})
+
+    best_params, best_score = asyncio.run(service._bayesian_optimization(
+        data, None, "ctgan", HYPERPARAMETERS, 5, warm_start=[warm_start]
+    ))
+
+    assert len(tried) == 5
+    assert tried[0]["epochs"] == 300 and tried[0]["batch_size"] == 500
+    assert tried[0]["generator_lr"] == pytest.approx(1e-5)
+    assert all(isinstance(params["epochs"], int) and params["batch_size"] in (250, 500, 1000) for params in tried)
+    assert best_score == max(1 - params["generator_lr"] * 100 for params in tried)
+    assert best_params in tried
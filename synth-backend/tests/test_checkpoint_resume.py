@@ -0,0 +1,111 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from app.ai.models.checkpointing import TrainingCheckpointer
+from app.ai.models.resumable_synthesizers import ResumableCTGAN, ResumableTVAE
+
+EPOCHS = 4
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "x": rng.normal(size=200),
+        "y": rng.exponential(size=200),
+        "c": rng.choice(list("abc"), 200)
+    })
+
+
+def _model(model_class=ResumableCTGAN):
+    if model_class is ResumableCTGAN:
+        model = ResumableCTGAN(epochs=EPOCHS, batch_size=50, embedding_dim=8, generator_dim=(16,), discriminator_dim=(16,))
+    else:
+        model = ResumableTVAE(epochs=EPOCHS, batch_size=50, embedding_dim=8, compress_dims=(16,), decompress_dims=(16,))
+    model.set_random_state(0)
+    return model
+
+
+def _checkpointer(directory, signature=None):
+    return TrainingCheckpointer(str(directory), signature or {"run": 1}, every_epochs=1, every_minutes=None)
+
+
+def _interrupt_at(epoch):
+    def callback(i, losses):
+        if i == epoch:
+            raise Interrupted()
+    return callback
+
+
+@pytest.mark.parametrize("model_class, network", [(ResumableCTGAN, "_generator"), (ResumableTVAE, "decoder")])
+def test_resumed_training_matches_an_uninterrupted_run(data, tmp_path, model_class, network):
+    reference = _model(model_class)
+    reference.fit(data, discrete_columns=["c"])
+
+    interrupted = _model(model_class)
+    with pytest.raises(Interrupted):
+        interrupted.fit(data, discrete_columns=["c"], checkpointer=_checkpointer(tmp_path), epoch_callback=_interrupt_at(1))
+
+    resumed = _model(model_class)
+    resumed.fit(data, discrete_columns=["c"], checkpointer=_checkpointer(tmp_path))
+
+    assert sorted(set(resumed.loss_values["Epoch"])) == list(range(EPOCHS))
+    expected = getattr(reference, network).state_dict()
+    for name, weights in getattr(resumed, network).state_dict().items():
+        assert torch.equal(weights, expected[name]), name
+
+
+def test_checkpoint_of_another_configuration_is_ignored(data, tmp_path):
+    model = _model()
+    with pytest.raises(Interrupted):
+        model.fit(data, discrete_columns=["c"], checkpointer=_checkpointer(tmp_path), epoch_callback=_interrupt_at(1))
+
+    assert _checkpointer(tmp_path).load()["epoch"] == 1
+    assert _checkpointer(tmp_path, {"run": 2}).load() is None
+
+
+def test_only_orphaned_v2_requests_are_resumed_once(database, tmp_path, monkeypatch):
+    from app.models.DataRequest import DataRequest
+    from app.routers import generation_v2
+
+    monkeypatch.setattr(generation_v2.ai_processing_service, "checkpoint_dir", tmp_path)
+    launched = []
+
+    async def process(request_id, sample_size, dataset_path, lock):
+        launched.append(request_id)
+        generation_v2._release_request_lock(request_id, lock, remove=False)
+
+    monkeypatch.setattr(generation_v2, "_process_generation_v2", process)
+
+    db = database()
+    for request_id in (1, 2, 3):
+        db.add(DataRequest(id=request_id, user_id=1, request_name="r", dataset_name="d", status="processing"))
+    db.commit()
+
+    # 1: v2 job whose worker died; 2: v1 job (no lock file); 3: v2 job still running in a live worker
+    generation_v2._release_request_lock(1, generation_v2._acquire_request_lock(1), remove=False)
+    running = generation_v2._acquire_request_lock(3)
+
+    async def resume():
+        resumed = await generation_v2.resume_interrupted_generations()
+        await asyncio.sleep(0)
+        return resumed
+
+    try:
+        assert asyncio.run(resume()) == [1]
+        # Another worker starting at the same time finds the request claimed (its lock is free again)
+        assert asyncio.run(resume()) == []
+    finally:
+        generation_v2._release_request_lock(3, running)
+
+    assert launched == [1]
+    statuses = {request.id: request.status for request in database().query(DataRequest).all()}
+    assert statuses == {1: "pending", 2: "processing", 3: "processing"}
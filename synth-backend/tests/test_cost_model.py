@@ -0,0 +1,30 @@
+import pytest
+
+from app.ai.services import cost_model
+from app.ai.services.AIProcessingService import AIProcessingService
+from app.ai.services.cost_model import STAGES, estimate_job, record_stage
+
+SECONDS_PER_EPOCH = 0.01
+
+
+@pytest.fixture
+def timings(database, monkeypatch):
+    """Stage timings where training takes SECONDS_PER_EPOCH per epoch"""
+    monkeypatch.setattr(cost_model, "_models", {})
+    for epochs in (50, 100, 200, 300, 500, 700, 1000, 1500):
+        for n_rows in (1000, 10000):
+            record_stage("training", "ctgan", n_rows, 20, epochs * SECONDS_PER_EPOCH, epochs=epochs, batch_size=500)
+            for stage in STAGES[1:]:
+                record_stage(stage, "ctgan", n_rows, 20, 1.0, output_rows=epochs * 10)
+
+
+def test_grid_search_is_estimated_on_its_shared_runs_spread_over_the_workers(timings):
+    runs = AIProcessingService().planned_trial_runs("ctgan", "grid", 5, 1000)
+    # 27 combinations, one run per combination of the non-epoch parameters, to the largest epochs
+    assert len(runs) == 9 and {run["params"]["epochs"] for run in runs} == {1000}
+
+    sequential = estimate_job("ctgan", 1000, 20, 1000, trial_runs=runs)
+    concurrent = estimate_job("ctgan", 1000, 20, 1000, trial_runs=runs, n_workers=3)
+    assert sequential["training"] == 0
+    assert sequential["optimization"] == pytest.approx(9 * (1000 * SECONDS_PER_EPOCH + 2), rel=0.5)
+    assert concurrent["optimization"] == pytest.approx(sequential["optimization"] / 3)
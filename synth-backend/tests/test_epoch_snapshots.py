@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from sdv.metadata import SingleTableMetadata
+
+from app.ai.models.resumable_synthesizers import ResumableCTGANSynthesizer, ResumableTVAESynthesizer
+from app.ai.services.epoch_prefix import group_epoch_prefixes
+
+EPOCHS = 4
+SNAPSHOT_EPOCHS = 2
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "x": rng.normal(size=200),
+        "y": rng.exponential(size=200),
+        "c": rng.choice(list("abc"), 200)
+    })
+
+
+@pytest.fixture(scope="module")
+def metadata(data):
+    detected = SingleTableMetadata()
+    detected.detect_from_dataframe(data)
+    return detected
+
+
+NETWORKS = {
+    ResumableCTGANSynthesizer: dict(embedding_dim=8, generator_dim=(16,), discriminator_dim=(16,)),
+    ResumableTVAESynthesizer: dict(embedding_dim=8, compress_dims=(16,), decompress_dims=(16,))
+}
+
+
+def _synthesizer(synthesizer_class, metadata, epochs):
+    return synthesizer_class(metadata, epochs=epochs, batch_size=50, **NETWORKS[synthesizer_class])
+
+
+def _fit(synthesizer, data):
+    torch.manual_seed(0)
+    np.random.seed(0)
+    synthesizer.fit(data)
+    synthesizer.epoch_callback = None
+    return synthesizer
+
+
+@pytest.mark.parametrize("synthesizer_class", list(NETWORKS))
+def test_snapshot_matches_a_run_trained_to_its_epochs(data, metadata, synthesizer_class):
+    full = _synthesizer(synthesizer_class, metadata, EPOCHS)
+    snapshots = {}
+
+    def on_epoch(epoch, info):
+        if epoch + 1 == SNAPSHOT_EPOCHS:
+            snapshots[epoch + 1] = full.snapshot()
+        return False
+
+    full.epoch_callback = on_epoch
+    _fit(full, data)
+    short = _fit(_synthesizer(synthesizer_class, metadata, SNAPSHOT_EPOCHS), data)
+    snapshot = full.from_snapshot(snapshots[SNAPSHOT_EPOCHS], SNAPSHOT_EPOCHS)
+
+    for name in synthesizer_class.model_class.SAMPLING_NETWORKS:
+        expected = getattr(short._model, name).state_dict()
+        for key, weights in getattr(snapshot._model, name).state_dict().items():
+            assert torch.equal(weights, expected[key]), f"{name}.{key}"
+    pd.testing.assert_frame_equal(snapshot.sample(100), short.sample(100))
+    # The snapshot is a copy: the full run still samples with its own weights
+    assert not full.sample(100).equals(short.sample(100))
+
+
+def test_configurations_differing_by_epochs_share_one_run():
+    configs = [
+        {"epochs": 100, "batch_size": 500},
+        {"epochs": 300, "batch_size": 500},
+        {"epochs": 100, "batch_size": 250},
+        {"epochs": 200, "batch_size": 500},
+        {"n_bins": 10}
+    ]
+    assert group_epoch_prefixes(configs) == [
+        {"params": {"epochs": 300, "batch_size": 500}, "snapshot_epochs": [100, 200]},
+        {"params": {"epochs": 100, "batch_size": 250}, "snapshot_epochs": []},
+        {"params": {"n_bins": 10}, "snapshot_epochs": []}
+    ]
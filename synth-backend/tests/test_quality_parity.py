@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sdmetrics.reports.single_table import QualityReport
+from sdv.metadata import SingleTableMetadata
+
+from app.ai.services.quality_engine import NativeQualityReport
+
+
+def _table(n_rows, seed, noise=0.3):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=n_rows)
+    category = np.where(x > 0.5, "a", np.where(x > -0.5, "b", "c"))
+    data = pd.DataFrame({
+        "x": x,
+        "y": 2 * x + noise * rng.normal(size=n_rows),
+        "count": rng.poisson(3 + (x > 0), n_rows),
+        "flag": x + noise * rng.normal(size=n_rows) > 0,
+        "date": pd.Timestamp("2020-01-01") + pd.to_timedelta((50 * x).round(), unit="D"),
+        "category": category,
+        "level": np.where(rng.random(n_rows) < noise, rng.choice(["low", "high"], n_rows),
+                          np.where(category == "a", "high", "low"))
+    })
+    data.loc[rng.random(n_rows) < 0.05, "y"] = np.nan
+    data.loc[rng.random(n_rows) < 0.05, "category"] = None
+    return data
+
+
+@pytest.fixture(scope="module")
+def real():
+    return _table(2000, 0, noise=0.2)
+
+
+@pytest.fixture(scope="module")
+def metadata(real):
+    detected = SingleTableMetadata()
+    detected.detect_from_dataframe(real)
+    return detected.to_dict()
+
+
+def _unseen_categories(real):
+    synthetic = _table(500, 3)
+    synthetic.loc[:40, "category"] = "z"
+    return synthetic
+
+
+def _constant_column(real):
+    return _table(500, 4).assign(x=1.0)
+
+
+SYNTHETIC = {
+    "close": lambda real: _table(1500, 1, noise=0.2),
+    "noisy": lambda real: _table(1500, 2, noise=1.5),
+    "unseen categories": _unseen_categories,
+    "constant column": _constant_column,
+    "missing column values": lambda real: _table(500, 5).assign(y=np.nan),
+    "single row": lambda real: real.iloc[:1],
+    "empty": lambda real: real.iloc[:0]
+}
+
+
+@pytest.mark.parametrize("case", list(SYNTHETIC))
+def test_native_report_matches_sdmetrics(real, metadata, case):
+    synthetic = SYNTHETIC[case](real)
+    expected = QualityReport()
+    expected.generate(real, synthetic, metadata, verbose=False)
+    native = NativeQualityReport()
+    native.generate(real, synthetic, metadata)
+
+    assert native.get_score() == pytest.approx(expected.get_score(), abs=1e-9, nan_ok=True)
+    assert native.get_properties().Score.tolist() == pytest.approx(
+        expected.get_properties().Score.tolist(), abs=1e-9, nan_ok=True
+    )
+    for property_name in ("Column Shapes", "Column Pair Trends"):
+        assert native.get_details(property_name).Score.tolist() == pytest.approx(
+            expected.get_details(property_name).Score.tolist(), abs=1e-9, nan_ok=True
+        ), property_name
+
+
+def test_empty_synthetic_data_scores_the_real_pair_trends(real, metadata):
+    # Associated pairs have no synthetic frequency: half of the real frequencies are missed
+    native = NativeQualityReport()
+    native.generate(real, real.iloc[:0], metadata)
+    assert np.isnan(native.get_details("Column Shapes").Score).all()
+    assert native.get_score() == pytest.approx(0.5)
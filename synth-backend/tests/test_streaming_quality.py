@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sdv.metadata import SingleTableMetadata
+
+from app.ai.services.quality_engine import NativeQualityReport
+from app.ai.services.streaming_quality import GRID_BINS, StreamingQualityEvaluator
+
+
+def _table(n_rows, seed, scale=1.0):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n_rows, 1))
+    data = pd.DataFrame(base + scale * rng.normal(size=(n_rows, 4)), columns=[f"x{i}" for i in range(4)])
+    data["age"] = (40 + 10 * data["x0"]).round()
+    for i in range(3):
+        data[f"c{i}"] = np.where(data[f"x{i}"] > 0, "p", np.where(data[f"x{i}"] > -1, "q", "r"))
+    data.loc[rng.random(n_rows) < 0.02, "x1"] = np.nan
+    return data
+
+
+@pytest.fixture(scope="module")
+def real():
+    return _table(5000, 0)
+
+
+@pytest.fixture(scope="module")
+def metadata(real):
+    detected = SingleTableMetadata()
+    detected.detect_from_dataframe(real)
+    return detected.to_dict()
+
+
+def _batch(real, synthetic, metadata):
+    report = NativeQualityReport()
+    report.generate(real, synthetic, metadata)
+    return report
+
+
+def _stream(real, synthetic, metadata, chunk_rows):
+    evaluator = StreamingQualityEvaluator(real, metadata)
+    for start in range(0, len(synthetic), chunk_rows):
+        evaluator.update(synthetic.iloc[start:start + chunk_rows])
+    return evaluator
+
+
+@pytest.mark.parametrize("chunk_rows", [100, 500, 100_000])
+def test_matches_batch_report_within_documented_tolerance(real, metadata, chunk_rows):
+    # Many small chunks widen the range of every continuous column over and over
+    synthetic = _table(100_000, 1, scale=1.2)
+    batch = _batch(real, synthetic, metadata)
+    evaluator = _stream(real, synthetic, metadata, chunk_rows)
+    streamed = evaluator.report()
+
+    shapes = batch.get_details("Column Shapes").Score - streamed.get_details("Column Shapes").Score
+    pairs = batch.get_details("Column Pair Trends").Score - streamed.get_details("Column Pair Trends").Score
+    assert np.nanmax(np.abs(shapes)) < 1e-12
+    assert np.nanmax(np.abs(pairs)) <= 0.01
+    assert abs(batch.get_score() - streamed.get_score()) <= 1e-3
+
+    # The values span at least half of the sub-bins of each grid
+    for column, (start, width) in evaluator._grids.items():
+        span = evaluator._maximum[column] - evaluator._minimum[column]
+        assert span / width >= GRID_BINS / 2
+
+
+def test_exact_scores_of_a_single_chunk(real, metadata):
+    synthetic = _table(3000, 2)
+    batch = _batch(real, synthetic, metadata)
+    streamed = _stream(real, synthetic, metadata, len(synthetic)).report()
+    assert streamed.get_details("Column Shapes").Score.tolist() == pytest.approx(
+        batch.get_details("Column Shapes").Score.tolist(), abs=1e-12
+    )
+    correlations = batch.get_details("Column Pair Trends").Metric == "CorrelationSimilarity"
+    assert streamed.get_details("Column Pair Trends").Score[correlations].tolist() == pytest.approx(
+        batch.get_details("Column Pair Trends").Score[correlations].tolist(), abs=1e-9, nan_ok=True
+    )
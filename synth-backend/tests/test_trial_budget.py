@@ -0,0 +1,122 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from app.ai.services.budget_scheduler import MIN_SHRUNK_EPOCHS, TrialBudget
+from app.ai.services.trial_executor import TrialExecutor
+from app.services import SyntheticDataGenerationService as sdgs_module
+from app.services.SyntheticDataGenerationService import SyntheticDataGenerationService
+
+SECONDS_PER_EPOCH = 0.5
+
+
+def _budget(timeout_minutes=1, max_evaluations=None):
+    """One minute left, a previous trial trained at SECONDS_PER_EPOCH"""
+    budget = TrialBudget(timeout_minutes=timeout_minutes, max_evaluations=max_evaluations)
+    budget.record({"epochs": 10}, 10 * SECONDS_PER_EPOCH)
+    budget.evaluations = 0
+    return budget
+
+
+def test_trial_that_does_not_fit_is_shrunk_to_the_epochs_that_fit():
+    budget = _budget()
+    assert budget.plan({"epochs": 100}) == {"epochs": 100}
+
+    shrunk = budget.plan({"epochs": 300, "batch_size": 500})
+    assert shrunk["batch_size"] == 500
+    assert MIN_SHRUNK_EPOCHS <= shrunk["epochs"] <= 60 / SECONDS_PER_EPOCH
+
+    # Not even the smallest budget fits
+    assert _budget(timeout_minutes=0.01).plan({"epochs": 300}) is None
+
+
+def test_evaluation_limit_counts_the_trials_already_scheduled():
+    budget = _budget(max_evaluations=2)
+    assert budget.plan({"epochs": 10}, reserved=1) == {"epochs": 10}
+    assert budget.plan({"epochs": 10}, reserved=2) is None
+
+
+@pytest.fixture
+def trials(monkeypatch):
+    """Trials answered at once: the jobs they received are collected"""
+    received = []
+
+    def evaluate(job):
+        received.append(job)
+        return {
+            "score": job["params"]["epochs"] / 1000,
+            "params": job["params"],
+            "training_time": 0.0,
+            "evaluation_time": 0.0,
+            "cached": False,
+            "pruned": False,
+            "curve": None,
+            "snapshots": []
+        }
+
+    monkeypatch.setattr(sdgs_module, "_evaluate_trial", evaluate)
+    return received
+
+
+def _run(jobs, budget):
+    service = SyntheticDataGenerationService()
+    return asyncio.run(service._run_trials(TrialExecutor(max_workers=1), jobs, "Test", budget=budget))
+
+
+def test_search_trials_are_shrunk_and_given_the_deadline(trials):
+    budget = _budget()
+    best_params, best_score, results = _run([{"params": {"epochs": 100}}, {"params": {"epochs": 300}}], budget)
+
+    assert [job["deadline"] for job in trials] == [budget.training_deadline()] * 2
+    assert results[0]["params"] == {"epochs": 100}
+    assert MIN_SHRUNK_EPOCHS <= results[1]["params"]["epochs"] < 300
+    assert best_params == results[1]["params"]
+    assert budget.evaluations == 2
+
+
+def test_shrunk_run_drops_the_snapshots_it_cannot_reach(trials):
+    _, _, results = _run([{"params": {"epochs": 300}, "snapshot_epochs": [50, 100, 200]}], _budget())
+
+    epochs = results[0]["params"]["epochs"]
+    assert epochs < 200
+    assert trials[0]["snapshot_epochs"] == [e for e in (50, 100) if e < epochs]
+
+
+def test_search_stops_at_the_evaluation_limit(trials):
+    _, _, results = _run([{"params": {"epochs": 100}} for _ in range(4)], _budget(max_evaluations=2))
+    assert len(trials) == 2
+    assert results[2:] == [None, None]
+
+
+def test_optimization_config_limits_the_budget():
+    data = pd.DataFrame({"x": range(100)})
+    budget = SyntheticDataGenerationService()._make_budget(data, "ctgan", {"timeout_minutes": 10, "max_evaluations": 7})
+    assert budget.max_evaluations == 7
+    assert 590 < budget.remaining_seconds() <= 600
+
+
+def test_next_trial_starts_as_soon_as_a_worker_frees_up(monkeypatch):
+    events = []
+
+    def evaluate(job):
+        events.append(("start", job["params"]["epochs"]))
+        time.sleep(job["params"]["epochs"] / 100)
+        events.append(("end", job["params"]["epochs"]))
+        return {
+            "score": 0.5, "params": job["params"], "training_time": 0.0, "evaluation_time": 0.0,
+            "cached": False, "pruned": False, "curve": None, "snapshots": []
+        }
+
+    monkeypatch.setattr(sdgs_module, "_evaluate_trial", evaluate)
+    # Two workers running in threads of this process
+    executor = TrialExecutor(max_workers=2)
+    executor._pool = ThreadPoolExecutor(2)
+    jobs = [{"params": {"epochs": epochs}} for epochs in (50, 5, 5)]
+    asyncio.run(SyntheticDataGenerationService()._run_trials(executor, jobs, "Test", budget=_budget()))
+    executor._pool.shutdown()
+
+    # The third trial ran while the slow first one was still training
+    assert events.index(("start", 5), 2) < events.index(("end", 50))
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from app.ai.services.trial_cache import QUALITY_VALIDATOR_EVALUATION, lookup_trial, store_trial
+from app.ai.services.trial_executor import run_model_trial
+
+FINGERPRINT = "f" * 64
+PARAMS = {"n_bins": 5, "max_parents": 1}
+
+
+def _job(**job):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({"x": rng.normal(size=100), "c": rng.choice(list("ab"), 100)})
+    return {"model_type": "bayesian_network", "params": PARAMS, "data": data, "fingerprint": FINGERPRINT, **job}
+
+
+def test_trial_whose_model_was_evicted_is_ranked_from_the_cache(database):
+    store_trial(FINGERPRINT, "bayesian_network", PARAMS, QUALITY_VALIDATOR_EVALUATION, 0.9, 12.0, None)
+
+    result = run_model_trial(_job())
+    assert result["cached"] and result["model"] is None
+    assert (result["score"], result["training_time"]) == (0.9, 12.0)
+
+
+def test_model_of_a_winner_is_retrained_when_evicted(database, tmp_path):
+    store_trial(FINGERPRINT, "bayesian_network", PARAMS, QUALITY_VALIDATOR_EVALUATION, 0.9, 12.0, None)
+
+    result = run_model_trial(_job(artifact_dir=str(tmp_path), require_model=True))
+    assert not result["cached"] and result["model"] is not None
+    assert lookup_trial(FINGERPRINT, "bayesian_network", PARAMS, QUALITY_VALIDATOR_EVALUATION)["model_path"]
+
+    # Saved again: the next lookup reloads it
+    reloaded = run_model_trial(_job(require_model=True))
+    assert reloaded["cached"] and reloaded["model"] is not None
+
+
+def test_service_trials_run_its_synthesizers_through_the_trial_cache(database, tmp_path, monkeypatch):
+    from sdv.metadata import SingleTableMetadata
+
+    from app.services import SyntheticDataGenerationService as sdgs_module
+
+    monkeypatch.setattr(sdgs_module, "TRIAL_MODEL_DIR", tmp_path)
+    data = _job()["data"]
+    metadata = SingleTableMetadata()
+    metadata.detect_from_dataframe(data)
+    job = {"model_type": "bayesian_network", "params": PARAMS, "df": data, "metadata": metadata}
+
+    trained = sdgs_module._evaluate_trial(job)
+    assert not trained["cached"] and trained["model"] is None
+    assert sdgs_module.SyntheticDataGenerationService()._load_trial_model(data, metadata, "bayesian_network", PARAMS)
+
+    cached = sdgs_module._evaluate_trial(job)
+    assert cached["cached"] and cached["score"] == trained["score"]